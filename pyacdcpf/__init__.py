@@ -5,6 +5,16 @@
 """
 
 from .runacdcpf import runacdcpf
+from .runacdcpfts import runacdcpfts
+from .runacdcpfcont import runacdcpfcont
+from .runacdcpfmc import runacdcpfmc
+from .applyoutage import applyoutage
+from .prepacdcpf import prepacdcpf
+from .setinjacdc import setinjacdc
+from .solveacdcpf import solveacdcpf
+from .int2extacdc import int2extacdc
+from .savecaseacdc import savecaseacdc
+from .loadcaseacdc import loadcaseacdc
 
 __version__ = "1.0"
 __author__ = "Roni Irnawan (roni.irnawan@gmail.com)"
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""Accelerates the outer iteration of the sequential ac/dc power flow.
+"""
+
+from numpy import column_stack, diff, eye, outer, isfinite
+from numpy.linalg import lstsq
+
+
+def accacdc(acc, x, g, method, depth=3):
+    """
+    Accelerates the outer iteration of the sequential ac/dc power flow.
+
+    The outer iteration of SOLVEACDCPF is a fixed-point iteration x = G(x)
+    on the grid side active powers x of the dc slack and droop converters:
+    an iteration starting from C{x} returns C{g} = G(x). Instead of
+    continuing from C{g}, the next iterate is determined from the history
+    of the iteration with one of the methods (option ACCACDC):
+        1 : Anderson mixing with the last C{depth} residuals
+        2 : Aitken extrapolation (dynamic relaxation, Irons-Tuck)
+        3 : secant updates of the inverse Jacobian of the residual
+            G(x) - x (Broyden's second method)
+    The first iteration of every method continues from C{g}.
+
+    C{acc} is a dict keeping the history, which is empty at the start and
+    should be reset (emptied) when the set of slack and droop converters
+    changes. Returns the next iterate.
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+    f = g - x   ## residual
+
+    if method == 1:
+        ## Anderson mixing: g minus the combination of the last differences
+        ## of G that best cancels the residual
+        acc.setdefault('G', []).append(g)
+        acc.setdefault('F', []).append(f)
+        del acc['G'][:-depth-1], acc['F'][:-depth-1]
+        xn = g
+        if len(acc['F']) > 1:
+            dF = diff(column_stack(acc['F']), axis=1)
+            dG = diff(column_stack(acc['G']), axis=1)
+            gamma = lstsq(dF, f, rcond=None)[0]
+            xn = g - dG.dot(gamma)
+    elif method == 2:
+        ## Aitken extrapolation: relaxation factor from the last residuals
+        if 'f' in acc:
+            df = f - acc['f']
+            den = df.dot(df)
+            if den > 0:
+                acc['w'] = -acc['w']*acc['f'].dot(df)/den
+        else:
+            acc['w'] = 1.
+        acc['f'] = f
+        xn = x + acc['w']*f
+    elif method == 3:
+        ## secant: inverse Jacobian H of the residual, initially -I
+        if 'H' in acc:
+            dx = x - acc['x']
+            df = f - acc['f']
+            den = df.dot(df)
+            if den > 0:
+                acc['H'] += outer(dx - acc['H'].dot(df), df)/den
+        else:
+            acc['H'] = -eye(x.size)
+        acc['x'], acc['f'] = x, f
+        xn = x - acc['H'].dot(f)
+    else:
+        raise ValueError('unknown outer loop acceleration %s' % method)
+
+    ## continue without acceleration if the step failed
+    if not isfinite(xn).all():
+        acc.clear()
+        xn = g
+
+    return xn
@@ -0,0 +1,530 @@
+"""Solves a prepared ac/dc case with the unified Newton-Raphson method.
+"""
+from sys import stdout
+from time import perf_counter
+
+from numpy import r_, c_, zeros, ones, pi, exp, where, arange, sqrt, real, \
+                 imag, conj, abs, angle, argmax, intersect1d, setdiff1d, \
+                 isin, unique, finfo, equal, not_equal
+
+from scipy.sparse import csr_matrix, diags, hstack, vstack
+from scipy.sparse.linalg import spsolve
+
+from pypower.makeYbus import makeYbus
+from pypower.makeSbus import makeSbus
+from pypower.dSbus_dV import dSbus_dV
+from pypower.bustypes import bustypes
+from pypower.pfsoln import pfsoln
+
+from pypower.idx_bus import PD, QD, VM, VA, BUS_TYPE, PQ, REF, ZONE, BUS_I
+from pypower.idx_brch import QT, F_BUS, T_BUS
+from pypower.idx_gen import QG, VG, GEN_BUS, GEN_STATUS
+
+from pyacdcpf.idx_busdc import GRIDDC, VDC
+from pyacdcpf.idx_convdc import CONV_BUS, CONVTYPE_DC, DCSLACK, DCDROOP, \
+        DCNOSLACK, CONVTYPE_AC, PVC, PQC, PCONV, QCONV, DROOP, PDCSET, \
+        VDCSET, DVDCSET
+
+from pyacdcpf.makeYbusconv import makeYbusconv
+from pyacdcpf.convlimvec import convlimvec
+from pyacdcpf.calclossac import calclossac
+from pyacdcpf.acdcstats import acdcstats
+
+## define j
+## DONT USE j IN ANYWHERE ELSE!!!
+j = sqrt(-1+0j)
+
+eps = finfo(float).eps # for avoiding division by zero
+
+
+def acdcnrpf(pcase, x0=None, stats=None, callback=None):
+    """
+    Solves a prepared ac/dc case with the unified Newton-Raphson method.
+
+    Solves the ac networks, the converter stations and the dc networks
+    simultaneously with a single Newton-Raphson iteration. The converter
+    transformers, filters and reactors are included in an extended ac
+    network (see MAKEYBUSCONV) and the unknowns are the voltage angles and
+    magnitudes of the ac buses, filter and converter nodes together with
+    the dc bus voltages. Besides the ac and dc power balance equations,
+    every converter adds an active power equation (power set-point for
+    converters in constant power control, dc side power balance including
+    the converter losses for dc slack and droop converters) and, for
+    converters in PQ control, a reactive power equation.
+
+    If ac converter limits are enforced, the set-point of the converter
+    with the largest violation in every dc grid is adapted after the
+    solution and the case is solved again, until no limits are violated.
+
+    Takes the same inputs and returns the same outputs as SOLVEACDCPF. The
+    iteration counter in the state is the number of Newton-Raphson
+    iterations. Used by SOLVEACDCPF when the option ALGACDC is 2. The
+    statistics in STATS hold the power balance mismatch of every
+    Newton-Raphson iteration and CALLBACK is called after each of them.
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+
+    t0 = perf_counter()
+
+    ## solution statistics
+    if stats is None and callback is not None:
+        stats = {}
+    if stats is not None and 'time' not in stats:
+        acdcstats(stats)
+    tlimits = 0.
+
+    ## options
+    pacdcopt = pcase['pacdcopt']
+
+    tolacdc = pacdcopt["TOLACDC"]
+    itmaxacdc = pacdcopt["ITMAXACDC"]
+    limac = pacdcopt["LIMAC"]
+    tollim = pacdcopt["TOLLIM"]
+    vsmq = pacdcopt["LIMVSMQ"]
+    output = pacdcopt["OUTPUT"]
+    convplotopt = pacdcopt["CONVPLOTOPT"]
+
+    ## prepared case data (copies of the data altered by the solution)
+    baseMVA, bus, gen = pcase['baseMVA'], pcase['bus'], pcase['gen']
+    branch = pcase['branch'].copy()
+    busdc, pol = pcase['busdc'], pcase['pol']
+    convdc = pcase['convdc'].copy()
+    i2edc = pcase['i2edc']
+
+    bdci, cdci = pcase['bdci'], pcase['cdci']
+    slackdc, droopdc = pcase['slackdc'], pcase['droopdc']
+    slackdroopdc, noslackbdc = pcase['slackdroopdc'], pcase['noslackbdc']
+    ngriddc = pcase['ngriddc']
+
+    busVSC = pcase['busVSC'].copy()
+    gendm = pcase['gendm'].copy()
+    genPQi = pcase['genPQi']
+
+    lossa, lossb = pcase['lossa'], pcase['lossb']
+    losscr, lossci = pcase['losscr'], pcase['lossci']
+    Zc, Ztf, Bf = pcase['Zc'], pcase['Ztf'], pcase['Bf']
+    Icmax, Vcmax, Vcmin = pcase['Icmax'], pcase['Vcmax'], pcase['Vcmin']
+    convenv = pcase['convenv']  ## cached converter capability charts
+
+    Ybusdc, Yfdc = pcase['Ybusdc'], pcase['Yfdc']
+
+    ## converter stations power injections into ac network
+    Pvsc = convdc[:,PCONV]/baseMVA
+    Qvsc = convdc[:,QCONV]/baseMVA
+
+    ## dc voltage droop setpoints and parameters
+    PVdroop = ones(busdc.shape[0])
+    Pdcset = zeros(busdc.shape[0])
+    Vdcset = zeros(busdc.shape[0])
+    dVdcset = zeros(busdc.shape[0])
+
+    PVdroop[droopdc] = convdc[droopdc,DROOP]*baseMVA
+    Pdcset[cdci] = convdc[cdci,PDCSET]/baseMVA
+    Vdcset[cdci] = convdc[cdci,VDCSET]
+    dVdcset[cdci] = convdc[cdci,DVDCSET]
+
+    ## voltage droop converter power initialisation
+    Pvsc[droopdc] = Pdcset[droopdc]
+
+    ## dc slack converter power injection initialisation
+    if slackdc.size != 0:
+        for ii in arange(1,ngriddc+1):
+            slackdcii = intersect1d(where(busdc[:,GRIDDC]==ii)[0],\
+                            where(convdc[:,CONVTYPE_DC]==DCSLACK)[0])
+            if slackdcii.size != 0:
+                Pvscii = Pvsc*(equal(busdc[:,GRIDDC],ii)* \
+                        not_equal(convdc[:,CONVTYPE_DC],DCSLACK))
+                Pvsc[slackdcii] = -Pvscii.sum()/slackdcii.shape[0]
+
+    ##-----  extended ac network  -----
+    ## ac network with PYPOWER (zero-based) internal bus numbering
+    nb = bus.shape[0]
+    ng = gen.shape[0]
+    bus0 = bus.copy()
+    bus0[:,BUS_I] = bus0[:,BUS_I] - 1
+    gen0 = gen.copy()
+    gen0[:,GEN_BUS] = gen0[:,GEN_BUS] - 1
+    if branch.shape[1] < QT+1:
+        branch = c_[branch, zeros((branch.shape[0], QT+1-branch.shape[1]))]
+    branch0 = branch.copy()
+    branch0[:,[F_BUS, T_BUS]] = branch0[:,[F_BUS, T_BUS]] - 1
+    Ybus, Yf, Yt = makeYbus(baseMVA, bus0, branch0)
+
+    ## ac network including converter transformers, filters and reactors
+    Yext, Ys, fnode, cnode = makeYbusconv(Ybus, cdci, Zc, Ztf, Bf)
+    nn = Yext.shape[0]      ## number of nodes
+    nc = cdci.size          ## number of converters
+    nbdc = busdc.shape[0]   ## number of dc buses
+    tf1i = where(Ztf[cdci] != 0)[0]
+    fnode1 = fnode[tf1i]    ## filter nodes (converters with transformer)
+
+    ## specified node injections (converter nodes have no injections)
+    Sspec = zeros(nn, dtype=complex)
+    Sspec[:nb] = makeSbus(baseMVA, bus0, gen0)
+
+    ## buses of ac zones consisting of a single (infinite) bus
+    _, zonei, zonen = unique(bus[:,ZONE], return_inverse=True, \
+                             return_counts=True)
+    infbus = zonen[zonei] == 1
+
+    ## connection matrices of the converter nodes
+    Cs = csr_matrix((ones(nc), (arange(nc), cdci)), (nc, nn))
+    Cc = csr_matrix((ones(nc), (arange(nc), cnode)), (nc, nn))
+    Cdc = csr_matrix((ones(nc), (cdci, arange(nc))), (nbdc, nc))
+
+    ##-----  initialisation  -----
+    ## ac bus voltages
+    if x0 is not None:
+        V = x0['V'].copy()
+    else:
+        V = busVSC[:,VM]*exp(j*busVSC[:,VA]*pi/180)
+    genVSC = r_[gen, gendm]
+    gon = where((genVSC[:,GEN_STATUS] > 0) & \
+                ~infbus[genVSC[:,GEN_BUS].astype(int)-1])[0]
+    gbus = genVSC[gon,GEN_BUS].astype(int)-1
+    V[gbus] = genVSC[gon,VG]/abs(V[gbus])*V[gbus]
+
+    ## converter filter and converter node voltages
+    if x0 is not None:
+        Vf = x0['Vf'][cdci]
+        Vc = x0['Vc'][cdci]
+    else:
+        Ss = Pvsc[cdci] + j*Qvsc[cdci]
+        Vs = V[cdci]
+        Itf = conj(Ss/Vs)         ## transformer current
+        Vf = Vs + Itf*Ztf[cdci]   ## filter side voltage
+        Ssf = Vf*conj(Itf)        ## filter side transformer complex power
+        Qf = -Bf[cdci]*abs(Vf)**2 ## filter reactive power
+        Scf = Ssf + j*Qf          ## filter side converter complex power
+        Ic = conj(Scf/Vf)         ## converter current
+        Vc = Vf + Ic*Zc[cdci]     ## converter side voltage
+    Vn = r_[V, Vf[tf1i], Vc]
+
+    ## dc bus voltages
+    if x0 is not None:
+        Vdc = x0['Vdc'].copy()
+    else:
+        Vdc = busdc[:,VDC].copy()
+
+    ##-----  limit iteration loop  -----
+    it = 0
+    itlim = 0
+    converged = 0
+    while itlim <= itmaxacdc:
+        itlim += 1
+
+        ## converter control modes
+        slacki = where(isin(cdci, slackdroopdc))[0]         ## slack/droop
+        noslacki = where(~isin(cdci, slackdroopdc))[0]      ## constant power
+        pqci = where(convdc[cdci,CONVTYPE_AC] == PQC)[0]     ## PQ control
+        droopi = where(isin(cdci, droopdc))[0]
+
+        ## equations and unknowns
+        acref = where((busVSC[:,BUS_TYPE] == REF) | infbus)[0]
+        acpv = where((busVSC[:,BUS_TYPE] != PQ) | infbus)[0]
+        acpq = where((bus[:,BUS_TYPE] == PQ) & ~infbus)[0]
+        pn = r_[setdiff1d(arange(nb), acref), fnode1]   ## P balance nodes
+        qn = r_[acpq, fnode1]                           ## Q balance nodes
+        van = setdiff1d(arange(nn), acref)              ## angle unknowns
+        vmn = setdiff1d(arange(nn), acpv)               ## magnitude unknowns
+        nva = van.size
+        nvm = vmn.size
+
+        ## dc grid constant power converter injections
+        Cdcnoslack = Cdc[:,noslacki]
+
+        ##-----  Newton-Raphson iteration  -----
+        convergednr = 0
+        itnr = 0
+        while not convergednr and itnr < itmaxacdc:
+            ## node injections and converter powers
+            Scalc = Vn*conj(Yext*Vn)
+            Ss = Vn[cdci]*conj(Ys*Vn)
+            Sc = Scalc[cnode]
+            Pc = real(Sc)
+            Qc = imag(Sc)
+            Vcm = abs(Vn[cnode])
+
+            ## converter losses
+            Scm = abs(Sc)
+            Ic = Scm/Vcm
+            lossc = (Pc >= 0)*losscr[cdci] + (Pc < 0)*lossci[cdci]
+            Ploss = lossa[cdci] + lossb[cdci]*Ic + lossc*Ic**2
+
+            ## dc network power injections and droop characteristics
+            Pdccalc = pol*Vdc*(Ybusdc*Vdc)
+            Vdcsetlh = (abs(Vdc-Vdcset)<=dVdcset)*Vdc + \
+                    ((Vdc-Vdcset)>dVdcset)*(Vdcset + dVdcset) + \
+                    ((Vdc-Vdcset)<-dVdcset)*(Vdcset-dVdcset)
+            Pdcconv = Cdcnoslack*(Pc[noslacki] + Ploss[noslacki])
+            Pdcconv[cdci[droopi]] = (Vdc[cdci[droopi]] - \
+                Vdcsetlh[cdci[droopi]])/PVdroop[cdci[droopi]] + \
+                Pdcset[cdci[droopi]]
+
+            ## mismatch vector
+            F = r_[real(Scalc[pn] - Sspec[pn]),
+                   imag(Scalc[qn] - Sspec[qn]),
+                   real(Ss[noslacki]) - Pvsc[cdci[noslacki]],
+                   Pc[slacki] + Ploss[slacki] + Pdccalc[cdci[slacki]],
+                   imag(Ss[pqci]) - Qvsc[cdci[pqci]],
+                   Pdccalc[noslackbdc] + Pdcconv[noslackbdc]]
+
+            ## solution statistics
+            if stats is not None:
+                stats['mismatch'].append(abs(F).max())
+                if callback is not None:
+                    callback(stats)
+
+            ## convergence check
+            if abs(F).max() < tolacdc:
+                convergednr = 1
+                break
+
+            ## update iteration counter
+            itnr += 1
+
+            ## node injection derivatives
+            dS_dVm, dS_dVa = dSbus_dV(Yext, Vn)
+
+            ## grid side converter power derivatives
+            Is = Ys*Vn
+            dSs_dVa = j*(diags(conj(Is))*Cs*diags(Vn) - \
+                    diags(Vn[cdci])*conj(Ys*diags(Vn)))
+            dSs_dVm = diags(conj(Is))*Cs*diags(Vn/abs(Vn)) + \
+                    diags(Vn[cdci])*conj(Ys*diags(Vn/abs(Vn)))
+
+            ## converter side power and loss derivatives
+            dSc_dVa = dS_dVa[cnode,:]
+            dSc_dVm = dS_dVm[cnode,:]
+            rScm = (Scm > eps)/(Scm + eps)
+            dIc_dVa = diags(rScm/Vcm)*(diags(Pc)*real(dSc_dVa) + \
+                    diags(Qc)*imag(dSc_dVa))
+            dIc_dVm = diags(rScm/Vcm)*(diags(Pc)*real(dSc_dVm) + \
+                    diags(Qc)*imag(dSc_dVm)) - diags(Ic/Vcm)*Cc
+            dPl_dIc = diags(lossb[cdci] + 2*lossc*Ic)
+            dPdc_dVa = real(dSc_dVa) + dPl_dIc*dIc_dVa
+            dPdc_dVm = real(dSc_dVm) + dPl_dIc*dIc_dVm
+
+            ## dc network derivatives
+            dPdc_dVdc = pol*(diags(Ybusdc*Vdc) + diags(Vdc)*Ybusdc)
+            droopdiag = zeros(nbdc)
+            droopdiag[cdci[droopi]] = (abs(Vdc[cdci[droopi]] - \
+                Vdcset[cdci[droopi]]) > dVdcset[cdci[droopi]]) / \
+                PVdroop[cdci[droopi]]
+            dPdc_dVdc = csr_matrix(dPdc_dVdc + diags(droopdiag))
+
+            ## Jacobian matrix
+            Jva = vstack([real(dS_dVa[pn,:]), imag(dS_dVa[qn,:]),
+                          real(dSs_dVa[noslacki,:]), dPdc_dVa[slacki,:],
+                          imag(dSs_dVa[pqci,:]),
+                          (Cdcnoslack*dPdc_dVa[noslacki,:])[noslackbdc,:]],
+                         format="csc")[:,van]
+            Jvm = vstack([real(dS_dVm[pn,:]), imag(dS_dVm[qn,:]),
+                          real(dSs_dVm[noslacki,:]), dPdc_dVm[slacki,:],
+                          imag(dSs_dVm[pqci,:]),
+                          (Cdcnoslack*dPdc_dVm[noslacki,:])[noslackbdc,:]],
+                         format="csc")[:,vmn]
+            nac = F.size - noslackbdc.size
+            Jvdc = vstack([csr_matrix((nac - slacki.size - pqci.size - \
+                                       noslacki.size, nbdc)),
+                           csr_matrix((noslacki.size, nbdc)),
+                           dPdc_dVdc[cdci[slacki],:],
+                           csr_matrix((pqci.size, nbdc)),
+                           dPdc_dVdc[noslackbdc,:]],
+                          format="csc")[:,noslackbdc]
+            J = hstack([Jva, Jvm, Jvdc], format="csc")
+
+            ## calculate correction terms
+            dx = -spsolve(J, F)
+
+            ## update voltages
+            Va = angle(Vn)
+            Vm = abs(Vn)
+            Va[van] = Va[van] + dx[:nva]
+            Vm[vmn] = Vm[vmn] + dx[nva:nva+nvm]
+            Vn = Vm*exp(j*Va)
+            Vdc[noslackbdc] = Vdc[noslackbdc] + dx[nva+nvm:]
+
+        it += itnr
+
+        ## grid side converter powers
+        Ss = zeros(nbdc, dtype=complex)
+        Ss[cdci] = Vn[cdci]*conj(Ys*Vn)
+        Vs = Vn[bdci]
+        V = Vn[:nb]
+
+        ##----- Converter calculations -----
+        ## converter reactor voltages and power
+        Itf = conj(Ss/Vs)         ## transformer current
+        Vf = Vs + Itf*Ztf       ## filter side voltage
+        Ssf = Vf*conj(Itf)        ## filter side transformer complex power
+        Qf = -Bf*abs(Vf)**2      ## filter reactive power
+        Scf = Ssf + j*Qf             ## filter side converter complex power
+        Ic = conj(Scf/Vf)        ## converter current
+        Vc = Vf + Ic*Zc          ## converter side voltage
+        Sc = Vc*conj(Ic)         ## converter side complex power
+
+        if not convergednr:
+            break
+        converged = 1
+
+        if limac != 1:
+            break
+
+        ##--- converter limit check ---
+        t1 = perf_counter()
+        ## initialisation
+        limviol = zeros((busdc.shape[0]))
+        SsL     = zeros((busdc.shape[0]),dtype=complex)
+        plotarg = zeros((busdc.shape[0],17),dtype=complex)
+        limchange = 0
+
+        ## remove slack converters and converter outages from limit check
+        cdcl = setdiff1d(arange(busdc.shape[0]), slackdc)
+        cdcl = cdcl[convdc[cdcl,CONV_BUS] != 0]
+
+        ## converter limit check (all grids at once)
+        limviol[cdcl], SsL[cdcl], plotarg[cdcl,:] = convlimvec(Ss[cdcl], \
+            Vs[cdcl], Vc[cdcl], Ztf[cdcl], Bf[cdcl], Zc[cdcl], \
+            Icmax[cdcl], Vcmax[cdcl], Vcmin[cdcl], i2edc[cdcl+1], \
+            tollim, convplotopt, convenv, vsmq)
+
+        for ii in arange(1,ngriddc+1):
+            ## converter limit violations (1 = Q limit, 2 = P limit)
+            limviolii = limviol*(busdc[:,GRIDDC] == ii)
+            dSii = (SsL-Ss)*(busdc[:,GRIDDC] == ii)*(convdc[:,CONVTYPE_DC] != DCSLACK)
+            if not ((2 in limviolii) or (1 in limviolii)):
+                continue
+            limchange = 1
+            if 2 in limviolii:
+                dSii = dSii*(limviolii==2)
+                dSiimaxi = argmax(abs(real(dSii)))
+                stdout.write('\n  Active power setpoint of converter %d changed from %.2f MW to %.2f MW.'%( \
+                    i2edc[dSiimaxi+1], real(Ss[dSiimaxi])*baseMVA, real(SsL[dSiimaxi])*baseMVA))
+                stdout.write('\n  Reactive power setpoint of converter %d changed from %.2f MVAr to %.2f MVAr.\n'%(\
+                    i2edc[dSiimaxi+1], imag(Ss[dSiimaxi])*baseMVA, imag(SsL[dSiimaxi])*baseMVA))
+            else:
+                dSii = dSii*(limviolii==1)
+                dSiimaxi = argmax(abs(imag(dSii)))
+                stdout.write('\n  Reactive power setpoint of converter %d changed from %.2f MVAr to %.2f MVAr. \n'%(\
+                    i2edc[dSiimaxi+1], imag(Ss[dSiimaxi])*baseMVA, imag(SsL[dSiimaxi])*baseMVA))
+
+            ## plot converter setpoint adaptation
+            if convplotopt != 0 :
+                from pyacdcpf.convlimplot import convlimplot ## imports matplotlib
+                convlimplot(plotarg[dSiimaxi,:], i2edc[dSiimaxi])
+
+            ## update converter powers
+            Pvsc[dSiimaxi] = real(SsL[dSiimaxi])
+            Qvsc[dSiimaxi] = imag(SsL[dSiimaxi])
+
+            ## Remove voltage control on violated converter
+            if convdc[dSiimaxi, CONVTYPE_AC] == PVC:
+                convdc[dSiimaxi, CONVTYPE_AC] = PQC
+                busVSC[dSiimaxi, BUS_TYPE] = PQ
+                stdout.write('  Voltage control at converter bus %d removed.\n'% i2edc[dSiimaxi+1])
+
+            ## Remove droop control on violated converter
+            if convdc[dSiimaxi, CONVTYPE_DC] == DCDROOP:
+                convdc[dSiimaxi, CONVTYPE_DC] = DCNOSLACK
+                droopdc = setdiff1d(droopdc,dSiimaxi)
+                slackdroopdc = setdiff1d(slackdroopdc,dSiimaxi)
+                stdout.write('  Droop control at converter bus %d disabled.\n'%i2edc[dSiimaxi+1])
+
+        tlimits += perf_counter() - t1
+        if not limchange:
+            break
+
+    ## converter active and reactive powers
+    Ps = real(Ss)
+    Qs = imag(Ss)
+    Pc = real(Sc)
+    Qc = imag(Sc)
+    Qcf = imag(Scf)
+    Psf = real(Ssf)
+    Qsf = imag(Ssf)
+
+    ## converter losses and dc side power
+    Ploss = calclossac(Pc, Qc, Vc, lossa, lossb, losscr, lossci)
+    Pdc = zeros(busdc.shape[0])
+    Pdc[cdci] = Pc[cdci] + Ploss[cdci]
+    Pdc[slackdroopdc] = -pol*Vdc[slackdroopdc]*(Ybusdc[slackdroopdc,:]*Vdc)
+
+    ## calculate dc line powers
+    Ifdc = Yfdc*Vdc ## current through dc lines
+    Vdcf = Vdc[pcase['brchdcf']]
+    Vdct = Vdc[pcase['brchdct']]
+    Pfdc = pol*Vdcf*Ifdc ## power at the "from" bus
+    Ptdc = pol*Vdct*(-Ifdc) ## power at the "to" bus
+
+    ##-----  ac network solution  -----
+    ## converters as loads for the generator and branch flow update
+    busVSC[cdci,PD] = bus[cdci,PD] - Ps[cdci]*baseMVA
+    busVSC[cdci,QD] = bus[cdci,QD] - Qs[cdci]*baseMVA
+    busVSC0 = busVSC.copy()
+    busVSC0[:,BUS_I] = busVSC0[:,BUS_I] - 1
+    genVSC0 = genVSC.copy()
+    genVSC0[:,GEN_BUS] = genVSC0[:,GEN_BUS] - 1
+    ref, pv, pq = bustypes(busVSC0, genVSC0)
+    busVSC0, genVSC0, branch0 = pfsoln(baseMVA, busVSC0, genVSC0, branch0, \
+            Ybus, Yf, Yt, V, ref, pv, pq)
+
+    ## generators of infinite buses are not updated
+    ginf = where(infbus[genVSC[:,GEN_BUS].astype(int)-1])[0]
+    genVSC0[ginf,:] = genVSC[ginf,:]
+    genVSC0[:,GEN_BUS] = genVSC[:,GEN_BUS]
+    genVSC = genVSC0
+    branch0[:,[F_BUS, T_BUS]] = branch[:,[F_BUS, T_BUS]]
+    branch = branch0
+    busVSC[~infbus,VM] = abs(V[~infbus])
+    busVSC[~infbus,VA] = angle(V[~infbus])*180/pi
+
+    ## converter reactive power set-points as loads (as in SOLVEACDCPF)
+    busVSC[cdci,QD] = bus[cdci,QD] - Qvsc[cdci]*baseMVA
+
+    ## generator reset
+    genVSC[ng:,QG] = 0
+    genVSC[genPQi,QG] = gen[genPQi,QG]
+
+    ##-----  Post processing  -----
+    ## convergence
+    if converged:
+        if output:
+            stdout.write('\nUnified Newton-Raphson method converged in %d iterations\n'%it)
+    else:
+        stdout.write('\nUnified Newton-Raphson method did NOT converge after %d iterations\n'%it)
+
+    ## converter limit check
+    if limac == 1:
+        t1 = perf_counter()
+        limviol, _, plotarg = convlimvec(Ss[cdci], Vs[cdci], Vc[cdci], Ztf[cdci], \
+            Bf[cdci], Zc[cdci], Icmax[cdci], Vcmax[cdci], Vcmin[cdci], i2edc[cdci+1], \
+            tollim, 1, convenv, vsmq)
+        for ii, cvii in enumerate(cdci):
+            if limviol[ii] != 0:     ## limits are hit
+                if (convdc[cvii,CONVTYPE_DC] == DCSLACK):
+                    stdout.write('\n  Slackbus converter %d is operating outside its limits.\n'%i2edc[cvii+1])
+                elif (convdc[cvii,CONVTYPE_DC] == DCNOSLACK):
+                    stdout.write('\n  Converter %d is operating outside its limits.\n'%i2edc[cvii+1])
+            if convplotopt == 2 :
+                from pyacdcpf.convlimplot import convlimplot ## imports matplotlib
+                convlimplot(plotarg[ii,:], i2edc[cvii])
+        tlimits += perf_counter() - t1
+
+    if stats is not None:
+        stats['it'] += it
+        stats['time']['limits'] += tlimits
+        stats['time']['solve'] += perf_counter() - t0
+
+    ##-----  solution state  -----
+    state = {
+        'bus': busVSC, 'gen': genVSC, 'branch': branch, 'convdc': convdc,
+        'V': busVSC[:,VM]*exp(j*busVSC[:,VA]*pi/180),
+        'Vdc': Vdc, 'Pdc': Pdc, 'Ps': Ps, 'Qs': Qs, 'Vc': Vc, 'Pc': Pc,
+        'Qc': Qc, 'Ploss': Ploss, 'Vf': Vf, 'Psf': Psf, 'Qsf': Qsf,
+        'Qcf': Qcf, 'Pfdc': Pfdc, 'Ptdc': Ptdc, 'it': it,
+    }
+
+    return state, converged
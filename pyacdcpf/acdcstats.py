@@ -0,0 +1,60 @@
+"""Initialises the solution statistics of an ac/dc power flow.
+"""
+
+
+def acdcstats(stats=None):
+    """
+    Initialises the solution statistics of an ac/dc power flow.
+
+    Returns the dict C{stats} (a new dict if not given), with all fields
+    reset. The fields are filled by RUNACDCPF, SOLVEACDCPF and ACDCNRPF:
+        time : wall time (s) per stage
+            prepare : data preparation (see PREPACDCPF)
+            aczones : ac zone power flows
+            dcnetwork : dc network power flows
+            slackdroop : slack and droop converter calculations
+            limits : converter limit checks
+            solve : complete solution, including the above
+            int2ext : internal to external conversion
+            printing : printing the results
+            total : all of the above
+        it : number of outer iterations (Newton-Raphson iterations for the
+            unified method)
+        mismatch : list with the largest mismatch of every outer iteration
+            (converter active power for the sequential method, power
+            balance for the unified method)
+        itdc : list with the number of dc network iterations per outer
+            iteration
+        mismatchdc : list with, per outer iteration, the list of the
+            largest dc voltage corrections of every dc network iteration
+        itslackdroop : list with the number of slack/droop loss iterations
+            per outer iteration
+        mismatchslackdroop : list with, per outer iteration, the list of
+            the largest converter power changes of every slack/droop loss
+            iteration
+        timezones : list with, per outer iteration, the array of solution
+            times of every ac zone (see SOLVEACZONES)
+        itzones : list with, per outer iteration, the array of Newton or
+            fast-decoupled iterations of every ac zone (see SOLVEACZONES)
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+    if stats is None:
+        stats = {}
+
+    stats.update({
+        'time': dict([(stage, 0.) for stage in ['prepare', 'aczones',
+            'dcnetwork', 'slackdroop', 'limits', 'solve', 'int2ext',
+            'printing', 'total']]),
+        'it': 0,
+        'mismatch': [],
+        'itdc': [],
+        'mismatchdc': [],
+        'itslackdroop': [],
+        'mismatchslackdroop': [],
+        'timezones': [],
+        'itzones': [],
+    })
+
+    return stats
@@ -0,0 +1,150 @@
+"""Applies element outages to a prepared ac/dc case.
+"""
+
+from numpy import ones, zeros, arange, where, asarray, unique
+
+from scipy.sparse import csr_matrix, diags
+from scipy.sparse.linalg import splu
+from scipy.sparse.csgraph import connected_components
+
+from pypower.loadcase import loadcase
+from pypower.idx_brch import BR_STATUS
+
+from pyacdcpf.idx_busdc import GRIDDC
+from pyacdcpf.idx_brchdc import BRDC_STATUS
+from pyacdcpf.idx_convdc import CONVSTATUS
+from pyacdcpf.idx_convdcdc import STATUS_DCDC
+
+from pyacdcpf.loadcasedc import loadcasedc
+from pyacdcpf.prepacdcpf import prepacdcpf
+from pyacdcpf.makeYbusdc import makeYbusdc
+from pyacdcpf.makegridmap import makegridmap
+
+## outage types and status columns in the input case data
+OUTAGES = {
+    'branch': ('ac', 'branch', BR_STATUS),
+    'branchdc': ('dc', 'branchdc', BRDC_STATUS),
+    'convdc': ('dc', 'convdc', CONVSTATUS),
+    'convdcdc': ('dc', 'convdcdc', STATUS_DCDC),
+}
+
+
+def applyoutage(pcase, outage, caseac=None, casedc=None):
+    """
+    Applies element outages to a prepared ac/dc case.
+
+    Returns the prepared case (see PREPACDCPF) of the case C{pcase} with
+    the elements in C{outage} out of service. C{outage} is a tuple
+    C{(type, row)} or a list of such tuples, with the row of the element in
+    the input case files and the type one of:
+        branch   : ac branch
+        branchdc : dc branch
+        convdc   : ac/dc converter
+        convdcdc : dc-dc converter
+
+    Outages of ac branches, dc branches and dc-dc converters reuse the
+    prepared topology: ac branches and dc-dc converters are switched off
+    (status columns) and the dc branch and dc-dc converter admittances are
+    subtracted from the dc bus admittance matrix. The dc Jacobian keeps its
+    ordering. If the prepared dc Jacobian holds a factorisation (field Jr,
+    e.g. of the solution of the base case, see SOLVEACDCPF), the dc network
+    power flows of the outage case are solved by low-rank (Woodbury) updates of
+    that factorisation instead of new factorisations (see LOWRANKDCJAC).
+    If the outages split a dc grid into islands, the dc grids (column
+    GRIDDC of busdc) are renumbered, every island becoming a dc grid.
+    Every island then needs its own dc slack or droop converter.
+
+    Converter outages change the converter control modes and dummy
+    generators, so the case is prepared again from the input case data
+    C{caseac} and C{casedc} with the outages applied.
+
+    The prepared case C{pcase} is not modified. Elements that are already
+    out of service are ignored.
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+    if isinstance(outage, tuple):
+        outage = [outage]
+
+    ## converter outages: prepare the case again
+    if 'convdc' in [kind for kind, _ in outage]:
+        ppc = loadcase(caseac)
+        pdc = loadcasedc(casedc)
+        for kind, k in outage:
+            side, name, status = OUTAGES[kind]
+            case = ppc if side == 'ac' else pdc
+            case[name][k,status] = 0
+        return prepacdcpf(ppc, pdc, pcase['pacdcopt'], pcase['ppopt'])
+
+    ## other outages: update the prepared case
+    pcasek = dict(pcase)
+    nbdc = pcase['busdc'].shape[0]
+    brchdcf, brchdct = asarray(pcase['brchdcf']), asarray(pcase['brchdct'])
+    Yfdc, Ytdc = pcase['Yfdc'], pcase['Ytdc']
+    dYbusdc = csr_matrix((nbdc, nbdc)) ## admittances out of service
+    brchdc1 = ones(Yfdc.shape[0])
+    for kind, k in outage:
+        if kind == 'branch':
+            r = where(pcase['brchi'] == k)[0]
+            pcasek['branch'] = pcasek['branch'].copy()
+            pcasek['branch'][r,BR_STATUS] = 0
+        elif kind == 'branchdc':
+            ## admittance of the branch: Cf'*Yf + Ct'*Yt (rows of the branch)
+            r = where(pcase['brchdci'] == k)[0]
+            r = r[brchdc1[r] == 1]
+            Cf = csr_matrix((ones(r.size), (arange(r.size), brchdcf[r])),
+                            (r.size, nbdc))
+            Ct = csr_matrix((ones(r.size), (arange(r.size), brchdct[r])),
+                            (r.size, nbdc))
+            dYbusdc = dYbusdc + Cf.T*Yfdc[r,:] + Ct.T*Ytdc[r,:]
+            brchdc1[r] = 0
+        elif kind == 'convdcdc':
+            r = where(pcase['convdcdci'] == k)[0]
+            pcasek['convdcdc'] = pcasek['convdcdc'].copy()
+            pcasek['convdcdc'][r,STATUS_DCDC] = 0
+            dYbusdc = dYbusdc + makeYbusdc(pcase['busdc'],
+                pcase['branchdc'][:0,:], pcase['convdcdc'][r,:])[0]
+        else:
+            raise ValueError('unknown outage type %s' % kind)
+
+    if dYbusdc.nnz == 0:
+        return pcasek
+
+    ## dc network matrices without the dc branches that are out of service
+    Ybusdc = (pcase['Ybusdc'] - dYbusdc).tocsr()
+    pcasek['Yfdc'] = diags(brchdc1)*Yfdc
+    pcasek['Ytdc'] = diags(brchdc1)*Ytdc
+    pcasek['Ybusdc'] = Ybusdc
+
+    ## reduced dc Jacobian in the prepared ordering
+    dcjac = pcase['dcjac']
+    ns = dcjac['ns']
+    dYr = dYbusdc.tocsr()[ns,:][:,ns]
+    Yr = (dcjac['Yr'] - dYr).tocsc()
+    pcasek['dcjac'] = dict(dcjac, Yr=Yr, lu=None, age=0, Jr=None, KC=None,
+                           base=None)
+
+    ## low-rank update of the base factorisation (terminal buses S)
+    S = unique(dYr.nonzero()[0])
+    if dcjac.get('Jr') is not None and S.size > 0:
+        lu = dcjac['lu'] if dcjac['lu'] is not None else \
+             splu(dcjac['Jr'], permc_spec='NATURAL')
+        E = zeros((ns.size, S.size))
+        E[S, arange(S.size)] = 1
+        pcasek['dcjac']['base'] = {
+            'lu': lu, 'S': S, 'Z': lu.solve(E),
+            'JSS': dcjac['Jr'][S,:][:,S].toarray(),
+            'YSS': Yr[S,:][:,S].toarray(),
+        }
+
+    ## dc grids split into islands
+    ncomp, comp = connected_components(Ybusdc, directed=False)
+    if ncomp > unique(pcase['busdc'][:,GRIDDC]).size:
+        pcasek['busdc'] = pcase['busdc'].copy()
+        pcasek['busdc'][:,GRIDDC] = comp + 1
+        pcasek['ngriddc'] = ncomp
+    pcasek['gridmap'] = makegridmap(pcasek['busdc'], Ybusdc,
+                                    pcase['slackdc'], pcase['noslackbdc'])
+
+    return pcasek
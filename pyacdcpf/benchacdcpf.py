@@ -0,0 +1,145 @@
+"""Benchmarks the stages of the ac/dc power flow on synthetic test systems.
+"""
+
+import json
+from sys import argv
+from io import StringIO
+from time import perf_counter
+from importlib import import_module
+from platform import python_version, platform
+
+import numpy
+import scipy
+
+from pypower.loadcase import loadcase
+
+from pyacdcpf.loadcasedc import loadcasedc
+from pyacdcpf.prepacdcpf import prepacdcpf
+from pyacdcpf.solveacdcpf import solveacdcpf
+from pyacdcpf.int2extacdc import int2extacdc
+from pyacdcpf.printpf import printpf
+from pyacdcpf.printdcpf import printdcpf
+from pyacdcpf.pacdcoption import pacdcoption
+from pyacdcpf.acdcstats import acdcstats
+from pyacdcpf.makesynthacdc import makesynthacdc
+
+## default benchmark systems (arguments of MAKESYNTHACDC)
+SYSTEMS = [
+    {'nbus': 118, 'nconv': 6},
+    {'nbus': 1000, 'nconv': 20, 'nzones': 2, 'ngriddc': 2, 'nconvdcdc': 2},
+    {'nbus': 10000, 'nconv': 100, 'nzones': 4, 'ngriddc': 4, 'nconvdcdc': 4},
+]
+
+def benchacdcpf(systems=None, pacdcopt=None, repeat=3, fname=None):
+    """
+    Benchmarks the stages of the ac/dc power flow on synthetic test systems.
+
+    Every system in C{systems} (a list of dicts with the arguments of
+    MAKESYNTHACDC, default SYSTEMS) is solved C{repeat} times with the
+    sequential ac/dc power flow and the options C{pacdcopt} (default:
+    converter limits enforced, no output). The time spent in every stage
+    is measured, the fastest of the repetitions being reported:
+        load : loading the case data
+        prepare : data preparation (see PREPACDCPF)
+        aczones : ac zone power flows
+        dcnetwork : dc network power flows
+        slackdroop : slack and droop converter calculations
+        limits : converter limit checks
+        solve : complete solution (see SOLVEACDCPF), including the above
+        int2ext : internal to external conversion
+        printing : printing the results (to a string buffer)
+        total : all of the above
+    The times of the solution stages are taken from the solution
+    statistics of SOLVEACDCPF (see ACDCSTATS).
+
+    Returns a dict with the versions, options and, for every system, its
+    size, convergence, number of outer iterations and stage times (s). If
+    C{fname} is given, the results are also written to that file as JSON,
+    such that the throughput can be tracked over releases.
+
+    Example:
+        python -m pyacdcpf.benchacdcpf bench.json
+    """
+    if systems is None:
+        systems = SYSTEMS
+    if pacdcopt is None:
+        pacdcopt = pacdcoption(OUTPUT=0, LIMAC=1)
+
+    results = {
+        'python': python_version(), 'platform': platform(),
+        'numpy': numpy.__version__, 'scipy': scipy.__version__,
+        'repeat': repeat,
+        'pacdcopt': dict([(k, v) for k, v in pacdcopt.items()
+                          if isinstance(v, (int, float, str))]),
+        'systems': [],
+    }
+
+    for args in systems:
+        caseac, casedc = makesynthacdc(**args)
+        best = None
+        for r in range(repeat):
+            times, state, converged = _runstages(caseac, casedc, pacdcopt)
+            if best is None or times['total'] < best['total']:
+                best = times
+        results['systems'].append({
+            'args': args,
+            'nbus': int(caseac['bus'].shape[0]),
+            'nbranch': int(caseac['branch'].shape[0]),
+            'nbusdc': int(casedc['busdc'].shape[0]),
+            'nbranchdc': int(casedc['branchdc'].shape[0]),
+            'converged': bool(converged),
+            'iterations': int(state['it']),
+            'times': best,
+        })
+
+    if fname is not None:
+        with open(fname, 'w') as fd:
+            json.dump(results, fd, indent=2)
+
+    return results
+
+
+def _runstages(caseac, casedc, pacdcopt):
+    """Solves a case once and returns the stage times."""
+    ## printing to a string buffer
+    printdcpfmod = import_module('pyacdcpf.printdcpf')
+    fd = StringIO()
+    stdout = printdcpfmod.stdout
+    printdcpfmod.stdout = fd
+
+    try:
+        t0 = perf_counter()
+        ppc = loadcase(caseac)
+        pdc = loadcasedc(casedc)
+        t1 = perf_counter()
+        pcase = prepacdcpf(ppc, pdc, pacdcopt)
+        t2 = perf_counter()
+        stats = acdcstats()
+        state, converged = solveacdcpf(pcase, stats=stats)
+        t3 = perf_counter()
+        resultsac, resultsdc = int2extacdc(pcase, state)
+        t4 = perf_counter()
+        printpf(resultsac['baseMVA'], resultsac['bus'], resultsac['gen'],
+                resultsac['branch'], None, converged, fd=fd)
+        printdcpf(resultsdc['busdc'], resultsdc['convdc'],
+                  resultsdc['branchdc'])
+        t5 = perf_counter()
+    finally:
+        printdcpfmod.stdout = stdout
+
+    ## solution stages from the solution statistics (see ACDCSTATS)
+    times = dict([(stage, stats['time'][stage]) for stage in
+                  ['aczones', 'dcnetwork', 'slackdroop', 'limits']])
+    times['load'] = t1 - t0
+    times['prepare'] = t2 - t1
+    times['solve'] = t3 - t2
+    times['int2ext'] = t4 - t3
+    times['printing'] = t5 - t4
+    times['total'] = t5 - t0
+
+    return times, state, converged
+
+
+if __name__ == '__main__':
+    results = benchacdcpf(fname=argv[1] if len(argv) > 1 else None)
+    print(json.dumps(results, indent=2))
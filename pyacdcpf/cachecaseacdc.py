@@ -0,0 +1,46 @@
+"""Loads an ac/dc case through a cache of binary case bundles.
+"""
+
+from os.path import basename, dirname, exists, getmtime, join, splitext
+
+from pyacdcpf.savecaseacdc import savecaseacdc
+from pyacdcpf.loadcaseacdc import loadcaseacdc
+
+
+def cachecaseacdc(caseac, casedc, cachedir=None):
+    """
+    Loads an ac/dc case through a cache of binary case bundles.
+
+    The ac and dc case files C{caseac} and C{casedc} ('.py' or '.mat',
+    with or without extension, see LOADCASE and LOADCASEDC) are converted
+    to a binary case bundle (see SAVECASEACDC) on first use. Later calls
+    load the bundle with LOADCASEACDC instead of parsing the case files,
+    as long as the bundle is newer than both case files.
+
+    The bundles are stored in C{cachedir}, by default the directory
+    '__acdccache__' next to the dc case file.
+
+    Returns the ac case dict C{ppc} and the dc case dict C{pdc}.
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+    ## case files (extension-less names as in LOADCASE and LOADCASEDC)
+    files = []
+    for case in [caseac, casedc]:
+        if not case.endswith(('.py', '.mat')):
+            case = case + ('.mat' if exists(case + '.mat') else '.py')
+        files.append(case)
+
+    if cachedir is None:
+        cachedir = join(dirname(files[1]), '__acdccache__')
+    fname = join(cachedir, '%s__%s.acdc' % (splitext(basename(files[0]))[0],
+                                            splitext(basename(files[1]))[0]))
+
+    ## convert case files if the bundle is missing or outdated
+    if not exists(join(fname, 'version.npy')) or \
+            getmtime(join(fname, 'version.npy')) < \
+            max([getmtime(f) for f in files]):
+        savecaseacdc(fname, files[0], files[1])
+
+    return loadcaseacdc(fname)
@@ -0,0 +1,109 @@
+"""Calculates the PQ capability chart envelopes of converters.
+"""
+
+from numpy import sqrt, abs, angle, real, imag, conj, exp, arccos, c_, zeros
+
+## define j
+## DONT USE j IN ANYWHERE ELSE!!!
+j = sqrt(-1+0j)
+
+## define the indices of the envelope columns
+MPL1R       = 0     ## center of the current limit circle, real part
+MPL1I       = 1     ## center of the current limit circle, imaginary part
+RL1         = 2     ## radius of the current limit circle
+MPL2R       = 3     ## center of the voltage limit circles, real part
+MPL2I       = 4     ## center of the voltage limit circles, imaginary part
+RL2MIN      = 5     ## radius of the lower voltage limit circle
+RL2MAX      = 6     ## radius of the upper voltage limit circle
+PMIN        = 7     ## minimum active power point, active power
+QPMIN       = 8     ## minimum active power point, reactive power
+PMAX        = 9     ## maximum active power point, active power
+QPMAX       = 10    ## maximum active power point, reactive power
+ISECTMIN    = 11    ## 1 if the lower voltage limit intersects the current limit
+ISECTMAX    = 12    ## 1 if the upper voltage limit intersects the current limit
+HIGHVCMIN   = 13    ## 1 if the lower voltage limit redefines a power point
+LOWVCMAX    = 14    ## 1 if the upper voltage limit redefines a power point
+NENV        = 15    ## number of envelope columns
+
+
+def convenv(Vsm, Ztf, Bf, Zf, Yf, Ytf, Y1, Y2, Icmax, Vcmax, Vcmin):
+    """
+    Calculates the PQ capability chart envelopes of converters.
+
+    The current limit circle, the voltage limit circles and the resulting
+    minimum and maximum active power points only depend on the converter
+    parameters and the grid voltage magnitude VSM. All inputs are vectors
+    with one element per converter, the pi-equivalent admittances Y1 and Y2
+    are defined in CONVLIM.
+
+    The intersection points of the voltage limit circles with the current
+    limit circle are determined analytically, the first intersection point
+    lying at the left (lower active power) of the line through both circle
+    centers.
+
+    Returns a matrix ENV with one row per converter, the columns are given
+    by the index constants defined in this module.
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+
+    env = zeros((Vsm.size, NENV))
+
+    ##--- voltage and current limit parameters ----
+    ## maximum current limit circle parameters
+    MPL1 = -Vsm**2*(1/(conj(Zf) + conj(Ztf)))*(Bf!=0)  ## center of the current limit
+    rL1 = Vsm*Icmax*(\
+                (Ztf!=0)*(abs(conj(Ytf)/(conj(Yf) + conj(Ytf))))\
+                + (Ztf==0)*1) ## radius of current limit circle
+
+    ## maximum and minimal active power on current limit
+    PmaxL1 = real(MPL1) + rL1
+    PminL1 = real(MPL1) - rL1
+    QPmaxL1 = imag(MPL1)
+    QPminL1 = imag(MPL1)
+
+    ## minimum and maximum voltage limit circle parameters (columns: Vcmin, Vcmax)
+    MPL2 = -Vsm**2*conj(Y1+Y2) ## center of the voltage limits
+    rL2 = (Vsm*abs(Y2))[:,None]*c_[Vcmin,Vcmax] ## radius of voltage limits
+
+    ##--- voltage limit compliance of min/max active power point ---
+    ## intersection points of Vcmin/Vcmax and current limit circles, seen
+    ## from the current limit center under the angle of the line through both
+    ## centers -/+ beta (no intersection points if |cos(beta)| > 1)
+    dL12 = sqrt((real(MPL2)-real(MPL1))**2+(imag(MPL2)-imag(MPL1))**2)[:,None]
+    alpha = angle(MPL2-MPL1)[:,None]
+    cosbeta = ((dL12**2+rL1[:,None]**2)-rL2**2)/(2*dL12*rL1[:,None])
+    isect = abs(cosbeta) <= 1
+    beta = zeros(cosbeta.shape)
+    beta[isect] = arccos(cosbeta[isect])
+    PQ1 = MPL1[:,None] + rL1[:,None]*exp(j*(alpha-beta))
+    PQ2 = MPL1[:,None] + rL1[:,None]*exp(j*(alpha+beta))
+
+    ## Define maximum and minimum power points
+    # Initialisation
+    Pmin = PminL1.copy()
+    QPmin = QPminL1.copy()
+    Pmax = PmaxL1.copy()
+    QPmax = QPmaxL1.copy()
+
+    # Redefine max and min power points if min/max voltage limits are high/low
+    hmin1 = isect[:,0] & (imag(PQ1[:,0]) > QPminL1)
+    hmin2 = isect[:,0] & (imag(PQ2[:,0]) > QPmaxL1)
+    lmax1 = isect[:,1] & (imag(PQ1[:,1]) < QPminL1)
+    lmax2 = isect[:,1] & (imag(PQ2[:,1]) < QPmaxL1)
+    Pmin[hmin1], QPmin[hmin1] = real(PQ1[hmin1,0]), imag(PQ1[hmin1,0])
+    Pmax[hmin2], QPmax[hmin2] = real(PQ2[hmin2,0]), imag(PQ2[hmin2,0])
+    Pmin[lmax1], QPmin[lmax1] = real(PQ1[lmax1,1]), imag(PQ1[lmax1,1])
+    Pmax[lmax2], QPmax[lmax2] = real(PQ2[lmax2,1]), imag(PQ2[lmax2,1])
+
+    ## store envelope
+    env[:,MPL1R], env[:,MPL1I], env[:,RL1] = real(MPL1), imag(MPL1), rL1
+    env[:,MPL2R], env[:,MPL2I] = real(MPL2), imag(MPL2)
+    env[:,RL2MIN], env[:,RL2MAX] = rL2[:,0], rL2[:,1]
+    env[:,PMIN], env[:,QPMIN], env[:,PMAX], env[:,QPMAX] = Pmin, QPmin, Pmax, QPmax
+    env[:,ISECTMIN], env[:,ISECTMAX] = isect[:,0], isect[:,1]
+    env[:,HIGHVCMIN] = hmin1 | hmin2
+    env[:,LOWVCMAX] = lmax1 | lmax2
+
+    return env
@@ -7,8 +7,6 @@ from numpy import finfo, sqrt, abs, angle, real, imag, conj, pi, inf, arange, ex
                 ones, zeros
 from numpy.lib.scimath import arcsin, arccos
 
-import matplotlib.pyplot as plt
-
 ## define j
 ## DONT USE j IN ANYWHERE ELSE!!!
 j = sqrt(-1+0j)
@@ -49,10 +47,15 @@ def convlimplot(plotarg, convi):
                         voltage limit (Ps constant)
         16  - SSVCMIN   grid side apparent power: converter lower
                         voltage limit (Ps constant)
-                        
+
+    matplotlib is imported on the first plot only, such that the power
+    flow does not depend on it unless plots are requested (option
+    CONVPLOTOPT).
+
     @author:Jef Beerten (KU Leuven)
     @author:Roni Irnawan (Aalborg University)    
     """
+    import matplotlib.pyplot as plt
 
     ##--- initialisation ---
     ## define arguments
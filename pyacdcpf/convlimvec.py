@@ -0,0 +1,169 @@
+"""Check for operation of all converters within ac voltage and current limits.
+"""
+
+from sys import stdout, stderr
+
+from numpy import sqrt, abs, real, imag, cos, c_, zeros, where, minimum, \
+            maximum, errstate, finfo, rint, array
+from numpy.lib.scimath import arcsin
+
+from pyacdcpf.convenv import convenv, MPL1R, MPL1I, RL1, PMIN, QPMIN, PMAX, \
+            QPMAX, ISECTMIN, ISECTMAX, HIGHVCMIN, LOWVCMAX, NENV
+
+## define j
+## DONT USE j IN ANYWHERE ELSE!!!
+j = sqrt(-1+0j)
+
+eps = finfo(float).eps # for avoiding division by zero
+
+def convlimvec(Ss, Vs, Vc, Ztf, Bf, Zc, Icmax, Vcmax, Vcmin, convi, epslim, printopt,
+               envcache=None, vsmq=0):
+    """
+    Check for operation of all converters within ac voltage and current limits.
+
+    Vectorised version of CONVLIM: the converter operation of all converters
+    is checked at once with the converters' PQ capability diagrams. All
+    inputs except EPSLIM and PRINTOPT are vectors with one element per
+    converter (CONVI are the converter numbers used in the messages).
+
+    The capability chart envelopes (see CONVENV) only depend on the
+    converter parameters and the grid voltage magnitude. If a dict ENVCACHE
+    and a quantisation step VSMQ > 0 are given, the envelopes are stored in
+    ENVCACHE under the key (CONVI, round(|VS|/VSMQ)) and reused, the limit
+    check then being carried out at the quantised voltage magnitude. The
+    cache has to be emptied when the converter parameters are changed.
+
+    Outputs:
+        CONVLIMVIOL : converter limit violation type (see CONVLIMPLOT)
+        SS : grid side apparent power after limiting
+        PLOTARG : arguments for converter limit plot, one row per converter
+            (see CONVLIMPLOT)
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+
+    ## voltage limits order check
+    for i in where(Vcmax<Vcmin)[0]:
+        stderr.write('Vcmin is larger than Vcmax for converter %d\n'%convi[i])
+    for i in where(Vcmax==Vcmin)[0]:
+        stderr.write('Vcmin is equal to Vcmax for converter %d\n'%convi[i])
+
+    Ssold = Ss.copy()
+
+    ## define voltage magnitudes, powers
+    Vsm = abs(Vs)
+    Ps = real(Ss).copy()
+    Qs = imag(Ss).copy()
+
+    ##--- initialization ---
+    ## load existing parameters
+    Zf = 1/(j*(Bf + eps))
+    Ytf = 1/(Ztf + eps) ## avoid division by zero. If Ztf=0, Ytf=inf is not used
+    Yf  = j*(Bf + eps)
+
+    ## pi-equivalent parameters of the converter station (see CONVLIM)
+    tf = Ztf != 0
+    fl = Bf != 0
+    Zsum = Ztf*Zc+Zc*Zf+Zf*Ztf
+    Z1 = where(tf, Zsum/Zc, Zf)
+    Z2 = where(tf & fl, Zsum/Zf, where(tf, Ztf+Zc, Zc+0j))
+
+    Y1 = zeros(Ss.shape, dtype=complex)
+    Y1[fl] = 1/Z1[fl]       ## Z1 = inf without filter
+    Y2 = 1/Z2
+    G2 = real(Y2)
+    B2 = imag(Y2)
+    Y12 = Y1 + Y2
+    G12 = real(Y12)
+    B12 = imag(Y12)
+
+    ##--- converter capability chart envelopes ---
+    if envcache is None or vsmq == 0:
+        env = convenv(Vsm, Ztf, Bf, Zf, Yf, Ytf, Y1, Y2, Icmax, Vcmax, Vcmin)
+    else:
+        ## cached per converter and quantised voltage magnitude
+        Vsmi = rint(Vsm/vsmq).astype(int)
+        Vsm = Vsmi*vsmq
+        keys = list(zip(convi.tolist(), Vsmi.tolist()))
+        new = array([k not in envcache for k in keys], dtype=bool)
+        if new.any():
+            envnew = convenv(Vsm[new], Ztf[new], Bf[new], Zf[new], Yf[new], \
+                Ytf[new], Y1[new], Y2[new], Icmax[new], Vcmax[new], Vcmin[new])
+            for k, row in zip([k for k, n in zip(keys, new) if n], envnew):
+                envcache[k] = row
+        env = array([envcache[k] for k in keys]).reshape((len(keys), NENV))
+
+    MPL1 = env[:,MPL1R] + j*env[:,MPL1I]
+    rL1 = env[:,RL1]
+    Pmin, QPmin = env[:,PMIN], env[:,QPMIN]
+    Pmax, QPmax = env[:,PMAX], env[:,QPMAX]
+
+    if printopt == 1:
+        for i in where((env[:,ISECTMIN] == 0) | (env[:,ISECTMAX] == 0) | \
+                (env[:,HIGHVCMIN] == 1) | (env[:,LOWVCMAX] == 1))[0]:
+            if env[i,ISECTMIN] == 0:
+                stdout.write('\n  Lower voltage limit at converter %d : No intersections with current limit were found.\n'%convi[i])
+            if env[i,ISECTMAX] == 0:
+                stdout.write('\n  Upper voltage limit at converter %d : No intersections with current limit were found.\n'%convi[i])
+            if env[i,HIGHVCMIN] == 1:
+                stdout.write('\n  High lower voltage limit detected at converter %d. \n'% convi[i])
+            if env[i,LOWVCMAX] == 1:
+                stdout.write('\n  Low upper voltage limit detected at converter %d. \n '% convi[i])
+
+    ##--- Limit check ---
+    inside = (Pmin < Ps) & (Ps < Pmax)
+    below = ~inside & (Ps <= Pmin)
+    above = ~inside & ~below
+    up = Qs > imag(MPL1)
+
+    with errstate(invalid='ignore', divide='ignore'):
+        ## maximum current limit (L1)
+        Qs1 = imag(MPL1) + (2*up-1)*sqrt(rL1**2-(Ps-real(MPL1))**2)
+
+        ## minimum and maximum voltage limits (L2)
+        VcL = c_[Vcmin,Vcmax]
+        a = (1+(B2/G2)**2)[:,None]
+        b = (-2*B2/G2*(Ps+Vsm**2*G12))[:,None]/((Vsm*G2)[:,None]*VcL)
+        c = ((Ps+Vsm**2*G12)[:,None]/((Vsm*G2)[:,None]*VcL))**2-1
+
+        ## only positive solution retained (neg. solution refers to lower part)
+        sinDd = (-b + sqrt(b**2-4*a*c))/(2*a)
+        cosDd = cos(arcsin(sinDd))
+        Qs2 = real((Vsm**2*B12)[:,None]+Vsm[:,None]*VcL*(G2[:,None]*sinDd-B2[:,None]*cosDd))
+        Qs2min = Qs2.min(axis=1)
+        Qs2max = Qs2.max(axis=1)
+
+        ## adopt working point to limits
+        Qup = minimum(Qs1, Qs2[:,1])
+        Qdn = maximum(Qs1, Qs2[:,0])
+        v1 = inside & up & (Qs > Qup)
+        v2 = inside & up & ~v1 & (Qs < Qs2[:,0])
+        v3 = inside & ~up & (Qs < Qdn)
+        v4 = inside & ~up & ~v3 & (Qs > Qs2[:,1])
+
+    convlimviol = zeros(Ss.shape)
+    convlimviol[v1 | v2 | v3 | v4] = 1
+    Qs[v1] = Qup[v1]
+    Qs[v2] = Qs2[v2,0]
+    Qs[v3] = Qdn[v3]
+    Qs[v4] = Qs2[v4,1]
+
+    ## active power outside of current limit active power range
+    convlimviol[below | above] = 2
+    Ps[below], Qs[below] = Pmin[below], QPmin[below]
+    Ps[above], Qs[above] = Pmax[above], QPmax[above]
+
+    ## define output argument Ss
+    Ss = Ps + j*Qs
+
+    ## remove violation when difference is small
+    convlimviol[abs(Ssold-Ss)<epslim] = 0
+
+    ## define plot arguments
+    q1 = convlimviol == 1
+    plotarg = c_[convlimviol, Ztf, Zf, Zc, Y1, Y2, Yf, Ytf, Vs, Icmax,\
+            Vcmax, Vcmin, Ssold, Ss, where(q1, Ps+j*Qs1, 0), \
+            where(q1, Ps+j*Qs2max, 0), where(q1, Ps+j*Qs2min, 0)]
+
+    return convlimviol, Ss, plotarg
@@ -0,0 +1,70 @@
+"""Runs the dc network power flows of the dc grids separately.
+"""
+
+from numpy import where, isin
+
+from pyacdcpf.dcnetworkpf import dcnetworkpf
+
+
+def dcgridspf(gridmap, Vdc, Pdc, droop, PVdroop, Pdcset, Vdcset, dVdcset, \
+        pol, tol, itmax, dcjacs=None, chord=0, hist=None, executor=None):
+    """
+    Runs the dc network power flows of the dc grids separately.
+
+    The dc network power flow (see DCNETWORKPF) of every dc grid in
+    C{gridmap} (see MAKEGRIDMAP) is solved with the compact dc bus
+    admittance matrix and index sets of the grid, instead of solving all dc
+    grids as one system. The dc grids are independent, so they can be
+    solved concurrently by a C{concurrent.futures} thread pool C{executor}.
+    The arguments are those of DCNETWORKPF for the complete dc network,
+    except for the slack and non-slack buses, which are taken from
+    C{gridmap}.
+
+    If the list C{dcjacs} is given, it holds the reduced Jacobian of every
+    dc grid (copies of the field dcjac of C{gridmap}), in which the
+    factorisations are kept for subsequent calls. If the list HIST is
+    given, the largest voltage correction over all dc grids of every
+    iteration is appended to it.
+
+    Returns the updated C{Vdc} and C{Pdc}.
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+    busi = gridmap['busi']
+    if dcjacs is None:
+        dcjacs = [None]*len(busi)
+
+    ## dc grids without non-slack buses: only the slack bus powers
+    solveg = []
+    for ii, b in enumerate(busi):
+        if gridmap['noslack'][ii].size > 0:
+            solveg.append(ii)
+        elif b.size > 0:
+            Vdcg = Vdc[b]
+            Pdc[b] = -pol*Vdcg*(gridmap['Ybusdc'][ii]*Vdcg)
+
+    ## dc network power flows of the other dc grids
+    histg = [[] for ii in solveg]
+    args = [(gridmap['Ybusdc'][ii], Vdc[busi[ii]], Pdc[busi[ii]],
+             gridmap['slack'][ii], gridmap['noslack'][ii],
+             where(isin(busi[ii], droop))[0], PVdroop[busi[ii]],
+             Pdcset[busi[ii]], Vdcset[busi[ii]], dVdcset[busi[ii]], pol,
+             tol, itmax, dcjacs[ii], chord, h)
+            for ii, h in zip(solveg, histg)]
+    if executor is None:
+        resultsg = [dcnetworkpf(*a) for a in args]
+    else:
+        resultsg = list(executor.map(lambda a: dcnetworkpf(*a), args))
+
+    ## store solutions of the dc grids
+    for ii, (Vdcg, Pdcg) in zip(solveg, resultsg):
+        Vdc[busi[ii]] = Vdcg
+        Pdc[busi[ii]] = Pdcg
+
+    ## largest voltage correction of every iteration over all dc grids
+    if hist is not None:
+        for k in range(max([len(h) for h in histg] + [0])):
+            hist.append(max([h[k] for h in histg if len(h) > k]))
+
+    return Vdc, Pdc
@@ -1,17 +1,19 @@
 """Runs the dc network power flow.
 """
 
-from numpy import ones, finfo, arange, abs, zeros
+from numpy import ones, finfo, abs, inf, outer, diag
 
-from scipy.sparse import csr_matrix
-from scipy.sparse.linalg import spsolve
+from scipy.sparse import diags
+from scipy.sparse.linalg import spsolve, splu
+
+from pyacdcpf.lowrankdcjac import lowrankdcjac
 
 
 eps = finfo(float).eps
 
 
 def dcnetworkpf(Ybusdc, Vdc, Pdc, slack, noslack, droop, PVdroop, Pdcset, \
-        Vdcset, dVdcset, pol, tol, itmax):
+        Vdcset, dVdcset, pol, tol, itmax, dcjac=None, chord=0, hist=None):
     """
     Runs the dc network power flow.
     
@@ -19,15 +21,33 @@ def dcnetworkpf(Ybusdc, Vdc, Pdc, slack, noslack, droop, PVdroop, Pdcset, \
     Each dc networks can have dc slack buses or several converters in dc
     voltage control.
 
+    If the prepared reduced Jacobian DCJAC is given (see PREPDCJAC), the
+    Jacobian is built in its fixed ordering and only factorised
+    numerically. The factors are then kept in DCJAC and, for CHORD > 0,
+    reused for up to CHORD subsequent iterations (chord method), also in
+    subsequent calls with the same DCJAC. The factors are renewed as soon
+    as the voltage corrections stop decreasing.
+
+    If DCJAC holds the factorisation of a base Jacobian (field base, see
+    APPLYOUTAGE), e.g. of the network before dc branch outages, the
+    Jacobian is not factorised but solved as a low-rank update of the base
+    factorisation (see LOWRANKDCJAC). The update is renewed every CHORD
+    iterations. As soon as the voltage corrections stop decreasing, the
+    Jacobian is factorised instead.
+
+    If the list HIST is given, the largest voltage correction of every
+    iteration is appended to it.
+
     @author:Jef Beerten (KU Leuven)
     @author:Roni Irnawan (Aalborg University)    
     """
 
     ## initialisation
     nb = Vdc.size ## number of dc busses
+    ns = noslack if dcjac is None else dcjac['ns'] ## order of corrections
+    dVrmax = inf ## largest voltage correction of previous iteration
     Pdc1 = -Pdc ## convention on power flow direction
     Pdc1[droop] = -Pdcset[droop] ## droop power set-points
-    drooplidx = droop-ones(droop.size)*nb+droop # linear droop indices
 
     ##----- dc network iteration -----
     ## initialisation
@@ -40,12 +60,9 @@ def dcnetworkpf(Ybusdc, Vdc, Pdc, slack, noslack, droop, PVdroop, Pdcset, \
         it += 1
 
         ## calculate power injections and Jacobian matrix
+        ## (J = diag(Vdc)*Ybusdc*diag(Vdc) + diag(Pdccalc), sparsity of Ybusdc)
         Pdccalc = pol*Vdc*(Ybusdc*Vdc)
-        Pdccalc = Pdccalc.reshape(nb)
-        Vdc = Vdc.reshape((nb,1)) # Reshape in order to do the matrix multiplication
-        J = csr_matrix(pol*Ybusdc.multiply(Vdc@Vdc.T))
-        Vdc = Vdc.reshape(nb) # Switch back to the original shape
-        J[arange(J.shape[0]),arange(J.shape[0])]      = J.diagonal() + Pdccalc #replace matrix elements
+        Jdiag = Pdccalc.copy()
 
         ## include droop characteristics
         Vdcsetlh = (abs(Vdc-Vdcset)<=dVdcset)*Vdc + \
@@ -53,22 +70,56 @@ def dcnetworkpf(Ybusdc, Vdc, Pdc, slack, noslack, droop, PVdroop, Pdcset, \
                 ((Vdc-Vdcset)<-dVdcset)*(Vdcset-dVdcset)    ## define set-point with deadband
 
         Pdccalc[droop] = Pdccalc[droop] + 1/PVdroop[droop]*(Vdc[droop]-Vdcsetlh[droop]) # droop addition
-        J[drooplidx,drooplidx] = J[drooplidx,drooplidx] + 1/PVdroop[droop]*Vdc[droop]
+        Jdiag[droop] = Jdiag[droop] + 1/PVdroop[droop]*Vdc[droop]
 
         ## dc network solution
-        # reduce Jacobian
-        keep = zeros(J.shape[0], dtype=bool)
-        keep[noslack] = True # keep the "noslack" Jacobian
-        Jr = J[keep] 
-        Jr = Jr[:,keep] 
-        dPdcr = Pdc1[noslack] - Pdccalc[noslack] ## power mismatch vector
-        dPdcr = dPdcr.reshape((dPdcr.size,1))
-        dVr = spsolve(Jr,dPdcr) ##voltage corrections
+        if dcjac is None:
+            J = pol*diags(Vdc)*Ybusdc*diags(Vdc) + diags(Jdiag)
+
+            # reduce Jacobian
+            Jr = J.tocsr()[noslack,:][:,noslack] # keep the "noslack" Jacobian
+            dPdcr = Pdc1[noslack] - Pdccalc[noslack] ## power mismatch vector
+            dVr = spsolve(Jr.tocsc(),dPdcr) ##voltage corrections
+        else:
+            ## (re)factorise reduced Jacobian in the prepared ordering
+            base = dcjac.get('base')
+            if dcjac['lu'] is None or dcjac['age'] >= chord:
+                if base is not None:
+                    ## low-rank update of the base factors (terminal buses S)
+                    VS = Vdc[ns[base['S']]]
+                    JSS = pol*outer(VS, VS)*base['YSS'] + \
+                          diag(Jdiag[ns[base['S']]])
+                    dcjac['lu'] = base['lu']
+                    dcjac['KC'] = lowrankdcjac(base, JSS)
+                    dcjac['Jr'] = None
+                else:
+                    Jr = pol*diags(Vdc[ns])*dcjac['Yr']*diags(Vdc[ns]) + \
+                         diags(Jdiag[ns])
+                    dcjac['lu'] = splu(Jr.tocsc(), permc_spec='NATURAL')
+                    dcjac['KC'] = None
+                    dcjac['Jr'] = Jr.tocsc()
+                    dVrmax = inf
+                dcjac['age'] = 0
+            dcjac['age'] += 1
+
+            dPdcr = Pdc1[ns] - Pdccalc[ns] ## power mismatch vector
+            dVr = dcjac['lu'].solve(dPdcr) ##voltage corrections
+            if dcjac.get('KC') is not None:
+                dVr -= base['Z'].dot(dcjac['KC'].dot(dVr[base['S']]))
+
+            ## renew factors if the corrections do not decrease (factorise
+            ## the Jacobian instead of updating the base factors)
+            if abs(dVr).max() >= dVrmax:
+                dcjac['age'] = chord
+                dcjac['base'] = None
+            dVrmax = abs(dVr).max()
 
         ## update dc voltages
-        Vdc[noslack] = Vdc[noslack]*(ones(noslack.size)+dVr)
+        Vdc[ns] = Vdc[ns]*(ones(ns.size)+dVr)
 
         ## convergence check
+        if hist is not None:
+            hist.append(abs(dVr).max())
         if abs(dVr).max()<tol: 
             converged = 1
 
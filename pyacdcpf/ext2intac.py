@@ -1,6 +1,6 @@
 import sys
 
-from numpy import where, setdiff1d, unique, r_, arange, zeros
+from numpy import where, setdiff1d, unique, r_, arange, zeros, sort
 
 from pyacdcpf.idx_busdc import BUSAC_I, BUSDC_I
 from pyacdcpf.idx_convdc import CONV_BUS
@@ -36,8 +36,9 @@ def ext2intac(pdc,ppc):
     if accnv.shape[0] != unique(accnv).shape[0] :
         sys.stderr.write('More than one converter per ac node detected!\n')
 
-    ## define index matrices
-    i2eac = r_[unique(accnv), acdum, acnodum].astype(int)
+    ## define index matrices (converter buses in the order of the dc buses)
+    accnvu = accnv[sort(unique(accnv, return_index=True)[1])]
+    i2eac = r_[accnvu, acdum, acnodum].astype(int)
     e2iac = zeros(max(i2eac) + 1)
     e2iac[i2eac] = arange(1,ppc['bus'].shape[0]+1)
     i2eac = r_[[0],i2eac]
@@ -30,8 +30,9 @@ def ext2intdc(pdc):
     if griddc.shape[0] > 1 and any(np.gradient(np.sort(griddc))>1.):
         raise Exception('DC grid numbering is not successive.\n')
 
-    # Sort the busdc matrix by DC grid number (primary), then AC grid connection (secondary)
-    sort_key = np.lexsort((pdc['busdc'][:, BUSAC_I] == 0, pdc['busdc'][:, GRIDDC]))
+    # Sort the busdc matrix by AC grid connection (primary), then DC grid number (secondary),
+    # such that the converter buses of all DC grids come first, in the order of the converters
+    sort_key = np.lexsort((pdc['busdc'][:, GRIDDC], pdc['busdc'][:, BUSAC_I] == 0))
     pdc['busdc'] = pdc['busdc'][sort_key, :]
     i2edcpmt = sort_key
 
@@ -46,8 +46,9 @@ def ext2intpu(baseMVA, pdc):
     pdc['busdc'][:, CDC] *= admittance_dc_ratio
 
     # Check for matching base voltages at branch ends
-    from_bus_voltage = pdc['busdc'][np.where(pdc['branchdc'][:,F_BUSDC])[0],BASE_KVDC]
-    to_bus_voltage = pdc['busdc'][np.where(pdc['branchdc'][:,T_BUSDC])[0],BASE_KVDC]
+    # (internal dc bus numbers, busdc sorted by bus number)
+    from_bus_voltage = pdc['busdc'][pdc['branchdc'][:,F_BUSDC].astype(int)-1,BASE_KVDC]
+    to_bus_voltage = pdc['busdc'][pdc['branchdc'][:,T_BUSDC].astype(int)-1,BASE_KVDC]
 
     if not np.all(from_bus_voltage == to_bus_voltage):
         raise Exception('The DC voltages at both sides of a DC branch do not match.\n')
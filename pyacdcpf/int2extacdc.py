@@ -0,0 +1,201 @@
+"""Converts a sequential ac/dc power flow solution to the input case format.
+"""
+from numpy import c_, zeros, pi, arange, abs, angle
+
+from pypower.idx_bus import VM, VA
+from pypower.idx_brch import QT
+from pypower.idx_gen import PG, QG
+
+from pyacdcpf.idx_busdc import BUSAC_I, VDC, PDC
+from pyacdcpf.idx_convdc import PCONV, QCONV, VMC, VAC, PCCONV, QCCONV, \
+        PCLOSS, VMF, VAF, PFIL, QCONVF, QCCONVF
+from pyacdcpf.idx_brchdc import PFDC, PTDC
+
+from pyacdcpf.int2extdc import int2extdc
+from pyacdcpf.int2extac import int2extac
+from pyacdcpf.int2extpu import int2extpu
+
+
+def int2extacdc(pcase, state):
+    """
+    Converts a sequential ac/dc power flow solution to the input case format.
+
+    Updates the (internal) prepared case data with the solution, converts
+    the data back to external per unit values, bus numbering and sorting
+    and re-includes all out-of-service elements. The prepared case itself
+    is not modified.
+
+    Inputs:
+        PCASE : prepared ac/dc case (see PREPACDCPF)
+        STATE : sequential ac/dc power flow solution (see SOLVEACDCPF)
+
+    Outputs:
+        RESULTSAC : results dict with the fields baseMVA, bus, gen, branch
+        RESULTSDC : results dict with the fields baseMVAac, baseMVAdc, pol,
+            busdc, convdc, branchdc, convdcdc
+        (see RUNACDCPF)
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    @author: Lazar Scekic (University of Montenegro)
+    """
+
+    ## internal ac and dc case data
+    baseMVA, bus, gen = pcase['baseMVA'], pcase['bus'].copy(), pcase['gen']
+    baseMVAac, baseMVAdc, pol, busdc, branchdc = \
+        pcase['baseMVAac'], pcase['baseMVAdc'], pcase['pol'], \
+        pcase['busdc'].copy(), pcase['branchdc']
+    ppc = {}
+    pdc = {'convdcdc': pcase['convdcdc'].copy()}
+
+    i2edcpmt, i2edc, acdmbus, i2eac = pcase['i2edcpmt'], pcase['i2edc'], \
+        pcase['acdmbus'], pcase['i2eac']
+    i2ebus, i2egen, i2ebrch = pcase['i2ebus'], pcase['i2egen'], \
+        pcase['i2ebrch']
+    i2ebusdc, i2ebrchdc, i2econvdc = pcase['i2ebusdc'], pcase['i2ebrchdc'], \
+        pcase['i2econvdc']
+    conv0busi, conv1i, conv0, conv0i = pcase['conv0busi'], pcase['conv1i'], \
+        pcase['conv0'].copy(), pcase['conv0i']
+    convdcdc0, convdcdc0i, convdcdc1i, convdcdci = pcase['convdcdc0'].copy(), \
+        pcase['convdcdc0i'], pcase['convdcdc1i'], pcase['convdcdci']
+    brchdc0, brchdc0i, brchdc1i = pcase['brchdc0'], pcase['brchdc0i'], \
+        pcase['brchdc1i']
+    brch0, brch0i, brch1i = pcase['brch0'], pcase['brch0i'], pcase['brch1i']
+    gen0, gen0i, gen1i = pcase['gen0'].copy(), pcase['gen0i'], pcase['gen1i']
+    cdci = pcase['cdci']
+
+    ## solution
+    busVSC, genVSC, branch, convdc = \
+        state['bus'], state['gen'], state['branch'], state['convdc'].copy()
+    Vdc, Pdc, Ps, Qs, Vc, Pc, Qc, Ploss, Vf, Psf, Qsf, Qcf, Pfdc, Ptdc = \
+        state['Vdc'], state['Pdc'], state['Ps'], state['Qs'], state['Vc'], \
+        state['Pc'], state['Qc'], state['Ploss'], state['Vf'], state['Psf'], \
+        state['Qsf'], state['Qcf'], state['Pfdc'], state['Ptdc']
+
+    ## update bus matrix
+    bus[:,VM] = busVSC[:,VM]
+    bus[:,VA] = busVSC[:,VA]
+
+    ## dummy generators removal
+    gen = genVSC[arange(gen.shape[0]),:]
+
+    ## update busdc matrix
+    busdc[:,PDC] = Pdc*baseMVA
+    busdc[:,VDC] = Vdc
+
+    ## update convdc matrix
+    convdc[:,PCONV] = Ps*baseMVA
+    convdc[:,QCONV] = Qs*baseMVA
+    # new addition to convdc matrix (result columns allocated at once)
+    convdc = c_[convdc[:,:VMC], zeros((convdc.shape[0], QCCONVF+1-VMC))]
+    convdc[:,VMC] = abs(Vc)
+    convdc[:,VAC] = angle(Vc)*180/pi
+    convdc[:,PCCONV] = Pc*baseMVA
+    convdc[:,QCCONV] = Qc*baseMVA
+    convdc[:,PCLOSS] = Ploss*baseMVA
+    convdc[:,VMF] = abs(Vf)
+    convdc[:,VAF] = angle(Vf)*180/pi
+    convdc[:,PFIL] = Psf*baseMVA
+    convdc[:,QCONVF] = Qsf*baseMVA
+    convdc[:,QCCONVF] = Qcf*baseMVA
+
+    ## new addition to branchdc matrix
+    branchdc = c_[branchdc[:,:PFDC], zeros((branchdc.shape[0], PTDC+1-PFDC))]
+    branchdc[:,PFDC] = Pfdc*baseMVA
+    branchdc[:,PTDC] = Ptdc*baseMVA
+
+    #-----  internal to external bus renumbering  -----
+    # remove dummy converters
+    convdc = convdc[cdci,:]
+
+    ## convert to external indexing
+    ppc["baseMVA"], ppc["bus"], ppc["gen"], ppc["branch"] = \
+            baseMVA, bus, gen, branch
+
+    pdc["baseMVAac"], pdc["baseMVAdc"], pdc["pol"], \
+        pdc["busdc"], pdc["convdc"], pdc["branchdc"] = \
+        baseMVAac, baseMVAdc, pol, busdc, convdc, branchdc
+
+    ## Per unit internal to external data conversion
+    pdc =int2extpu(ppc['baseMVA'],pdc);
+
+    ## Undo the matrices sorting based on the bus numbers
+    ppc['bus'] = ppc['bus'][i2ebus.argsort(),:]
+    ppc['gen'] = ppc['gen'][i2egen.argsort(),:]
+    ppc['branch'] = ppc['branch'][i2ebrch.argsort(),:]
+    pdc['busdc'] = pdc['busdc'][i2ebusdc.argsort(),:]
+    pdc['convdc'] = pdc['convdc'][i2econvdc.argsort(),:]
+    pdc['branchdc'] = pdc['branchdc'][i2ebrchdc.argsort(),:]
+
+    ## ac network internal to external bus numbering
+    pdc, ppc = int2extac(i2eac, acdmbus, pdc, ppc)
+
+    ## dc network internal to external bus numbering
+    pdc = int2extdc(i2edcpmt, i2edc, pdc)
+
+    ## generator outage inclusion
+    gen1 = ppc['gen'] ## operational generators
+    gen0[:,[PG, QG]] = 0 ## reset generator power injection
+    ppc['gen'] = zeros((gen1.shape[0]+gen0.shape[0], gen1.shape[1]))
+    ppc['gen'][gen1i,:] = gen1
+    ppc['gen'][gen0i,:] = gen0
+
+    ## converter with outages inclusion
+    conv1 = pdc['convdc']
+    conv0 = c_[conv0, zeros((conv0.shape[0],conv1.shape[1] - conv0.shape[1]))]
+    pdc['convdc'] = zeros((conv1.shape[0]+conv0.shape[0], conv1.shape[1]))
+    pdc['convdc'][conv0i, :] = conv0
+    pdc['convdc'][conv1i, :] = conv1
+    if conv0busi.shape[0]>0:
+        ## rows of the dc buses and their ac buses (see CONVOUT)
+        pdc['busdc'][conv0busi[0].astype(int), BUSAC_I] = conv0busi[1]
+
+    ## dc-dc converter outages inclusion (rows of the prepared case in the
+    ## order of the input case, see PREPACDCPF)
+    if convdcdc1i.size+convdcdc0i.size > 0:
+        convdcdc1 = pdc['convdcdc']
+        pdc['convdcdc'] = zeros((convdcdc1i.size+convdcdc0i.size,
+                                 convdcdc1.shape[1]))
+        pdc['convdcdc'][convdcdci,:] = convdcdc1
+    if convdcdc0i.size > 0:
+        convdcdc0 = c_[convdcdc0, zeros((convdcdc0.shape[0],
+                                         convdcdc1.shape[1] - convdcdc0.shape[1]))]
+        pdc['convdcdc'][convdcdc0i,:] = convdcdc0
+
+    ## dc branch outages inclusion
+    brchdc1 = pdc['branchdc']
+    brchdc0 = c_[brchdc0, zeros((brchdc0.shape[0], brchdc1.shape[1] - brchdc0.shape[1]))]
+    pdc['branchdc'] = zeros((brchdc1.shape[0]+brchdc0.shape[0], brchdc1.shape[1]))
+    pdc['branchdc'][brchdc0i,:] = brchdc0
+    pdc['branchdc'][brchdc1i,:] = brchdc1
+
+    ## ac branch outages inclusion
+    if ppc['branch'].shape[0] == 0: ## all infinite buses
+        # python start the index at 0
+        brch0 = c_[brch0, zeros((brch0.shape[0], QT + 1 - brch0.shape[1]))] # not necessary anymore after rewriting the code
+        ppc['branch'] = brch0;
+    else:
+        brch1 = ppc['branch']
+        brch0 = c_[brch0, zeros((brch0.shape[0], brch1.shape[1] - brch0.shape[1]))];
+        ppc['branch'] = zeros((brch1.shape[0]+brch0.shape[0], brch1.shape[1]))
+        ppc['branch'][brch0i,:] = brch0
+        ppc['branch'][brch1i,:] = brch1
+
+
+    ##-----  results  -----
+    resultsac = {}
+    resultsac['baseMVA'] = ppc['baseMVA']
+    resultsac['bus'] = ppc['bus']
+    resultsac['gen'] = ppc['gen']
+    resultsac['branch'] = ppc['branch']
+
+    resultsdc = {}
+    resultsdc['baseMVAac'] = pdc['baseMVAac']
+    resultsdc['baseMVAdc'] = pdc['baseMVAdc']
+    resultsdc['pol'] = pdc['pol']
+    resultsdc['busdc'] = pdc['busdc']
+    resultsdc['convdc'] = pdc['convdc']
+    resultsdc['branchdc'] = pdc['branchdc']
+    resultsdc['convdcdc'] = pdc['convdcdc']
+
+    return resultsac, resultsdc
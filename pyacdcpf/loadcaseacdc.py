@@ -0,0 +1,39 @@
+"""Loads an ac/dc case from a binary case bundle.
+"""
+
+from os import listdir
+from os.path import join
+
+from numpy import load
+
+
+def loadcaseacdc(fname, mmap_mode='r'):
+    """
+    Loads an ac/dc case from a binary case bundle.
+
+    Loads the ac case dict C{ppc} and dc case dict C{pdc} stored in the
+    bundle C{fname} by SAVECASEACDC. The data matrices are memory-mapped
+    with the given C{mmap_mode} (see C{numpy.load}, default read-only),
+    such that loading a case takes one mmap call per matrix. Use
+    C{mmap_mode=None} to read the matrices into memory instead.
+
+    Returns the ac case dict C{ppc} and the dc case dict C{pdc}, which can
+    be passed to LOADCASE and LOADCASEDC (which copy the data).
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+    base = load(join(fname, 'base.npy'))
+    version = load(join(fname, 'version.npy'))
+
+    ppc = {'version': str(version[0]), 'baseMVA': float(base[0])}
+    pdc = {'version': str(version[1]), 'baseMVAac': float(base[1]),
+           'baseMVAdc': float(base[2]), 'pol': float(base[3])}
+
+    for name in sorted(listdir(fname)):
+        if name.startswith('ac_') and name.endswith('.npy'):
+            ppc[name[3:-4]] = load(join(fname, name), mmap_mode=mmap_mode)
+        elif name.startswith('dc_') and name.endswith('.npy'):
+            pdc[name[3:-4]] = load(join(fname, name), mmap_mode=mmap_mode)
+
+    return ppc, pdc
@@ -0,0 +1,38 @@
+"""Low-rank update of a factorised reduced dc network Jacobian.
+"""
+
+from numpy import eye
+from numpy.linalg import solve
+
+
+def lowrankdcjac(base, JSS):
+    """
+    Low-rank update of a factorised reduced dc network Jacobian.
+
+    The reduced dc Jacobian of a network in which a few dc branches or
+    dc-dc converters are taken out of service only differs from the base
+    Jacobian A in the rows and columns of the buses S at their terminals.
+    Replacing the block A[S,S] by the block C{JSS} of the new Jacobian is a
+    rank |S| update A + E*C*E' (E: columns S of the identity matrix,
+    C = JSS - A[S,S]), which is solved with the base factorisation by the
+    Sherman-Morrison-Woodbury formula
+
+        (A + E*C*E')^-1*b = y - Z*KC*y[S],  y = A^-1*b, Z = A^-1*E,
+                                            KC = (I + C*Z[S,:])^-1*C
+
+    instead of factorising the new Jacobian. C{base} is a dict with the
+    fields:
+        lu  : factorisation of the base Jacobian A (see DCNETWORKPF)
+        S   : positions of the terminal buses in the reduced Jacobian
+        Z   : A^-1*E (dense)
+        JSS : block A[S,S] (dense)
+
+    Returns the dense matrix KC.
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+    S, Z = base['S'], base['Z']
+    C = JSS - base['JSS']
+
+    return solve(eye(S.size) + C.dot(Z[S,:]), C)
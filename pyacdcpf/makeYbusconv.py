@@ -0,0 +1,72 @@
+"""Builds the extended ac bus admittance matrix including converter stations.
+"""
+
+from numpy import r_, arange, where, sqrt
+
+from scipy.sparse import csr_matrix
+
+## define j
+## DONT USE j IN ANYWHERE ELSE!!!
+j = sqrt(-1+0j)
+
+
+def makeYbusconv(Ybus, cdci, Zc, Ztf, Bf):
+    """
+    Builds the extended ac bus admittance matrix including converter stations.
+
+    Extends the ac bus admittance matrix C{Ybus} with a filter node (only for
+    converters with a transformer) and a converter node for every converter
+    in C{cdci}. The converter reactor C{Zc} connects the converter node to
+    the filter node, the transformer C{Ztf} connects the filter node to the
+    ac bus and the filter susceptance C{Bf} is a shunt at the filter node.
+    For converters without transformer, the filter node is the ac bus
+    itself. The ac bus of converter C{cdci[i]} has index C{cdci[i]}.
+
+    The nodes are ordered as: ac buses, filter nodes, converter nodes.
+
+    Returns the extended bus admittance matrix C{Yext}, the matrix C{Ys}
+    such that C{V[cdci]*conj(Ys*V)} yields the complex power injected into
+    the ac grid by every converter station (grid side power Ss) and the
+    node indices C{fnode} and C{cnode} of the filter and converter nodes.
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+
+    ## constants
+    nb = Ybus.shape[0]      ## number of ac buses
+    nc = cdci.size          ## number of converters
+    tf1i = where(Ztf[cdci] != 0)[0]     ## converters with transformer
+    tf0i = where(Ztf[cdci] == 0)[0]     ## converters without transformer
+    nf = tf1i.size          ## number of filter nodes
+    n = nb + nf + nc        ## number of nodes
+
+    ## node indices
+    fnode = cdci.copy()
+    fnode[tf1i] = nb + arange(nf)
+    cnode = nb + nf + arange(nc)
+
+    ## series admittances of converter reactors and transformers
+    Yc = 1/Zc[cdci]
+    Ytf = 1/Ztf[cdci[tf1i]]
+
+    ## converter branches (from node, to node, series admittance)
+    f = r_[cnode, fnode[tf1i]]
+    t = r_[fnode, cdci[tf1i]]
+    Ys = r_[Yc, Ytf]
+
+    ## build Yext (ac network, converter branches and filter shunts)
+    Ybus = Ybus.tocoo()
+    i = r_[Ybus.row, f, f, t, t, fnode]
+    k = r_[Ybus.col, f, t, f, t, fnode]
+    y = r_[Ybus.data, Ys, -Ys, -Ys, Ys, j*Bf[cdci]]
+    Yext = csr_matrix((y, (i, k)), (n, n))
+
+    ## build Ys such that V[cdci]*conj(Ys*V) is the grid side converter power
+    ## (including the filter for converters without transformer)
+    i = r_[tf1i, tf1i, tf0i, tf0i]
+    k = r_[fnode[tf1i], cdci[tf1i], cnode[tf0i], cdci[tf0i]]
+    y = r_[Ytf, -Ytf, Yc[tf0i], -Yc[tf0i] - j*Bf[cdci[tf0i]]]
+    Ys = csr_matrix((y, (i, k)), (nc, n))
+
+    return Yext, Ys, fnode, cnode
@@ -4,7 +4,7 @@
 from sys import stderr
 
 from numpy import ones, r_, where
-from scipy.sparse import csr_matrix
+from scipy.sparse import csr_matrix, coo_matrix
 
 from pyacdcpf.idx_brchdc import BRDC_R, F_BUSDC, T_BUSDC
 from pyacdcpf.idx_convdcdc import (C_BUSDC, M_BUSDC, D_RATIO,
@@ -19,6 +19,13 @@ def makeYbusdc(busdc, branchdc, convdcdc=None):
     vector, yield the vector currents injected into each dc line from the
     "from" and "to" buses respectively of each line.
 
+    The dc-dc converters in service in C{convdcdc} are added to the bus
+    admittance matrix as non-symmetric branches (voltage ratio D_RATIO,
+    series resistance R_DCDC and shunt conductance G_DCDC at the M_BUSDC
+    side), stamped together with the branches in one batch. The bus
+    admittance matrix is returned in canonical CSR format (sorted indices,
+    no duplicate entries).
+
     @author:Jef Beerten (KU Leuven)
     @author:Roni Irnawan (Aalborg University)    
     """
@@ -41,13 +48,9 @@ def makeYbusdc(busdc, branchdc, convdcdc=None):
     Yft = - Ys
     Ytf = - Ys
 
-    ## build connection matrices
-    f = branchdc[:, F_BUSDC]-1 ## list of index of "from" buses
-    t = branchdc[:, T_BUSDC]-1 ## list of index of "to" buses
-    ## connection matrix for line & from buses
-    Cf = csr_matrix((ones(m), (range(m), f)), (m, n))
-    ## connection matrix for line & to buses
-    Ct = csr_matrix((ones(m), (range(m), t)), (m, n))
+    ## bus indices
+    f = branchdc[:, F_BUSDC].astype(int)-1 ## list of index of "from" buses
+    t = branchdc[:, T_BUSDC].astype(int)-1 ## list of index of "to" buses
 
     ## build Yf and Yt such that Yf * V is the vector of complex branch currents injected
     ## at each branch's "from" bus, and Yt is the same for the "to" bus end
@@ -56,34 +59,35 @@ def makeYbusdc(busdc, branchdc, convdcdc=None):
     Yfdc = csr_matrix((r_[Yff, Yft], (i, r_[f, t])), (m, n))
     Ytdc = csr_matrix((r_[Ytf, Ytt], (i, r_[f, t])), (m, n))
 
-    ## build Ybus
-    Ybusdc = Cf.T * Yfdc + Ct.T * Ytdc
-
-    ## Add DC-DC converters as non-symmetric branches
+    ## build Ybus from the branch elements
+    ##      | Ybusdc[f,f] Ybusdc[f,t] |   | Yff  Yft |
+    ##      | Ybusdc[t,f] Ybusdc[t,t] | = | Ytf  Ytt |
+    ## stamped together with the dc-dc converters as one triplet batch
+    rows = [f, f, t, t]
+    cols = [f, t, f, t]
+    vals = [Yff, Yft, Ytf, Ytt]
+
+    ## add DC-DC converters as non-symmetric branches
+    ##      | Ic |   | 1/R     -D/R       |   | Vc |
+    ##      |    | = |                    | * |    |
+    ##      | Im |   | -D/R    D^2/R + G  |   | Vm |
     if convdcdc is not None and convdcdc.size > 0:
-        # Filter active converters
+        ## active converters
         active = where(convdcdc[:, STATUS_DCDC] == 1)[0]
 
-        if active.size > 0:
-            # Extract data
-            cbus = convdcdc[active, C_BUSDC].astype(int) - 1
-            mbus = convdcdc[active, M_BUSDC].astype(int) - 1
-            D = convdcdc[active, D_RATIO]
-            R = convdcdc[active, R_DCDC]
-            G = convdcdc[active, G_DCDC]
-
-            # Calculate admittance elements
-
-            Y_ff = 1 / R
-            Y_ft = - D / R
-            Y_tf = - D / R
-            Y_tt = D ** 2 / R + G
-
-            # Add to Ybusdc
-            for i in range(active.size):
-                Ybusdc[cbus[i], cbus[i]] += Y_ff[i]
-                Ybusdc[cbus[i], mbus[i]] += Y_ft[i]
-                Ybusdc[mbus[i], cbus[i]] += Y_tf[i]
-                Ybusdc[mbus[i], mbus[i]] += Y_tt[i]
+        cbus = convdcdc[active, C_BUSDC].astype(int) - 1
+        mbus = convdcdc[active, M_BUSDC].astype(int) - 1
+        D = convdcdc[active, D_RATIO]
+        R = convdcdc[active, R_DCDC]
+        G = convdcdc[active, G_DCDC]
+
+        rows += [cbus, cbus, mbus, mbus]
+        cols += [cbus, mbus, cbus, mbus]
+        vals += [1 / R, - D / R, - D / R, D ** 2 / R + G]
+
+    ## duplicate entries are summed, canonical (sorted) CSR format
+    Ybusdc = coo_matrix((r_[tuple(vals)], (r_[tuple(rows)], r_[tuple(cols)])),
+                        (n, n)).tocsr()
+    Ybusdc.sum_duplicates()
 
     return Ybusdc, Yfdc, Ytdc
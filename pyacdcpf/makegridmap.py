@@ -0,0 +1,51 @@
+"""Builds the partition of a dc network into its dc grids.
+"""
+
+from numpy import arange, where, isin
+
+from pyacdcpf.idx_busdc import GRIDDC
+from pyacdcpf.prepdcjac import prepdcjac
+
+
+def makegridmap(busdc, Ybusdc, slackdc, noslack):
+    """
+    Builds the partition of a dc network into its dc grids.
+
+    Returns a dict C{gridmap} with, for every dc grid (grid C{ii} at
+    position C{ii-1}, see column GRIDDC of busdc), the rows of its dc buses
+    and its own compact dc network data:
+        busi : lists with the dc bus rows of every dc grid
+        slackdc : lists with the dc slack bus rows of every dc grid
+        Ybusdc : dc bus admittance matrices of the dc grids (CSR), in the
+            order of busi
+        slack, noslack : positions of the slack and non-slack buses of
+            C{slackdc} and C{noslack} in busi
+        dcjac : reduced dc Jacobians of the dc grids (see PREPDCJAC), None
+            for dc grids without non-slack buses
+
+    The dc grids are not connected, so their dc network power flows are
+    independent and can be solved separately (see DCGRIDSPF). The partition
+    only depends on the dc network topology and the dc slack buses, so it
+    is built once (see PREPACDCPF) and reused in every iteration of the
+    sequential algorithm.
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+    ngriddc = int(busdc[:,GRIDDC].max()) if busdc.shape[0] > 0 else 0
+    busi = [where(busdc[:,GRIDDC] == ii)[0] for ii in arange(1, ngriddc+1)]
+
+    Ybusdc = Ybusdc.tocsr()
+    Ybusdcz = [Ybusdc[b,:][:,b] for b in busi]
+    slack = [where(isin(b, slackdc))[0] for b in busi]
+    noslackz = [where(isin(b, noslack))[0] for b in busi]
+
+    gridmap = {
+        'busi': busi,
+        'slackdc': [b[s] for b, s in zip(busi, slack)],
+        'Ybusdc': Ybusdcz, 'slack': slack, 'noslack': noslackz,
+        'dcjac': [prepdcjac(Y, ns) if ns.size > 0 else None
+                  for Y, ns in zip(Ybusdcz, noslackz)],
+    }
+
+    return gridmap
@@ -0,0 +1,63 @@
+"""Preallocates the result arrays of a series of ac/dc power flows.
+"""
+
+from os import makedirs
+from os.path import join
+
+from numpy import zeros
+from numpy.lib.format import open_memmap
+
+
+def makeresultstore(pcase, nt, fname=None):
+    """
+    Preallocates the result arrays of a series of ac/dc power flows.
+
+    Returns a dict C{store} with one fixed-width array (scenarios x
+    elements) per quantity for C{nt} scenarios of the prepared case
+    C{pcase} (see PREPACDCPF), in the row order of the input case files:
+        VM, VA     : ac bus voltage magnitudes (p.u.), angles (deg)
+        PG, QG     : generator injections (MW, MVAr)
+        VDC, PDC   : dc bus voltages (p.u.) and powers (MW)
+        PCONV, QCONV : converter grid side injections (MW, MVAr)
+        PLOSS      : converter losses (MW)
+        PFDC, PTDC : dc branch flows at from/to bus (MW)
+        converged, it : convergence flag and outer iterations (vectors)
+
+    If C{fname} is given, the arrays are memory-mapped '.npy' files in the
+    directory C{fname} (one file per quantity), such that the number of
+    scenarios is limited by the disk instead of the memory. The stored
+    results can be read with C{numpy.load(join(fname, 'VM.npy'),
+    mmap_mode='r')}. The solutions are written with STORERESULT.
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+    ## number of elements in the original case files
+    nb = pcase['busi'].size
+    ng = pcase['gen1i'].size + pcase['gen0i'].size
+    nc = pcase['convi'].size + pcase['conv0i'].size
+    nbdc = pcase['busdci'].size
+    nbrdc = pcase['brchdci'].size + pcase['brchdc0i'].size
+
+    shapes = [
+        ('VM', (nt, nb), float), ('VA', (nt, nb), float),
+        ('PG', (nt, ng), float), ('QG', (nt, ng), float),
+        ('VDC', (nt, nbdc), float), ('PDC', (nt, nbdc), float),
+        ('PCONV', (nt, nc), float), ('QCONV', (nt, nc), float),
+        ('PLOSS', (nt, nc), float),
+        ('PFDC', (nt, nbrdc), float), ('PTDC', (nt, nbrdc), float),
+        ('converged', (nt,), int), ('it', (nt,), int),
+    ]
+
+    if fname is not None:
+        makedirs(fname, exist_ok=True)
+
+    store = {}
+    for key, shape, dtype in shapes:
+        if fname is None:
+            store[key] = zeros(shape, dtype=dtype)
+        else:
+            store[key] = open_memmap(join(fname, key + '.npy'), mode='w+',
+                                     dtype=dtype, shape=shape)
+
+    return store
@@ -0,0 +1,174 @@
+"""Builds a synthetic meshed MTDC system attached to scalable ac grids.
+"""
+
+from numpy import array, zeros, ones, arange, r_, where, setdiff1d
+from numpy.random import default_rng
+
+from pypower.idx_bus import BUS_TYPE, PD, QD, ZONE, REF, PV
+from pypower.idx_gen import GEN_BUS, PG
+
+
+def makesynthacdc(nbus=118, nconv=6, nzones=1, ngriddc=1, nconvdcdc=0,
+                  seed=0):
+    """
+    Builds a synthetic meshed MTDC system attached to scalable ac grids.
+
+    Generates an ac case (PYPOWER format) with C{nbus} buses divided over
+    C{nzones} non-synchronised ac zones and a dc case with C{nconv}
+    converters divided over C{ngriddc} meshed dc grids, which can be used
+    for benchmarking (see BENCHACDCPF). Every ac zone is a ring with
+    additional connections to the second neighbours and a few random
+    chords, with a slack generator at its first bus and a PV generator at
+    every tenth bus. Every dc bus has one converter connected to a load bus
+    of the ac zones, the first converter of every dc grid is the dc slack
+    converter (ac voltage control), the others inject a random active
+    power. Every dc grid is a ring with connections to the second
+    neighbours. C{nconvdcdc} dc-dc converters (voltage ratio 1) are added
+    between random dc buses of the same dc grid.
+
+    The cases are fully determined by C{seed}.
+
+    Returns the ac case dict C{ppc} and the dc case dict C{pdc}.
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+    rng = default_rng(seed)
+
+    if nbus < 3*nzones:
+        raise ValueError('at least 3 ac buses per ac zone are needed')
+    if nconv < 2*ngriddc:
+        raise ValueError('at least 2 converters per dc grid are needed')
+
+    ##-----  ac grids  -----
+    ## buses (numbered per zone)
+    nbz = array([nbus//nzones + (z < nbus % nzones) for z in range(nzones)])
+    zstart = r_[0, nbz.cumsum()[:-1]]
+    bus = zeros((nbus, 13))
+    bus[:,0] = arange(1, nbus+1)
+    bus[:,BUS_TYPE] = 1
+    bus[:,PD] = rng.uniform(10, 40, nbus).round(1)
+    bus[:,QD] = (0.2*bus[:,PD]).round(1)
+    bus[:,6] = 1            ## area
+    bus[:,7] = 1            ## voltage magnitude
+    bus[:,9] = 345          ## base voltage
+    bus[:,11] = 1.1         ## maximum voltage
+    bus[:,12] = 0.9         ## minimum voltage
+
+    ## branches: ring, second neighbours and random chords in every zone
+    f = []
+    t = []
+    for z in range(nzones):
+        n = nbz[z]
+        bz = zstart[z] + arange(n)
+        bus[bz,ZONE] = z + 1
+        f.append(bz)
+        t.append(bz[r_[1:n, 0]])
+        if n > 4:
+            f.append(bz)
+            t.append(bz[r_[2:n, 0, 1]])
+        nchord = n//20
+        if nchord > 0:
+            a = rng.integers(0, n, nchord)
+            b = (a + rng.integers(3, max(n-3, 4), nchord)) % n
+            f.append(bz[a])
+            t.append(bz[b])
+    f = r_[tuple(f)]
+    t = r_[tuple(t)]
+    nbr = f.size
+    branch = zeros((nbr, 13))
+    branch[:,0] = f + 1
+    branch[:,1] = t + 1
+    branch[:,2] = 0.005     ## resistance
+    branch[:,3] = 0.05      ## reactance
+    branch[:,4] = 0.02      ## total line charging susceptance
+    branch[:,5:8] = 250     ## ratings
+    branch[:,10] = 1        ## status
+    branch[:,11] = -360
+    branch[:,12] = 360
+
+    ## generators: slack at the first bus and PV at every tenth bus of a zone
+    gbus = r_[tuple([zstart[z] + arange(0, nbz[z], 10) for z in range(nzones)])]
+    gen = zeros((gbus.size, 10))
+    gen[:,GEN_BUS] = gbus + 1
+    gen[:,3] = 9999         ## maximum reactive power
+    gen[:,4] = -9999        ## minimum reactive power
+    gen[:,5] = 1.02         ## voltage set-point
+    gen[:,6] = 100          ## machine base
+    gen[:,7] = 1            ## status
+    gen[:,8] = 9999         ## maximum active power
+    bus[gbus,BUS_TYPE] = PV
+    bus[zstart,BUS_TYPE] = REF
+    gen[gbus == zstart[bus[gbus,ZONE].astype(int)-1], 5] = 1.04
+    for z in range(nzones):
+        gz = where(bus[gbus,ZONE] == z+1)[0]
+        gen[gz,PG] = (bus[bus[:,ZONE] == z+1, PD].sum()/gz.size).round(1)
+
+    ppc = {'version': '2', 'baseMVA': 100.0, 'bus': bus, 'gen': gen,
+           'branch': branch}
+
+    ##-----  dc grids  -----
+    ## converter ac buses: load buses, alternating over the ac zones
+    loadb = [rng.permutation(setdiff1d(zstart[z] + arange(nbz[z]), gbus))
+             for z in range(nzones)]
+    if (nconv + nzones - 1)//nzones > min([lb.size for lb in loadb]):
+        raise ValueError('too many converters for the number of ac buses')
+    cbus = array([loadb[k % nzones][k//nzones] for k in range(nconv)])
+
+    ## dc buses (one converter per dc bus), alternating over the dc grids
+    griddc = arange(nconv) % ngriddc + 1
+    order = griddc.argsort(kind='stable')
+    cbus, griddc = cbus[order], griddc[order]
+    busdc = zeros((nconv, 9))
+    busdc[:,0] = arange(1, nconv+1)
+    busdc[:,1] = cbus + 1
+    busdc[:,2] = griddc
+    busdc[:,4] = 1          ## dc voltage
+    busdc[:,5] = 345        ## base dc voltage
+    busdc[:,6] = 1.1        ## maximum dc voltage
+    busdc[:,7] = 0.9        ## minimum dc voltage
+
+    ## converters
+    convdc = ones((nconv, 1))*array([[0, 1, 1, 0, 0, 1, 0.0015, 0.1121,
+        0.0887, 0.0001, 0.16428, 345, 1.1, 0.9, 1.1, 1, 1.103, 0.887,
+        2.885, 4.371]])
+    convdc[:,0] = busdc[:,0]
+    convdc[:,3] = rng.uniform(-60, 60, nconv).round(1)
+    fdc = []
+    tdc = []
+    for g in range(1, ngriddc+1):
+        bg = where(griddc == g)[0]
+        n = bg.size
+        convdc[bg[0],1:3] = 2   ## dc slack, ac voltage control
+        convdc[bg[0],3] = 0
+        fdc.append(bg[:n if n > 2 else 1])
+        tdc.append(bg[r_[1:n, 0]][:n if n > 2 else 1])
+        if n > 4:
+            fdc.append(bg)
+            tdc.append(bg[r_[2:n, 0, 1]])
+    fdc = r_[tuple(fdc)]
+    tdc = r_[tuple(tdc)]
+
+    ## dc lines
+    branchdc = zeros((fdc.size, 9))
+    branchdc[:,0] = fdc + 1
+    branchdc[:,1] = tdc + 1
+    branchdc[:,2] = 0.052   ## resistance
+    branchdc[:,5:8] = 100   ## ratings
+    branchdc[:,8] = 1       ## status
+
+    ## dc-dc converters between random dc buses of the same dc grid
+    convdcdc = zeros((nconvdcdc, 9))
+    for k in range(nconvdcdc):
+        bg = where(griddc == rng.integers(1, ngriddc+1))[0]
+        convdcdc[k,0:2] = rng.choice(bg, 2, replace=False) + 1
+    convdcdc[:,2] = 1       ## voltage ratio
+    convdcdc[:,3] = 0.01    ## resistance
+    convdcdc[:,5] = 100     ## rating
+    convdcdc[:,8] = 1       ## status
+
+    pdc = {'version': '1', 'baseMVAac': 100.0, 'baseMVAdc': 100.0,
+           'pol': 2.0, 'busdc': busdc, 'convdc': convdc,
+           'branchdc': branchdc, 'convdcdc': convdcdc}
+
+    return ppc, pdc
@@ -0,0 +1,47 @@
+"""Builds the partition of an ac network into its ac zones.
+"""
+
+from numpy import zeros, where, arange, searchsorted
+
+from pypower.idx_bus import ZONE, BUS_I
+from pypower.idx_brch import F_BUS
+from pypower.idx_gen import GEN_BUS
+
+
+def makezonemap(bus, gen, branch, aczones):
+    """
+    Builds the partition of an ac network into its ac zones.
+
+    Returns a dict C{zonemap} with the ac zone of every bus, generator and
+    branch, given as the position of the zone in C{aczones}, and the rows
+    of the buses, generators and branches of every ac zone:
+        bus, gen, branch : ac zone positions of the rows of bus, gen, branch
+        buszi, genzi, brchzi : lists with the rows of every ac zone
+
+    Generators and branches belong to the zone of their (from) bus. The
+    partition only depends on the network topology, so it is built once
+    (see PREPACDCPF) and reused in every iteration of the sequential
+    algorithm.
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+    nz = aczones.size
+
+    ## bus rows indexed by bus number
+    e2i = zeros(int(bus[:,BUS_I].max())+1, dtype=int)
+    e2i[bus[:,BUS_I].astype(int)] = arange(bus.shape[0])
+
+    ## ac zones of buses, generators and branches
+    buszone = searchsorted(aczones, bus[:,ZONE])
+    genzone = buszone[e2i[gen[:,GEN_BUS].astype(int)]]
+    brchzone = buszone[e2i[branch[:,F_BUS].astype(int)]]
+
+    zonemap = {
+        'bus': buszone, 'gen': genzone, 'branch': brchzone,
+        'buszi': [where(buszone == i)[0] for i in arange(nz)],
+        'genzi': [where(genzone == i)[0] for i in arange(nz)],
+        'brchzi': [where(brchzone == i)[0] for i in arange(nz)],
+    }
+
+    return zonemap
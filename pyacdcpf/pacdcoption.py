@@ -2,14 +2,65 @@
 """
 
 ACDCPF_OPTIONS = [
+    ('ALGACDC', 1, '''ac/dc power flow algorithm
+1 - sequential ac/dc power flow
+2 - unified Newton-Raphson ac/dc power flow'''),
+
     ('TOLACDC', 1e-8, 'tolerance ac/dc power flow'),
 
     ('ITMAXACDC', 10, 'maximum iterations ac/dc power flow'),
 
+    ('ACCACDC', 0, '''acceleration of the outer iteration (sequential algorithm)
+0 - no acceleration (fixed-point iteration)
+1 - Anderson mixing
+2 - Aitken extrapolation
+3 - secant (Broyden) updates'''),
+
+    ('ACCDEPTH', 3, 'number of residuals kept by Anderson mixing'),
+
     ('TOLDC', 1e-8, 'tolerance dc power flow (Newton\'s method)'),
 
     ('ITMAXDC', 10, 'maximum iterations dc power flow (Newton\'s method)'),
 
+    ('PARAC', 0, '''concurrent solution of the ac zones (sequential algorithm)
+0 - solve the ac zones one after another
+1 - solve the ac zones concurrently in a thread pool
+2 - solve the ac zones concurrently in a process pool'''),
+
+    ('ACPF', 1, '''ac power flow algorithm of the ac zones (sequential algorithm)
+1 - Newton's method (with the zone admittance matrices built once)
+2 - fast-decoupled (XB version) until the mismatch is below ACPFSWITCH
+3 - fast-decoupled (BX version) until the mismatch is below ACPFSWITCH
+4 - dc power flow approximation until the mismatch is below ACPFSWITCH
+Newton's method is used from then on, including the last iteration'''),
+
+    ('ACPFSWITCH', 1e-3, 'outer mismatch (p.u.) below which the ac zones are solved with Newton\'s method'),
+
+    ('WARMAC', 1, '''warm start of the ac zone power flows (sequential algorithm)
+0 - start every ac zone power flow from the bus voltages of the case
+1 - start from the voltages of the last solution of every ac zone, also
+    over the snapshots of time series, Monte Carlo and contingency runs'''),
+
+    ('TOLSKIPAC', 0, '''skipping of unchanged ac zones (sequential algorithm)
+0 - solve all ac zones in every outer iteration
+t - only solve ac zones whose injections changed by t (p.u.) or more since
+    their last solution, e.g. 1e-10'''),
+
+    ('NWORKAC', 0, '''number of workers for the concurrent solution of the ac zones
+0 - number of ac zones, at most the number of processors'''),
+
+    ('PARDC', 0, '''solution of the dc grids in the dc network power flow (sequential algorithm)
+0 - solve all dc grids as one system
+1 - solve the dc grids separately, one after another
+2 - solve the dc grids separately and concurrently in a thread pool'''),
+
+    ('NWORKDC', 0, '''number of workers for the concurrent solution of the dc grids
+0 - number of dc grids, at most the number of processors'''),
+
+    ('CHORDDC', 0, '''reuse of the factorised dc power flow Jacobian (chord method)
+0 - refactorise the Jacobian in every iteration (Newton's method)
+n - reuse the factorised Jacobian for up to n iterations'''),
+
     ('TOLSLACKDROOP', 1e-8, 'tolerance dc slack bus iteration'),
 
     ('ITMAXSLACKDROOP', 10, 'maximum iterations dc slack bus iteration'),
@@ -30,6 +81,15 @@ ACDCPF_OPTIONS = [
 
     ('TOLLIM', 1e-2, 'maximum difference between subsequent violations'),
 
+    ('LIMVSMQ', 0, '''reuse of converter capability charts in the limit check
+0 - calculate the capability charts at every limit check
+q - cache the capability charts per converter and ac voltage magnitude
+    rounded to a multiple of q (p.u.), e.g. 1e-4'''),
+
+    ('CASECACHE', 0, '''cache of case files in binary case bundles (see CACHECASEACDC)
+0 - parse the case files at every call
+1 - convert the case files to a binary case bundle on first use'''),
+
     ('OUTPUT', 1, 'print output'),
 
     ('CONVPLOTOPT', 0, '''plot converter limit violations
@@ -0,0 +1,335 @@
+"""Prepares an ac/dc case for (repeated) sequential power flow solutions.
+"""
+from sys import stdout, stderr
+
+from numpy import r_, zeros, where, setdiff1d, arange, intersect1d, union1d, \
+                 sqrt, sort, unique, isin
+
+from pypower.loadcase import loadcase
+from pypower.ppoption import ppoption
+
+from pypower.idx_bus import BUS_TYPE, PQ, REF, PV, ZONE, BUS_I
+from pypower.idx_gen import PG, QG, VG, QMAX, QMIN, GEN_BUS, GEN_STATUS, \
+                MBASE, PMAX, PMIN
+
+from pyacdcpf.idx_busdc import BUSAC_I, GRIDDC, BUSDC_I
+from pyacdcpf.idx_brchdc import F_BUSDC, T_BUSDC
+from pyacdcpf.idx_convdc import CONVSTATUS, CONVTYPE_DC, DCSLACK, DCDROOP, \
+        DCNOSLACK, CONVTYPE_AC, PVC, PQC, QCONV, VCONV, BASEKVC, LOSSA, \
+        LOSSB, LOSSCR, LOSSCI, ICMAX, VCMAX, VCMIN, RCONV, XCONV, RTF, XTF, BF
+
+from pyacdcpf.pacdcoption import pacdcoption
+from pyacdcpf.loadcasedc import loadcasedc
+from pyacdcpf.loadcaseacdc import loadcaseacdc
+from pyacdcpf.cachecaseacdc import cachecaseacdc
+from pyacdcpf.convout import convout
+from pyacdcpf.convdcdcout import convdcdcout
+from pyacdcpf.brchdcout import brchdcout
+from pyacdcpf.brchout import brchout
+from pyacdcpf.genout import genout
+from pyacdcpf.ext2intdc import ext2intdc
+from pyacdcpf.ext2intac import ext2intac
+from pyacdcpf.ext2intpu import ext2intpu
+from pyacdcpf.makeYbusdc import makeYbusdc
+from pyacdcpf.prepdcjac import prepdcjac
+from pyacdcpf.makegridmap import makegridmap
+from pyacdcpf.zonecheck import zonecheck
+from pyacdcpf.makezonemap import makezonemap
+
+## define j
+## DONT USE j IN ANYWHERE ELSE!!!
+j = sqrt(-1+0j)
+
+
+def prepacdcpf(caseac, casedc, pacdcopt=None, ppopt=None):
+    """
+    Prepares an ac/dc case for (repeated) sequential power flow solutions.
+
+    Performs all steps of the sequential ac/dc power flow that only depend
+    on the network topology and parameters: out-of-service element removal,
+    external to internal renumbering and sorting, per unit conversion,
+    index initialisation, violation checks, dummy generator creation,
+    converter parameter conversion and the dc bus admittance matrix.
+
+    Returns a prepared case dict PCASE (all matrices in internal numbering)
+    which can be solved repeatedly with SOLVEACDCPF. Only the injections
+    in PCASE['bus'] (PD, QD), PCASE['gen'] (PG) and PCASE['convdc'] (PCONV,
+    QCONV, PDCSET) should be changed between solutions, preferably with
+    SETINJACDC. The solution is converted back to the input case format
+    with INT2EXTACDC. Converter capability charts cached by the limit check
+    (option LIMVSMQ) are kept in PCASE['convenv'] and are reused by later
+    solutions. A binary case bundle (see SAVECASEACDC) is loaded by passing
+    its name as CASEAC; case files are converted to bundles on first use
+    with the option CASECACHE (see CACHECASEACDC).
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    @author: Lazar Scekic (University of Montenegro)
+    """
+
+    # Set PyACDC options
+    pacdcopt = pacdcoption(pacdcopt)
+
+    # Load the AC and DC test systems (from a binary case bundle if given)
+    if isinstance(caseac, str) and caseac.endswith('.acdc'):
+        caseac, casedc = loadcaseacdc(caseac)
+    elif pacdcopt["CASECACHE"] and isinstance(caseac, str) and \
+            isinstance(casedc, str):
+        caseac, casedc = cachecaseacdc(caseac, casedc)
+    ppc = loadcase(caseac)
+    pdc = loadcasedc(casedc)
+
+    # Define pypower options
+    ppopt = ppoption(ppopt)
+    ppopt["VERBOSE"] = 0
+    ppopt["OUT_ALL"] = 0
+
+    multslack = pacdcopt["MULTSLACK"]
+    output = pacdcopt["OUTPUT"]
+
+    # Remove out-of-service AC-DC converters from the system
+    pdc, conv0busi, conv1, conv1i, conv0, conv0i = convout(pdc)
+    pdc['convdc'] = conv1
+
+    # Remove out-of-service DC-DC converters from the system
+    pdc, convdcdc1, convdcdc1i, convdcdc0, convdcdc0i = convdcdcout(pdc)
+    pdc['convdcdc'] = convdcdc1
+
+    # Remove out-of-service DC branches from the system
+    brchdc1, brchdc1i, brchdc0, brchdc0i = brchdcout(pdc)
+    pdc['branchdc'] = brchdc1
+
+    # Remove out-of-service AC branches from the system
+    brch1, brch1i, brch0, brch0i = brchout(ppc)
+    ppc['branch'] = brch1
+
+    # Remove out of service generators from the system
+    gen1, gen1i, gen0, gen0i = genout(ppc)
+    ppc['gen'] = gen1
+
+    # DC network external to internal bus numbering
+    i2edcpmt, i2edc, pdc = ext2intdc(pdc)
+
+    # AC network external to internal bus numbering
+    acdmbus, i2eac, pdc, ppc = ext2intac(pdc,ppc)
+
+    # Sort matrices by new bus numbers
+    i2ebus = ppc['bus'][:,0].argsort()
+    i2egen = ppc['gen'][:,0].argsort()
+    i2ebrch = ppc['branch'][:,0].argsort()
+    i2ebusdc = pdc['busdc'][:,0].argsort()
+    i2ebrchdc = pdc['branchdc'][:,0].argsort()
+    i2econvdc = pdc['convdc'][:,0].argsort()
+
+    i2econvdcdc = zeros(0, dtype=int)
+    if pdc['convdcdc'].shape[0] > 0:
+        i2econvdcdc = pdc['convdcdc'][:,0].argsort()
+        pdc['convdcdc'] = pdc['convdcdc'][i2econvdcdc,:]
+
+    # Update the AC and DC system structures
+    ppc['bus'] = ppc['bus'][i2ebus,:]
+    ppc['gen'] = ppc['gen'][i2egen,:]
+    ppc['branch'] = ppc['branch'][i2ebrch,:]
+    pdc['busdc'] = pdc['busdc'][i2ebusdc,:]
+    pdc['branchdc'] = pdc['branchdc'][i2ebrchdc,:]
+    pdc['convdc'] = pdc['convdc'][i2econvdc,:]
+
+    # Per unit external to internal data conversion
+    pdc = ext2intpu(ppc['baseMVA'], pdc)
+
+    ##-----  Additional data preparation & index initialisation  -----
+    ## zero rows addition to convdc matrix (dc buses without converter)
+    convdc1 = zeros((pdc['busdc'].shape[0]-pdc['convdc'].shape[0],
+                     pdc['convdc'].shape[1]))
+    pdc['convdc'] = r_[pdc['convdc'],convdc1]
+
+    ## indices initialisation
+    bdci = where(pdc['busdc'][:,BUSAC_I])[0].astype(int)
+    cdci = where(pdc['convdc'][:,CONVSTATUS] == 1)[0].astype(int)
+    slackdc = where(pdc['convdc'][:,CONVTYPE_DC] == DCSLACK)[0].astype(int)
+
+    droopdc = where(pdc['convdc'][:,CONVTYPE_DC] == DCDROOP)[0].astype(int)
+    ngriddc = pdc['busdc'][:,GRIDDC].max()
+
+    ## convert to internal indexing
+    baseMVA, bus, gen, branch = \
+        ppc["baseMVA"], ppc["bus"], ppc["gen"], ppc["branch"]
+
+    baseMVAac, baseMVAdc, pol, busdc, convdc, branchdc, convdcdc = \
+        pdc["baseMVAac"], pdc["baseMVAdc"], pdc["pol"], \
+        pdc["busdc"], pdc["convdc"], pdc["branchdc"], pdc['convdcdc']
+
+    ##-----  Violation check  -----
+    ## dc slack bus and distributed voltage bus violation check
+    gridviol = setdiff1d(arange(1,ngriddc+1),busdc[r_[slackdc, droopdc],GRIDDC])
+
+    if not gridviol.size == 0:
+        stdout.write('\nNo dc slack bus defined in grid %s \n' % (gridviol))
+        stderr.write('No droop controlled bus or slack bus defined for every dc grid !\n')
+
+    ## remove multiple slack buses
+    if multslack == 0:
+        for ii in arange(1,ngriddc+1):
+            slackdcii = intersect1d(slackdc,where(busdc[:,GRIDDC] == ii)[0])
+            if slackdcii.size > 1:
+                convdc[slackdcii[0].astype(int),CONVTYPE_DC ] = DCSLACK
+                convdc[slackdcii[1:].astype(int),CONVTYPE_DC ] = DCNOSLACK
+                slackdcii = slackdcii[0]
+
+                ##  printout changes
+                stdout.write('\nMultiple dc slack busses defined in grid %d' %(ii))
+                stdout.write('\n     Bus %d kept as the slack bus\n'%\
+                            (i2edc[slackdcii.astype(int)+1]))
+
+        ## redefine slack buses
+        slackdc  = where(convdc[:,CONVTYPE_DC] == DCSLACK)[0].astype(int)
+
+    ## define indices of slack, droop and power controlled buses
+    slackdroopdc = union1d(slackdc, droopdc)
+    noslackbdc   = setdiff1d(where(busdc[:,BUSDC_I]), slackdc)
+
+    ## remove converter and generator V control violations
+    vcontrvsc = where(convdc[:,CONVTYPE_AC] == PVC)[0]
+    vcontrgen = r_[where(bus[:,BUS_TYPE] == PV)[0], \
+                   where(bus[:,BUS_TYPE] == REF)[0]]
+    ##  buses with V control conflicts
+    vconfl = intersect1d(vcontrvsc, vcontrgen).astype(int)
+    convdc[vconfl,CONVTYPE_AC] = PQC
+    convdc[vconfl,QCONV] = 0
+    convdc[:,QCONV] *= convdc[:,CONVTYPE_AC] == PQC
+    if not vconfl.size == 0:
+        stdout.write('Generator & VSC converter on the same bus')
+        stdout.write('\n   Conflicting voltage control on bus %s' %(i2eac[vconfl+1]))
+        stdout.write('\n=> Corresponding VSC Converter set to PQ control without Q injections.\n')
+
+    ##-----  initialisation ac network  -----
+    ## dummy generator initialisation
+    Vcref = convdc[:,VCONV] # voltage setpoints
+    busVSC = bus.copy()
+    gendm = zeros((0,gen.shape[1]))
+    genPQ = zeros((0,1)).astype(int)
+    genPQi = zeros((0,1)).astype(int)
+    Qcmin_dum = -99999
+    Qcmax_dum   =  99999
+    Pcmin_dum   =      0
+    Pcmax_dum   =  99999
+
+    ## dummy generator addition
+    for ii in arange(convdc.shape[0]):
+        ## change control from PQ to PV for buses with converter in PV control
+        if bus[ii,BUS_TYPE] == PQ and convdc[ii,CONVTYPE_AC] == PVC:
+            busVSC[ii,BUS_TYPE] = PV
+            ## add dummy generator to V controlling converter bus without generator
+            if not any(gen[:,GEN_BUS] == bus[ii,BUS_I]):
+                gendm = r_[gendm, zeros((1,gen.shape[1]))]
+                gendm[-1,[GEN_BUS,PG,QG,QMAX,QMIN,VG,MBASE,GEN_STATUS,PMAX,PMIN]] = \
+                    [ii+1,0,0,Qcmax_dum,Qcmin_dum,Vcref[ii],baseMVAac,1,Pcmax_dum,Pcmin_dum]
+            else:
+                genPQ = r_[genPQ,bus[ii,BUS_I]]
+                genPQii = where(gen[:,GEN_BUS] == bus[ii,BUS_I])[0]
+                genPQi = r_[genPQi,genPQii]
+
+    ## define buses with dummy generator
+    # gdmbus = where(gendm[[where(bus[:,BUS_I]==x)[0][0] for x in \
+                # gendm[:,GEN_BUS]],GEN_BUS])[0]
+    if any(gendm[:,GEN_BUS]):
+        gdmbus = where(isin(bus[:,BUS_I], gendm[:,GEN_BUS]))[0]
+    else:
+        gdmbus = []
+
+    ##-----  initialisation of converter quantities -----
+    ## per unit converter loss coefficients values
+    basekA = baseMVA/(sqrt(3)*convdc[:,BASEKVC])
+    lossa = convdc[:,LOSSA]/baseMVA
+    lossb = convdc[:,LOSSB]*basekA/baseMVA
+    losscr = convdc[:,LOSSCR]*basekA**2/baseMVA
+    lossci = convdc[:,LOSSCI]*basekA**2/baseMVA
+
+    ## converter reactor parameters
+    Rc = convdc[:,RCONV]
+    Xc = convdc[:,XCONV]
+    Zc = Rc+j*Xc
+
+    ## converter limits data
+    Icmax = convdc[:,ICMAX]
+    Vcmax = convdc[:,VCMAX]
+    Vcmin = convdc[:,VCMIN]
+
+    ## filter reactance
+    Bf = convdc[:,BF]
+
+    ## transformer parameters
+    Rtf = convdc[:,RTF]
+    Xtf = convdc[:,XTF]
+    Ztf = Rtf+j*Xtf
+
+
+    ##-----  initialisation of dc network quantities -----
+    ## build dc bus matrix
+    Ybusdc, Yfdc, Ytdc = makeYbusdc( busdc, branchdc, convdcdc)
+
+    ## ordering of the reduced dc Jacobian
+    dcjac = prepdcjac(Ybusdc, noslackbdc)
+
+    ## partition of the dc network into its dc grids
+    gridmap = makegridmap(busdc, Ybusdc, slackdc, noslackbdc)
+
+    ## dc branch terminal bus indices
+    brchdcf = [where(busdc[:,BUSDC_I]==x)[0][0] for x in branchdc[:,F_BUSDC]]
+    brchdct = [where(busdc[:,BUSDC_I]==x)[0][0] for x in branchdc[:,T_BUSDC]]
+
+    ## detect ac islands errors (non-synchronised zones => to be solved independently)
+    zonecheck(bus, gen, branch, i2eac, output)
+    aczones = sort(unique(bus[:,ZONE])).astype(int)
+    zonemap = makezonemap(bus, r_[gen, gendm], branch, aczones)
+
+    ## internal to original row indices (of the input case files)
+    busi = i2ebus
+    geni = gen1i[i2egen]
+    convi = conv1i[i2econvdc]
+    busdci = i2edcpmt[i2ebusdc]
+    brchdci = brchdc1i[i2ebrchdc]
+    brchi = brch1i[i2ebrch]
+    convdcdci = convdcdc1i[i2econvdcdc].astype(int)
+
+    ##-----  prepared case  -----
+    pcase = {
+        'pacdcopt': pacdcopt, 'ppopt': ppopt,
+        ## internal ac and dc case data
+        'baseMVA': baseMVA, 'bus': bus, 'gen': gen, 'branch': branch,
+        'baseMVAac': baseMVAac, 'baseMVAdc': baseMVAdc, 'pol': pol,
+        'busdc': busdc, 'convdc': convdc, 'branchdc': branchdc,
+        'convdcdc': convdcdc,
+        ## out-of-service elements
+        'conv0busi': conv0busi, 'conv1i': conv1i, 'conv0': conv0,
+        'conv0i': conv0i, 'convdcdc0': convdcdc0, 'convdcdc0i': convdcdc0i,
+        'convdcdc1i': convdcdc1i, 'brchdc0': brchdc0, 'brchdc0i': brchdc0i,
+        'brchdc1i': brchdc1i, 'brch0': brch0, 'brch0i': brch0i,
+        'brch1i': brch1i, 'gen0': gen0, 'gen0i': gen0i, 'gen1i': gen1i,
+        ## renumbering and sorting
+        'i2edcpmt': i2edcpmt, 'i2edc': i2edc, 'acdmbus': acdmbus,
+        'i2eac': i2eac, 'i2ebus': i2ebus, 'i2egen': i2egen,
+        'i2ebrch': i2ebrch, 'i2ebusdc': i2ebusdc, 'i2ebrchdc': i2ebrchdc,
+        'i2econvdc': i2econvdc,
+        ## indices
+        'bdci': bdci, 'cdci': cdci, 'slackdc': slackdc, 'droopdc': droopdc,
+        'slackdroopdc': slackdroopdc, 'noslackbdc': noslackbdc,
+        'vconfl': vconfl,
+        'ngriddc': ngriddc, 'aczones': aczones, 'zonemap': zonemap,
+        'gridmap': gridmap,
+        'brchdcf': brchdcf, 'brchdct': brchdct,
+        ## dummy generators
+        'busVSC': busVSC, 'gendm': gendm, 'genPQ': genPQ, 'genPQi': genPQi,
+        'gdmbus': gdmbus,
+        ## converter parameters
+        'lossa': lossa, 'lossb': lossb, 'losscr': losscr, 'lossci': lossci,
+        'Zc': Zc, 'Ztf': Ztf, 'Bf': Bf, 'Icmax': Icmax, 'Vcmax': Vcmax,
+        'Vcmin': Vcmin, 'convenv': {},
+        ## dc network matrices
+        'Ybusdc': Ybusdc, 'Yfdc': Yfdc, 'Ytdc': Ytdc, 'dcjac': dcjac,
+        ## internal to original row indices
+        'busi': busi, 'geni': geni, 'convi': convi, 'busdci': busdci,
+        'brchdci': brchdci, 'brchi': brchi, 'convdcdci': convdcdci,
+    }
+
+    return pcase
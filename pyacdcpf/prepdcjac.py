@@ -0,0 +1,49 @@
+"""Prepares the reduced dc network Jacobian for repeated factorisations.
+"""
+
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+
+def prepdcjac(Ybusdc, noslack):
+    """
+    Prepares the reduced dc network Jacobian for repeated factorisations.
+
+    The reduced dc Jacobian (rows and columns of the buses in C{noslack})
+    has the sparsity pattern of the reduced dc bus admittance matrix, which
+    only depends on the dc network topology. A fill-reducing ordering
+    (reverse Cuthill-McKee) of this pattern is determined once, and the
+    reduced admittance matrix is stored in that ordering, such that every
+    Newton-Raphson iteration of DCNETWORKPF only needs a numerical
+    factorisation without reordering.
+
+    Returns a dict C{dcjac} with the fields:
+        ns : ordered indices of the buses in the reduced Jacobian
+        Yr : reduced dc bus admittance matrix in the order C{ns} (CSC)
+
+    The dict is also used by DCNETWORKPF to keep the last factorisation
+    (fields lu, age, the factorised Jacobian Jr and, for low-rank updates,
+    KC), so a copy should be passed to every solution. APPLYOUTAGE adds the
+    field base for low-rank updates of a base factorisation.
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+
+    ## reduced dc bus admittance matrix
+    Yr = Ybusdc.tocsr()[noslack,:][:,noslack]
+
+    ## fill-reducing ordering of the reduced matrix
+    perm = reverse_cuthill_mckee(Yr.tocsr(), symmetric_mode=False)
+    ns = noslack[perm]
+
+    dcjac = {
+        'ns': ns,
+        'Yr': Yr[perm,:][:,perm].tocsc(),
+        'lu': None,
+        'age': 0,
+        'Jr': None,
+        'KC': None,
+        'base': None,
+    }
+
+    return dcjac
@@ -0,0 +1,216 @@
+"""Runs a contingency analysis with the sequential ac/dc power flow.
+"""
+from sys import stdout
+from os import cpu_count
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from numpy import zeros, sqrt, abs, where, unique
+
+from scipy.sparse.csgraph import connected_components
+
+from pypower.loadcase import loadcase
+
+from pyacdcpf.idx_busdc import VDCMAX, VDCMIN
+
+from pyacdcpf.loadcasedc import loadcasedc
+from pyacdcpf.pacdcoption import pacdcoption
+from pyacdcpf.prepacdcpf import prepacdcpf
+from pyacdcpf.solveacdcpf import solveacdcpf
+from pyacdcpf.applyoutage import applyoutage
+from pyacdcpf.makeresultstore import makeresultstore
+from pyacdcpf.storeresult import storeresult
+
+
+def runacdcpfcont(caseac, casedc, outages, pacdcopt=None, ppopt=None,
+                  parallel=0, nworkers=0, fname=None):
+    """
+    Runs a contingency analysis with the sequential ac/dc power flow.
+
+    The base case is loaded, prepared and solved once. Every contingency
+    in C{outages} is derived from the prepared base case (see APPLYOUTAGE)
+    and solved warm started from the base case solution (except for
+    converter outages, which are solved from a flat start), the dc network
+    power flows of dc branch and dc-dc converter outages as low-rank
+    updates of the factorised dc Jacobian of the base case solution.
+    Contingencies that split a dc grid into islands are solved with every
+    island as a separate dc grid. Contingencies that leave a dc grid or
+    island without slack or droop converter are not solved.
+    An exception is raised if the base case does not converge.
+
+    Inputs:
+        CASEAC : ac power flow data (see RUNACDCPF)
+        CASEDC : dc power flow data (see RUNACDCPF)
+        OUTAGES : list of contingencies, every contingency being an outage
+            C{(type, row)} or a list of outages (N-k), with the row of the
+            element in the input case files and the type 'branch' (ac
+            branch), 'branchdc' (dc branch), 'convdc' (ac/dc converter) or
+            'convdcdc' (dc-dc converter)
+        PACDCOPT : PYACDCPF options vector (see PACDCOPTION), the option
+            OUTPUT prints the summary table of the contingencies
+        PPOPT : PYPOWER options vector (see PPOPTION)
+        PARALLEL : 0 - solve the contingencies one after another,
+            1 - in a thread pool, 2 - in a process pool
+        NWORKERS : number of workers (0 - number of processors)
+        FNAME : directory for memory-mapped results (see MAKERESULTSTORE)
+
+    Outputs:
+        RESULTS : dict with the results of every contingency (see
+            MAKERESULTSTORE, one row per contingency) and
+                islanded : flag for contingencies splitting a dc grid into
+                    islands
+                noslackdc : flag for contingencies leaving a dc grid without
+                    slack or droop converter
+                vdcmin, vdcmax : lowest and highest dc bus voltage (p.u.)
+                icmax : highest converter current relative to its limit
+                nviol : number of limit violations
+                violations : list with, per contingency, the list of
+                    violations (limit, row, value, limit value), with limit
+                    'VDCMAX' or 'VDCMIN' for dc bus voltages (row of busdc)
+                    and 'ICMAX' for converter currents (row of convdc)
+                base : results of the base case (one row)
+
+    Examples of usage:
+        outages = [('branchdc', 0), ('convdc', 2), [('branch', 1),
+                   ('branchdc', 3)]]
+        results = runacdcpfcont(case5_stagg(), case5_stagg_MTDCslack(),
+                                outages, pacdcoption(OUTPUT=0))
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+    ## load and prepare base case (without output of the solutions)
+    ppc = loadcase(caseac)
+    pdc = loadcasedc(casedc)
+    pacdcopt = pacdcoption(pacdcopt)
+    output = pacdcopt["OUTPUT"]
+    pcase = prepacdcpf(ppc, pdc, pacdcoption(pacdcopt, OUTPUT=0), ppopt)
+
+    ## solve base case
+    base, x0, _, _ = _solvecont(pcase, None, None, [], None)
+    if not base['converged'][0]:
+        raise Exception('The base case did not converge, the contingencies '
+                        'cannot be solved from its solution.\n')
+    ngriddc = connected_components(pcase['Ybusdc'], directed=False)[0]
+
+    ## factorised dc Jacobian of the base case solution for low-rank updates
+    ## and ac zone cache for warm starts (factorisation objects cannot be
+    ## passed to other processes)
+    dcjac = x0.pop('dcjac')
+    if parallel == 2:
+        x0.pop('accache')
+    pcase = dict(pcase, dcjac=dict(pcase['dcjac'], Jr=dcjac['Jr'],
+                 lu=dcjac['lu'] if parallel != 2 else None))
+
+    ## solve contingencies
+    nc = len(outages)
+    args = [(pcase, ppc, pdc, outage, x0, ngriddc) for outage in outages]
+    if parallel == 0:
+        solutions = map(_runcont, args)
+    else:
+        nworkers = nworkers if nworkers > 0 else min(nc, cpu_count())
+        if parallel == 1:
+            executor = ThreadPoolExecutor(nworkers)
+        else:
+            executor = ProcessPoolExecutor(nworkers)
+        solutions = executor.map(_runcont, args)
+
+    ## collect results
+    results = makeresultstore(pcase, nc, fname)
+    results.update({
+        'islanded': zeros(nc, dtype=int), 'noslackdc': zeros(nc, dtype=int),
+        'vdcmin': zeros(nc),
+        'vdcmax': zeros(nc), 'icmax': zeros(nc), 'nviol': zeros(nc, dtype=int),
+        'violations': [], 'base': base,
+    })
+    for c, (row, viol, unsolved) in enumerate(solutions):
+        for key in row:
+            results[key][c] = row[key][0]
+        if unsolved is not None:
+            results[unsolved][c] = 1
+            results['violations'].append([])
+            continue
+        results['vdcmin'][c] = row['VDC'].min()
+        results['vdcmax'][c] = row['VDC'].max()
+        results['nviol'][c] = len(viol)
+        results['violations'].append(viol)
+
+    if parallel != 0:
+        executor.shutdown()
+
+    ## print summary
+    if output:
+        stdout.write('\n================================================================================')
+        stdout.write('\n|     Contingency analysis                                                     |')
+        stdout.write('\n================================================================================')
+        stdout.write('\n Cont  Outage                        Conv  Vdc min  Vdc max  Ic/Icmax  Viol')
+        stdout.write('\n  #                                         (pu)     (pu)     (pu)     #  ')
+        stdout.write('\n-----  ----------------------------  ----  -------  -------  --------  ----')
+        for c in range(nc):
+            outage = outages[c] if isinstance(outages[c], list) else [outages[c]]
+            name = ', '.join(['%s %d' % (kind, k) for kind, k in outage])
+            if results['noslackdc'][c]:
+                stdout.write('\n%4d   %-28s  dc grid without slack bus' % (c, name[:28]))
+            else:
+                stdout.write('\n%4d   %-28s%5d%9.3f%9.3f%10.3f%6d' % (c, name[:28], \
+                    results['converged'][c], results['vdcmin'][c], \
+                    results['vdcmax'][c], results['icmax'][c], results['nviol'][c]))
+                if results['islanded'][c]:
+                    stdout.write('  islanded')
+        stdout.write('\n')
+
+    return results
+
+
+def _runcont(args):
+    """Applies the outages of a contingency and solves it."""
+    pcase, ppc, pdc, outage, x0, ngriddc = args
+    row, _, viol, unsolved = _solvecont(pcase, ppc, pdc, outage, x0, ngriddc)
+    return row, viol, unsolved
+
+
+def _solvecont(pcase, ppc, pdc, outage, x0, ngriddc=None):
+    """
+    Solves a contingency. Returns its results (one row, see
+    MAKERESULTSTORE, with the flag islanded), solution state and
+    violations, and 'noslackdc' if it is not solved (None otherwise).
+    """
+    pcasek = applyoutage(pcase, outage, ppc, pdc) if outage else pcase
+
+    ## dc grids split into islands or without slack or droop converter
+    islanded = zeros(1, dtype=int)
+    if ngriddc is not None:
+        ncomp, comp = connected_components(pcasek['Ybusdc'], directed=False)
+        islanded[0] = ncomp > ngriddc
+        if unique(comp[pcasek['slackdroopdc']]).size < ncomp:
+            return {'islanded': islanded}, None, [], 'noslackdc'
+
+    ## warm start from the base case, unless the case was prepared again
+    ## (converter outages, see APPLYOUTAGE), which changes the internal bus
+    ## and converter order
+    if isinstance(outage, tuple):
+        outage = [outage]
+    if 'convdc' in [kind for kind, _ in outage]:
+        x0 = None
+    state, converged = solveacdcpf(pcasek, x0)
+
+    row = makeresultstore(pcase, 1)
+    storeresult(row, 0, pcasek, state, converged)
+    row['islanded'] = islanded
+
+    ## dc bus voltage limits
+    busdc, busdci = pcasek['busdc'], pcasek['busdci']
+    Vdc = state['Vdc']
+    viol = []
+    for i in where((busdc[:,VDCMAX] > 0) & (Vdc > busdc[:,VDCMAX]))[0]:
+        viol.append(('VDCMAX', busdci[i], Vdc[i], busdc[i,VDCMAX]))
+    for i in where((busdc[:,VDCMIN] > 0) & (Vdc < busdc[:,VDCMIN]))[0]:
+        viol.append(('VDCMIN', busdci[i], Vdc[i], busdc[i,VDCMIN]))
+
+    ## converter current limits
+    cdci, convi, Icmax = pcasek['cdci'], pcasek['convi'], pcasek['Icmax']
+    Ic = sqrt(state['Pc'][cdci]**2 + state['Qc'][cdci]**2)/abs(state['Vc'][cdci])
+    for i in where(Ic > Icmax[cdci])[0]:
+        viol.append(('ICMAX', convi[cdci[i]], Ic[i], Icmax[cdci[i]]))
+    row['icmax'] = (Ic/Icmax[cdci]).max(keepdims=True) if cdci.size else zeros(1)
+
+    return row, state, viol, None
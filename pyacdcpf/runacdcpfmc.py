@@ -0,0 +1,297 @@
+"""Runs a Monte Carlo probabilistic sequential ac/dc power flow.
+"""
+from os import cpu_count
+from threading import local
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from numpy import zeros, arange, sqrt, abs, maximum, minimum, floor, clip, \
+                  cumsum, add, inf, asarray
+from numpy.random import SeedSequence, default_rng
+
+from pypower.loadcase import loadcase
+
+from pyacdcpf.loadcasedc import loadcasedc
+from pyacdcpf.pacdcoption import pacdcoption
+from pyacdcpf.prepacdcpf import prepacdcpf
+from pyacdcpf.setinjacdc import setinjacdc
+from pyacdcpf.solveacdcpf import solveacdcpf
+from pyacdcpf.makeresultstore import makeresultstore
+from pyacdcpf.storeresult import storeresult
+
+## quantities of which the statistics are collected
+QUANTITIES = ('VM', 'VDC', 'PCONV', 'QCONV', 'PLOSS', 'LOADING')
+
+## prepared case and sampling data of a worker thread or process
+_worker = local()
+
+
+def runacdcpfmc(caseac, casedc, samples, nsamples, pacdcopt=None, ppopt=None,
+                seed=0, chunk=100, quantiles=(0.05, 0.5, 0.95), nbins=1000,
+                npilot=100, warmstart=1, parallel=0, nworkers=0):
+    """
+    Runs a Monte Carlo probabilistic sequential ac/dc power flow.
+
+    The injections in C{samples} are drawn from the given distributions
+    and the sequential ac/dc power flow is solved for every sample. The
+    samples are split into chunks of C{chunk} samples, every chunk having
+    its own random generator spawned from C{seed}, so the results only
+    depend on C{seed}, C{chunk} and C{npilot} and not on the number of
+    workers or the order in which the chunks are solved. Every worker loads
+    and prepares the case once (see PREPACDCPF) and solves its chunks with
+    updated injections (see SETINJACDC), every sample warm started from the
+    previous sample of the chunk.
+
+    The statistics are accumulated chunk by chunk without storing the
+    samples: mean and variance are merged exactly, the quantiles are
+    interpolated in histograms of C{nbins} bins per element. The histogram
+    ranges are set from a pilot of C{npilot} samples (at most C{nsamples}),
+    solved before the chunks with a random generator of its own, so they do
+    not depend on C{chunk}. The ranges of the converged pilot samples are
+    widened by a margin of half of them on both sides, values outside the
+    ranges are counted in the outer bins. The pilot samples are not
+    included in the statistics and at least 2 of them have to converge.
+    Samples that do not converge are not included in the statistics.
+
+    Inputs:
+        CASEAC : ac power flow data (see RUNACDCPF)
+        CASEDC : dc power flow data (see RUNACDCPF)
+        SAMPLES : dict with the distributions of the sampled injections,
+            in the row order of the input case files (out-of-service
+            elements are ignored). Each key is optional:
+                PD, QD : ac bus loads (MW, MVAr), one element per bus
+                PG     : generator active power (MW), one per generator
+                PCONV, QCONV : converter power set-points (MW, MVAr), one
+                         per converter
+                PDCSET : converter droop power set-points (MW), one per
+                         converter
+            Every distribution is either a tuple C{(dist, p1, p2, ...)},
+            drawn with the method C{dist} of numpy.random.Generator with
+            the parameters broadcast to one value per element, e.g.
+            C{('normal', PD0, 0.1*PD0)}, or a function C{f(rng, size)}
+            returning an array of the shape C{size} (samples x elements),
+            e.g. for wind power from sampled wind speeds. Functions must
+            be defined at module level for process pools.
+        NSAMPLES : number of samples
+        PACDCOPT : PYACDCPF options vector (see PACDCOPTION)
+        PPOPT : PYPOWER options vector (see PPOPTION)
+        SEED : seed of the random generators (default 0)
+        CHUNK : number of samples per chunk (default 100)
+        QUANTILES : quantile levels (default (0.05, 0.5, 0.95))
+        NBINS : number of histogram bins per element (default 1000)
+        NPILOT : number of pilot samples setting the histogram ranges
+            (default 100)
+        WARMSTART : start each sample from the previous converged solution
+            of its chunk (default 1)
+        PARALLEL : 0 - solve the chunks one after another, 1 - in a thread
+            pool, 2 - in a process pool
+        NWORKERS : number of workers (0 - number of processors)
+
+    Outputs:
+        RESULTS : dict with, for every quantity
+                VM      : ac bus voltage magnitudes (p.u.)
+                VDC     : dc bus voltages (p.u.)
+                PCONV, QCONV : converter grid side injections (MW, MVAr)
+                PLOSS   : converter losses (MW)
+                LOADING : converter currents relative to their limits
+            a dict with the vectors mean, var, std, min and max and the
+            array quantiles (quantile levels x elements), in the row order
+            of the input case files, and
+                nsamples : number of samples
+                nconverged : number of converged samples
+                quantiles : quantile levels
+
+    Examples of usage:
+        PD0 = case5_stagg()['bus'][:, PD]
+        samples = {'PD': ('normal', PD0, 0.1*PD0),
+                   'PCONV': ('uniform', -80, 80)}
+        results = runacdcpfmc(case5_stagg(), case5_stagg_MTDCslack(),
+                              samples, 1000, pacdcoption(OUTPUT=0), seed=1,
+                              parallel=2)
+        results['VDC']['quantiles']
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+    ## load case (without output of the solutions)
+    ppc = loadcase(caseac)
+    pdc = loadcasedc(casedc)
+    pacdcopt = pacdcoption(pacdcopt, OUTPUT=0)
+    init = (ppc, pdc, pacdcopt, ppopt, samples, warmstart)
+
+    ## chunks with their own random generators
+    root = SeedSequence(seed)
+    starts = arange(0, nsamples, chunk)
+    seeds = root.spawn(starts.size)
+    sizes = minimum(starts + chunk, nsamples) - starts
+
+    ## pilot samples (generator of the root seed), which set the histogram
+    ## ranges
+    _initworker(*init)
+    ranges = _runchunk((min(npilot, nsamples), root, None, nbins))['ranges']
+
+    ## chunks
+    args = [(sizes[k], seeds[k], ranges, nbins) for k in range(starts.size)]
+    if parallel == 0 or len(args) == 1:
+        partials = map(_runchunk, args)
+    else:
+        nworkers = nworkers if nworkers > 0 else min(len(args), cpu_count())
+        if parallel == 1:
+            executor = ThreadPoolExecutor(nworkers, initializer=_initworker,
+                                          initargs=init)
+        else:
+            executor = ProcessPoolExecutor(nworkers, initializer=_initworker,
+                                           initargs=init)
+        partials = executor.map(_runchunk, args)
+
+    ## merge the statistics of the chunks (in chunk order)
+    partials = iter(partials)
+    total = next(partials)
+    for partial in partials:
+        total = _mergestats(total, partial)
+
+    if parallel != 0 and len(args) > 1:
+        executor.shutdown()
+
+    ## results
+    quantiles = asarray(quantiles, dtype=float)
+    results = {'nsamples': nsamples, 'nconverged': total['n'],
+               'quantiles': quantiles}
+    for key in QUANTITIES:
+        s = total[key]
+        var = s['M2']/max(total['n'] - 1, 1)
+        results[key] = {
+            'mean': s['mean'], 'var': var, 'std': sqrt(var),
+            'min': s['min'], 'max': s['max'],
+            'quantiles': _histquantiles(s, ranges[key], quantiles, total['n']),
+        }
+
+    return results
+
+
+def _initworker(ppc, pdc, pacdcopt, ppopt, samples, warmstart):
+    """Prepares the case of a worker thread or process."""
+    _worker.pcase = prepacdcpf(ppc, pdc, pacdcopt, ppopt)
+    _worker.samples = samples
+    _worker.warmstart = warmstart
+    _worker.counts = {
+        'PD': ppc['bus'].shape[0], 'QD': ppc['bus'].shape[0],
+        'PG': ppc['gen'].shape[0],
+        'PCONV': pdc['convdc'].shape[0], 'QCONV': pdc['convdc'].shape[0],
+        'PDCSET': pdc['convdc'].shape[0],
+    }
+
+
+def _runchunk(args):
+    """
+    Draws and solves the samples of a chunk. Returns the statistics of the
+    converged samples, or only the histogram ranges set from them if the
+    ranges are not given (pilot samples).
+    """
+    n, seed, ranges, nbins = args
+    pcase, samples = _worker.pcase, _worker.samples
+
+    ## draw the injections (in a fixed key order)
+    rng = default_rng(seed)
+    draws = {}
+    for key in sorted(samples):
+        size = (n, _worker.counts[key])
+        dist = samples[key]
+        if callable(dist):
+            draws[key] = asarray(dist(rng, size), dtype=float)
+        else:
+            draws[key] = getattr(rng, dist[0])(*dist[1:], size=size)
+
+    ## solve the samples
+    store = makeresultstore(pcase, n)
+    store['LOADING'] = zeros(store['PLOSS'].shape)
+    cdci, convi, Icmax = pcase['cdci'], pcase['convi'], pcase['Icmax']
+    x0 = None
+    for t in range(n):
+        setinjacdc(pcase, **dict([(key, draws[key][t]) for key in draws]))
+        state, converged = solveacdcpf(pcase, x0)
+        if _worker.warmstart and converged:
+            x0 = state
+        storeresult(store, t, pcase, state, converged)
+        Ic = sqrt(state['Pc'][cdci]**2 + state['Qc'][cdci]**2) / \
+             abs(state['Vc'][cdci])
+        store['LOADING'][t,convi[cdci]] = Ic/Icmax[cdci]
+
+    ## statistics of the converged samples
+    conv = store['converged'] == 1
+    stats = {'n': int(conv.sum())}
+    for key in QUANTITIES:
+        x = store[key][conv]
+        nel = x.shape[1]
+        if x.shape[0]:
+            stats[key] = {'mean': x.mean(axis=0),
+                          'M2': ((x - x.mean(axis=0))**2).sum(axis=0),
+                          'min': x.min(axis=0), 'max': x.max(axis=0)}
+        else:
+            stats[key] = {'mean': zeros(nel), 'M2': zeros(nel),
+                          'min': zeros(nel) + inf, 'max': zeros(nel) - inf}
+
+    ## histogram ranges: range of the pilot samples with a margin of half
+    ## of it
+    if ranges is None:
+        if stats['n'] < 2:
+            raise Exception('Only %d of %d pilot samples converged, at least '
+                            '2 are needed to set the histogram ranges.\n'
+                            % (stats['n'], n))
+        ranges = {}
+        for key in QUANTITIES:
+            lo, hi = stats[key]['min'], stats[key]['max']
+            ranges[key] = (lo - 0.5*(hi - lo), hi + 0.5*(hi - lo))
+        return {'ranges': ranges}
+
+    ## histograms (values outside the ranges in the outer bins)
+    for key in QUANTITIES:
+        x = store[key][conv]
+        lo, hi = ranges[key]
+        width = (hi - lo)/nbins
+        width[width == 0] = 1
+        b = clip(floor((x - lo)/width), 0, nbins - 1).astype(int)
+        hist = zeros((nbins, x.shape[1]), dtype=int)
+        add.at(hist, (b, arange(x.shape[1]) + zeros(b.shape, dtype=int)), 1)
+        stats[key]['hist'] = hist
+
+    return stats
+
+
+def _mergestats(a, b):
+    """Merges the statistics of two sets of samples (Chan et al.)."""
+    n = a['n'] + b['n']
+    stats = {'n': n}
+    for key in QUANTITIES:
+        sa, sb = a[key], b[key]
+        if n == 0:
+            stats[key] = sa
+            continue
+        delta = sb['mean'] - sa['mean']
+        stats[key] = {
+            'mean': sa['mean'] + delta*b['n']/n,
+            'M2': sa['M2'] + sb['M2'] + delta**2*a['n']*b['n']/n,
+            'min': minimum(sa['min'], sb['min']),
+            'max': maximum(sa['max'], sb['max']),
+            'hist': sa['hist'] + sb['hist'],
+        }
+
+    return stats
+
+
+def _histquantiles(s, ranges, quantiles, n):
+    """Interpolates the quantiles of every element in its histogram."""
+    lo, hi = ranges
+    hist = s['hist']
+    nbins, nel = hist.shape
+    width = (hi - lo)/nbins
+    q = zeros((quantiles.size, nel))
+    if n == 0:
+        return q
+    cdf = cumsum(hist, axis=0)
+    for i, level in enumerate(quantiles):
+        target = level*n
+        b = minimum((cdf < target).sum(axis=0), nbins - 1)
+        below = cdf[b, arange(nel)] - hist[b, arange(nel)]
+        frac = (target - below)/maximum(hist[b, arange(nel)], 1)
+        q[i] = lo + (b + frac)*width
+    return clip(q, s['min'], s['max'])
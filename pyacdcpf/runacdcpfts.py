@@ -0,0 +1,97 @@
+"""Runs a time series of sequential ac/dc power flows.
+"""
+from numpy import arange
+
+from pyacdcpf.prepacdcpf import prepacdcpf
+from pyacdcpf.setinjacdc import setinjacdc
+from pyacdcpf.solveacdcpf import solveacdcpf
+from pyacdcpf.makeresultstore import makeresultstore
+from pyacdcpf.storeresult import storeresult
+
+
+def runacdcpfts(caseac, casedc, profiles, pacdcopt=None, ppopt=None,
+                warmstart=1, fname=None):
+    """
+    Runs a time series of sequential ac/dc power flows.
+
+    The case is loaded and prepared only once (see PREPACDCPF). For every
+    snapshot, only the injections are updated (see SETINJACDC) and the
+    sequential ac/dc power flow is solved, warm started from the previous
+    solution.
+
+    Inputs:
+        CASEAC : ac power flow data (see RUNACDCPF)
+        CASEDC : dc power flow data (see RUNACDCPF)
+        PROFILES : dict of 2-D arrays (snapshots x elements) with the
+            injections per snapshot, in the row order of the input case
+            files (out-of-service elements are ignored). All profiles
+            must have the same number of snapshots. Each key is optional,
+            but at least one profile is needed:
+                PD, QD : ac bus loads (MW, MVAr), one column per bus
+                PG     : generator active power (MW), one column per gen
+                PCONV, QCONV : converter power set-points (MW, MVAr),
+                         one column per converter
+                PDCSET : converter droop power set-points (MW), one
+                         column per converter
+        PACDCOPT : PYACDCPF options vector (see PACDCOPTION)
+        PPOPT : PYPOWER options vector (see PPOPTION)
+        WARMSTART : start each snapshot from the previous converged
+            solution (ac voltages, dc voltages and slack/droop converter
+            powers) instead of the case file values (default 1)
+        FNAME : directory in which the results are stored as memory-mapped
+            '.npy' files (see MAKERESULTSTORE), for series that do not fit
+            in memory. The profiles may be memory-mapped arrays as well.
+
+    Outputs:
+        RESULTS : dict of stacked arrays (snapshots x elements) in the row
+            order of the input case files:
+                VM, VA     : ac bus voltage magnitudes (p.u.), angles (deg)
+                PG, QG     : generator injections (MW, MVAr)
+                VDC, PDC   : dc bus voltages (p.u.) and powers (MW)
+                PCONV, QCONV : converter grid side injections (MW, MVAr)
+                PLOSS      : converter losses (MW)
+                PFDC, PTDC : dc branch flows at from/to bus (MW)
+            and the vectors converged and it (outer iterations) with one
+            element per snapshot (see MAKERESULTSTORE). The arrays are
+            memory-mapped if FNAME is given.
+
+    Examples of usage:
+        profiles = {'PD': PD, 'PCONV': PCONV}
+        results = runacdcpfts(case5_stagg(), case5_stagg_MTDCslack(),
+                              profiles, pacdcoption(OUTPUT=0))
+    """
+
+    ## number of snapshots (equal for all profiles)
+    nts = dict([(k, profiles[k].shape[0]) for k in profiles])
+    if len(nts) == 0:
+        raise ValueError('at least one profile is needed')
+    if len(set(nts.values())) > 1:
+        raise ValueError('the profiles have different numbers of snapshots: %s'
+                         % ', '.join(['%s %d' % (k, nts[k]) for k in sorted(nts)]))
+    nt = nts.popitem()[1]
+
+    ## prepare case (topology dependent data only)
+    pcase = prepacdcpf(caseac, casedc, pacdcopt, ppopt)
+
+    ## initialise results
+    results = makeresultstore(pcase, nt, fname)
+
+    x0 = None
+    for t in arange(nt):
+        ## update injections
+        setinjacdc(pcase, **dict([(k, profiles[k][t]) for k in profiles]))
+
+        ## solve snapshot
+        state, converged = solveacdcpf(pcase, x0)
+        if warmstart and converged:
+            x0 = state
+
+        ## store results
+        storeresult(results, t, pcase, state, converged)
+
+    ## write memory-mapped results to disk
+    if fname is not None:
+        for key in results:
+            results[key].flush()
+
+    return results
@@ -0,0 +1,83 @@
+"""Saves an ac/dc case as a binary case bundle.
+"""
+
+from os import makedirs, replace
+from os.path import join, exists, dirname, basename, abspath
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from numpy import array, save, asarray
+
+from pypower.loadcase import loadcase
+
+from pyacdcpf.loadcasedc import loadcasedc
+
+
+def savecaseacdc(fname, caseac, casedc):
+    """
+    Saves an ac/dc case as a binary case bundle.
+
+    The ac case C{caseac} (PYPOWER case dict or file name, see LOADCASE)
+    and the dc case C{casedc} (PYACDCPF case dict or file name, see
+    LOADCASEDC) are stored together in the directory C{fname} (by
+    convention with the extension '.acdc'), with every data matrix in a
+    separate NumPy '.npy' file:
+        ac_<name>.npy : ac data matrices (bus, gen, branch, gencost, ...)
+        dc_<name>.npy : dc data matrices (busdc, convdc, branchdc, ...)
+        base.npy : baseMVA, baseMVAac, baseMVAdc and pol
+        version.npy : ac and dc case format versions
+
+    The bundle is loaded with LOADCASEACDC, which memory-maps the matrices
+    instead of parsing the case files.
+
+    The bundle is written to a temporary directory next to C{fname} and
+    then renamed to C{fname}, replacing an existing bundle as a whole (such
+    that no matrices of a previous case are left behind). Readers thus
+    never see a partly written bundle, also when several processes convert
+    the same case at the same time.
+
+    Returns C{fname}.
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+    ppc = loadcase(caseac)
+    pdc = loadcasedc(casedc)
+
+    parent = dirname(abspath(fname))
+    makedirs(parent, exist_ok=True)
+    tmp = mkdtemp(prefix=basename(fname) + '.', suffix='.tmp', dir=parent)
+    old = tmp[:-4] + '.old'
+    try:
+        for prefix, case in [('ac_', ppc), ('dc_', pdc)]:
+            for key, value in case.items():
+                if key in ['version', 'baseMVA', 'baseMVAac', 'baseMVAdc',
+                           'pol']:
+                    continue
+                value = asarray(value)
+                if value.ndim == 2:
+                    save(join(tmp, prefix + key + '.npy'), value)
+
+        save(join(tmp, 'base.npy'), array([ppc['baseMVA'], pdc['baseMVAac'],
+                                           pdc['baseMVAdc'], pdc['pol']],
+                                          dtype=float))
+        ## written last: marks a complete bundle
+        save(join(tmp, 'version.npy'), array([str(ppc['version']),
+                                              str(pdc['version'])]))
+
+        ## replace an existing bundle
+        try:
+            replace(fname, old)
+        except FileNotFoundError:
+            pass
+        try:
+            replace(tmp, fname)
+        except OSError:
+            ## bundle written by another process in the meantime
+            if not exists(join(fname, 'version.npy')):
+                raise
+    finally:
+        rmtree(tmp, ignore_errors=True)
+        rmtree(old, ignore_errors=True)
+
+    return fname
@@ -0,0 +1,64 @@
+"""Updates the injections of a prepared ac/dc case.
+"""
+from numpy import where, setdiff1d
+
+from pypower import idx_bus, idx_gen
+
+from pyacdcpf import idx_convdc
+from pyacdcpf.idx_convdc import CONVTYPE_AC, PQC
+
+
+def setinjacdc(pcase, PD=None, QD=None, PG=None, PCONV=None, QCONV=None,
+               PDCSET=None):
+    """
+    Updates the injections of a prepared ac/dc case (see PREPACDCPF).
+
+    All vectors are given in the row order of the input case files, with
+    one element per bus, generator or converter (including out-of-service
+    elements, whose values are ignored). Only the injections that are
+    given are updated, in place.
+
+    Inputs:
+        PCASE : prepared ac/dc case (see PREPACDCPF)
+        PD, QD : ac bus loads (MW, MVAr)
+        PG : generator active power (MW)
+        PCONV, QCONV : converter power set-points (MW, MVAr), only the
+            reactive power set-points of converters in PQ control are used,
+            except for converters on buses with generator voltage control
+        PDCSET : converter droop power set-points (MW)
+
+    Outputs:
+        PCASE : prepared case with updated injections
+
+    Examples of usage:
+        pcase = prepacdcpf(case5_stagg(), case5_stagg_MTDCslack())
+        pcase = setinjacdc(pcase, PD=PD, PCONV=PCONV)
+        state, converged = solveacdcpf(pcase)
+    """
+    bus, gen, convdc = pcase['bus'], pcase['gen'], pcase['convdc']
+    busi, geni, convi = pcase['busi'], pcase['geni'], pcase['convi']
+    nconv = convi.size
+
+    ## ac bus loads
+    if PD is not None:
+        bus[:,idx_bus.PD] = PD[busi]
+    if QD is not None:
+        bus[:,idx_bus.QD] = QD[busi]
+
+    ## generator injections
+    if PG is not None:
+        gen[:,idx_gen.PG] = PG[geni]
+
+    ## converter set-points
+    if PCONV is not None:
+        convdc[:nconv,idx_convdc.PCONV] = PCONV[convi]
+    if QCONV is not None:
+        ## (not for converters set to PQ control without Q injections
+        ## because of conflicting voltage control, see PREPACDCPF)
+        qconvpq = setdiff1d(where(convdc[:nconv,CONVTYPE_AC] == PQC)[0],
+                            pcase['vconfl'])
+        convdc[qconvpq,idx_convdc.QCONV] = QCONV[convi[qconvpq]]
+    if PDCSET is not None:
+        convdc[:nconv,idx_convdc.PDCSET] = PDCSET[convi]
+
+    return pcase
@@ -0,0 +1,548 @@
+"""Solves a prepared ac/dc case with the sequential ac/dc power flow.
+"""
+from sys import stdout
+from os import cpu_count
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from numpy import r_, c_, zeros, pi, exp, where, setdiff1d, arange, sqrt, \
+                 real, imag, conj, delete, abs, argmax
+
+from pypower.idx_bus import PD, QD, VM, VA, BUS_TYPE, PQ
+from pypower.idx_brch import QT
+from pypower.idx_gen import QG
+
+from pyacdcpf.idx_busdc import GRIDDC, VDC
+from pyacdcpf.idx_convdc import CONV_BUS, CONVTYPE_DC, DCSLACK, DCDROOP, \
+        DCNOSLACK, CONVTYPE_AC, PVC, PQC, PCONV, QCONV, DROOP, PDCSET, \
+        VDCSET, DVDCSET
+
+from pyacdcpf.convlimvec import convlimvec
+from pyacdcpf.calclossac import calclossac
+from pyacdcpf.dcnetworkpf import dcnetworkpf
+from pyacdcpf.dcgridspf import dcgridspf
+from pyacdcpf.solveaczones import solveaczones
+from pyacdcpf.makezonemap import makezonemap
+from pyacdcpf.calcslackdroop import calcslackdroop
+from pyacdcpf.acdcnrpf import acdcnrpf
+from pyacdcpf.acdcstats import acdcstats
+from pyacdcpf.accacdc import accacdc
+
+import numpy as np
+
+## define j
+## DONT USE j IN ANYWHERE ELSE!!!
+j = sqrt(-1+0j)
+
+
+def solveacdcpf(pcase, x0=None, stats=None, callback=None):
+    """
+    Solves a prepared ac/dc case with the sequential ac/dc power flow.
+
+    Runs the main iteration loop of the sequential ac/dc power flow on a
+    case prepared by PREPACDCPF. The prepared case itself is not modified,
+    so it can be solved repeatedly after changing its injections. If the
+    option ALGACDC is 2, the case is solved with the unified Newton-Raphson
+    method instead (see ACDCNRPF).
+
+    Inputs:
+        PCASE : prepared case dict (see also PREPACDCPF)
+        X0 : (optional) initial state dict used to warm start the
+            solution, typically the state returned by a previous call.
+            The fields used are:
+                V   : complex ac bus voltages (internal ordering)
+                Vdc : dc bus voltages (p.u.)
+                Ps  : grid side converter active power injections (p.u.),
+                      used as starting point for slack and droop converters
+                accache : (optional) ac zone data, factorisations and
+                      voltages (see SOLVEACZONES)
+            V and accache are only used with the option WARMAC.
+            The converter voltages Vc follow from V and Ps in the first
+            converter calculation and need not be given.
+        STATS : (optional) dict in which the solution statistics (stage
+            times, iteration counts and mismatch histories) are
+            accumulated, see ACDCSTATS. Initialised if empty.
+        CALLBACK : (optional) function called as CALLBACK(STATS) after
+            every outer iteration, e.g. to monitor the convergence
+
+    Outputs:
+        STATE : dict with the solved quantities in internal ordering and
+            per unit (bus, gen, branch, convdc, V, Vdc, Pdc, Ps, Qs, Vc, Pc,
+            Qc, Ploss, Vf, Psf, Qsf, Qcf, Pfdc, Ptdc), the number of
+            outer iterations it, the last dc Jacobian factorisation
+            dcjac (see PREPDCJAC) and the ac zone cache accache
+        CONVERGED : converge flag
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    @author: Lazar Scekic (University of Montenegro)
+    """
+
+    ## options
+    pacdcopt = pcase['pacdcopt']
+    ppopt = pcase['ppopt']
+
+    ## solution statistics
+    if stats is None and callback is not None:
+        stats = {}
+    if stats is not None and 'time' not in stats:
+        acdcstats(stats)
+
+    ## unified Newton-Raphson ac/dc power flow
+    if pacdcopt["ALGACDC"] == 2:
+        return acdcnrpf(pcase, x0, stats, callback)
+
+    t0 = perf_counter()
+
+    tolacdc = pacdcopt["TOLACDC"]
+    itmaxacdc = pacdcopt["ITMAXACDC"]
+    toldc = pacdcopt["TOLDC"]
+    itmaxdc = pacdcopt["ITMAXDC"]
+    chorddc = pacdcopt["CHORDDC"]
+    accacdcopt = pacdcopt["ACCACDC"]
+    accdepth = pacdcopt["ACCDEPTH"]
+    parac = pacdcopt["PARAC"]
+    nworkac = pacdcopt["NWORKAC"]
+    pardc = pacdcopt["PARDC"]
+    nworkdc = pacdcopt["NWORKDC"]
+    acpf = pacdcopt["ACPF"]
+    acpfswitch = pacdcopt["ACPFSWITCH"]
+    warmac = pacdcopt["WARMAC"]
+    tolskipac = pacdcopt["TOLSKIPAC"]
+    tolslackdroop = pacdcopt["TOLSLACKDROOP"]
+    itmaxslackdroop = pacdcopt["ITMAXSLACKDROOP"]
+    tolslackdroopint = pacdcopt["TOLSLACKDROOPINT"]
+    itmaxslackdroopint = pacdcopt["ITMAXSLACKDROOPINT"]
+    limac = pacdcopt["LIMAC"]
+    tollim = pacdcopt["TOLLIM"]
+    vsmq = pacdcopt["LIMVSMQ"]
+    output = pacdcopt["OUTPUT"]
+    convplotopt = pacdcopt["CONVPLOTOPT"]
+
+    ## prepared case data (copies of the data altered by the solution)
+    baseMVA, bus, gen = pcase['baseMVA'], pcase['bus'], pcase['gen']
+    branch = pcase['branch'].copy()
+    busdc, branchdc, pol = pcase['busdc'], pcase['branchdc'], pcase['pol']
+    convdc = pcase['convdc'].copy()
+    i2edc = pcase['i2edc']
+
+    bdci, cdci = pcase['bdci'], pcase['cdci']
+    slackdc, droopdc = pcase['slackdc'], pcase['droopdc']
+    slackdroopdc, noslackbdc = pcase['slackdroopdc'], pcase['noslackbdc']
+    ngriddc, aczones = pcase['ngriddc'], pcase['aczones']
+    gridmap = pcase['gridmap']
+
+    busVSC = pcase['busVSC'].copy()
+    gendm = pcase['gendm'].copy()
+    genPQ, genPQi = pcase['genPQ'], pcase['genPQi']
+    gdmbus = pcase['gdmbus']
+
+    lossa, lossb = pcase['lossa'], pcase['lossb']
+    losscr, lossci = pcase['losscr'], pcase['lossci']
+    Zc, Ztf, Bf = pcase['Zc'], pcase['Ztf'], pcase['Bf']
+    Icmax, Vcmax, Vcmin = pcase['Icmax'], pcase['Vcmax'], pcase['Vcmin']
+    convenv = pcase['convenv']  ## cached converter capability charts
+
+    Ybusdc, Yfdc = pcase['Ybusdc'], pcase['Yfdc']
+    dcjac = pcase['dcjac'].copy() ## factorisation kept for this solution only
+    dcjacs = [d.copy() if d is not None else None for d in gridmap['dcjac']]
+
+    ## converter stations power injections into ac network
+    Pvsc = convdc[:,PCONV]/baseMVA
+    Qvsc = convdc[:,QCONV]/baseMVA
+
+    ## dc voltage droop setpoints and parameters
+    PVdroop = zeros(busdc.shape[0])
+    Pdcset = zeros(busdc.shape[0])
+    Vdcset = zeros(busdc.shape[0])
+    dVdcset = zeros(busdc.shape[0])
+
+    PVdroop[cdci] = convdc[cdci,DROOP]*baseMVA
+    Pdcset[cdci] = convdc[cdci,PDCSET]/baseMVA
+    Vdcset[cdci] = convdc[cdci,VDCSET]
+    dVdcset[cdci] = convdc[cdci,DVDCSET]
+
+    ## voltage droop converter power initialisation
+    Pvsc[droopdc] = Pdcset[droopdc]     ## assumption: operating in reference set-point & no converter losses
+
+    ## dc slack converter power injection initialisation
+    if slackdc.size != 0:
+        for busdcii, slackdcii in zip(gridmap['busi'], gridmap['slackdc']):
+            if slackdcii.size != 0:
+                Pvscii = Pvsc[setdiff1d(busdcii, slackdcii)]
+                Pvsc[slackdcii] = -Pvscii.sum()/slackdcii.shape[0]
+
+    ## warm start from a previous solution
+    if x0 is not None:
+        Pvsc[slackdroopdc] = x0['Ps'][slackdroopdc]
+        if warmac:
+            busVSC[:,VM] = abs(x0['V'])
+            busVSC[:,VA] = np.angle(x0['V'])*180/pi
+
+    ## Inclusion of converters as loads
+    busVSC[:,PD] = bus[:,PD]
+    busVSC[:,QD] = bus[:,QD]
+    busVSC[cdci,PD] = bus[cdci,PD] - Pvsc[cdci]*baseMVA
+    busVSC[cdci,QD] = bus[cdci,QD] - Qvsc[cdci]*baseMVA
+
+
+    ##-----  main iteration loop -----
+    ## initialise
+    if x0 is not None:
+        Vdc = x0['Vdc'].copy()
+    else:
+        Vdc = busdc[:,VDC].copy() #dc bus voltages
+    genVSC = r_[gen, gendm] #inclusion of dummy generators for ac solution
+    zonemap = pcase['zonemap'] ## buses, generators and branches per ac zone
+
+    ## preallocate the ac power flow result columns of the branch matrix
+    if branch.shape[1] < QT+1:
+        branch = c_[branch, zeros((branch.shape[0], QT+1-branch.shape[1]))]
+
+    gendmidx = arange(gen.shape[0], genVSC.shape[0]) # index of dummy generators in genVSC matrix
+    Ps = Pvsc #grid side converter power initialisation
+    Pdc = zeros(busdc.shape[0])
+    Ifdc = zeros(branchdc.shape[0])
+    Pfdc = zeros(branchdc.shape[0])
+    Ptdc = zeros(branchdc.shape[0])
+
+    ## iteration options
+    it = 0
+    converged = 0
+    acc = {}                        ## outer loop acceleration history
+    acalg = acpf                    ## ac zone algorithm of the iteration
+    accache = {}                    ## ac zone data, factors and voltages
+    if x0 is not None and warmac and 'accache' in x0:
+        accache = dict([(i, dict(c)) for i, c in x0['accache'].items()])
+    accdc = slackdroopdc            ## accelerated slack/droop converters
+    ztimes = zeros(aczones.size)    ## ac zone solution times
+    zits = zeros(aczones.size, dtype=int)   ## ac zone iterations
+    ttime = dict([(stage, 0.) for stage in \
+                  ['aczones', 'dcnetwork', 'slackdroop', 'limits']])
+
+    ## executor for the concurrent solution of the ac zones
+    executor = None
+    if parac != 0 and aczones.size > 1:
+        nworkers = nworkac if nworkac > 0 else min(aczones.size, cpu_count())
+        if parac == 1:
+            executor = ThreadPoolExecutor(nworkers)
+        else:
+            executor = ProcessPoolExecutor(nworkers)
+
+    ## executor for the concurrent solution of the dc grids
+    executordc = None
+    if pardc == 2 and len(gridmap['busi']) > 1:
+        nworkers = nworkdc if nworkdc > 0 else \
+                   min(len(gridmap['busi']), cpu_count())
+        executordc = ThreadPoolExecutor(nworkers)
+
+    ## main loop
+    while (not converged) and (it <= itmaxacdc):
+        ## update iteration counter
+        it += 1
+
+        ## reset grid side converter reactive power injection
+        Qs = Qvsc
+        Ss = Ps +j*Qs
+
+        ##-----  ac network power flow  -----
+        ## ac power flow with converters as loads (PQ mode) or load+generator (PV mode)
+        t1 = perf_counter()
+        if not warmac:  ## cold start from the bus voltages of the case
+            busVSC[:,[VM, VA]] = pcase['busVSC'][:,[VM, VA]]
+        busVSC, genVSC, branch = solveaczones(baseMVA, busVSC, genVSC, \
+            branch, zonemap, ppopt, executor, ztimes, acalg, accache, warmac,
+            zits, tolskipac)
+        ttime['aczones'] += perf_counter() - t1
+
+        ## dummy generator update
+        gendm = genVSC[gen.shape[0]:,:]
+
+        ## dummy generator on converter V controlled bus
+        Ss[gdmbus] = Ss[gdmbus] + j*gendm[:,QG]/baseMVA
+
+        ## PQ generator on converter V controlled bus
+        Ss[genPQ] = Ss[genPQ] + \
+        j*(genVSC[genPQi,QG] - gen[genPQi,QG])/baseMVA
+
+        ## update grid side converter power injections
+        Ps = real(Ss)
+        Qs = imag(Ss)
+
+        ## generator reset
+        genVSC[gendmidx,QG] = 0
+        genVSC[genPQi,QG] = gen[genPQi,QG]
+
+        ##----- Converter calculations -----
+        ## converter reactor voltages and power
+        Vs = busVSC[bdci,VM]*exp(j*busVSC[bdci,VA]*pi/180)
+        Itf = conj(Ss/Vs)         ## transformer current
+        Vf = Vs + Itf*Ztf       ## filter side voltage
+        Ssf = Vf*conj(Itf)        ## filter side transformer complex power
+        Qf = -Bf*abs(Vf)**2      ## filter reactive power
+        Scf = Ssf + j*Qf             ## filter side converter complex power
+        Ic = conj(Scf/Vf)        ## converter current
+        Vc = Vf + Ic*Zc          ## converter side voltage
+        Sc = Vc*conj(Ic)         ## converter side complex power
+
+        ## converter active and reactive powers
+        Pc = real(Sc)
+        Qc = imag(Sc)
+        Pcf = real(Scf)
+        Qcf = imag(Scf)
+        Psf = real(Ssf)
+        Qsf = imag(Ssf)
+
+        ## initialisation
+        Ps_old = Ps.copy()
+
+        if limac == 1:
+            ##--- converter limit check ---
+            t1 = perf_counter()
+            ## initialisation
+            limviol = zeros((busdc.shape[0]))
+            SsL     = zeros((busdc.shape[0]),dtype=complex)
+            plotarg = zeros((busdc.shape[0],17),dtype=complex)
+
+            ## remove slack converters and converter outages from limit check
+            cdcl = setdiff1d(arange(busdc.shape[0]), slackdc)
+            cdcl = cdcl[convdc[cdcl,CONV_BUS] != 0]
+
+            ## converter limit check (all grids at once)
+            limviol[cdcl], SsL[cdcl], plotarg[cdcl,:] = convlimvec(Ss[cdcl], \
+                Vs[cdcl], Vc[cdcl], Ztf[cdcl], Bf[cdcl], Zc[cdcl], \
+                Icmax[cdcl], Vcmax[cdcl], Vcmin[cdcl], i2edc[cdcl+1], \
+                tollim, convplotopt, convenv, vsmq)
+
+            for ii in arange(1,ngriddc+1):
+                ## converter limit violations (1 = Q limit, 2 = P limit)
+                limviolii   = limviol*(busdc[:,GRIDDC] == ii)
+                dSii  = (SsL-Ss)*(busdc[:,GRIDDC] == ii)*(convdc[:,CONVTYPE_DC] != DCSLACK)
+                if (2 in limviolii) or (1 in limviolii):
+                    if (2 in limviolii):
+                        dSii = dSii*(limviolii==2)
+                        dSiimaxi = where(abs(real(dSii)).max())[0]
+                        stdout.write('\n  Active power setpoint of converter %d changed from %.2f MW to %.2f MW.'%( \
+                            i2edc[dSiimaxi+1], real(Ss[dSiimaxi])*baseMVA, real(SsL[dSiimaxi])*baseMVA))
+                        stdout.write('\n  Reactive power setpoint of converter %d changed from %.2f MVAr to %.2f MVAr.\n'%(\
+                            i2edc[dSiimaxi+1], imag(Ss[dSiimaxi])*baseMVA, imag(SsL[dSiimaxi])*baseMVA))
+                    else: ## if ismember(1, limviolii)
+                        dSii = dSii*(limviolii==1)
+                        dSiimaxi = argmax(abs(imag(dSii)))
+                        stdout.write('\n  Reactive power setpoint of converter %d changed from %.2f MVAr to %.2f MVAr. \n'%(\
+                            i2edc[dSiimaxi+1], imag(Ss[dSiimaxi])*baseMVA, imag(SsL[dSiimaxi])*baseMVA))
+
+                    ## plot converter setpoint adaptation
+                    if convplotopt != 0 :
+                        from pyacdcpf.convlimplot import convlimplot ## imports matplotlib
+                        convlimplot(plotarg[dSiimaxi,:], i2edc[dSiimaxi])
+
+                    ## update converter powers
+                    Ss[dSiimaxi] = SsL[dSiimaxi]
+                    Pvsc[dSiimaxi] = real(Ss[dSiimaxi])
+                    Qvsc[dSiimaxi] = imag(Ss[dSiimaxi])
+                    busVSC[dSiimaxi,PD] = bus[dSiimaxi,PD] - \
+                        Pvsc[dSiimaxi]*baseMVA  ## converter P injection from input files included as load
+                    busVSC[dSiimaxi,QD] = bus[dSiimaxi,QD] - \
+                        Qvsc[dSiimaxi]*baseMVA  ## only Q from input files is included, not for V control
+                else:
+                    dSiimaxi = []
+
+                ## Remove voltage control on violated converter
+                if convdc[dSiimaxi, CONVTYPE_AC].size > 0 and convdc[dSiimaxi, CONVTYPE_AC] == PVC:
+                    convdc[dSiimaxi, CONVTYPE_AC] = PQC
+                    stdout.write('  Voltage control at converter bus %d removed.\n'% i2edc[dSiimaxi+1])
+
+                    busVSC[dSiimaxi, BUS_TYPE]  = PQ
+                    ## Remove dummy generator (PV bus changed to PQ bus)
+                    if dSiimaxi in gdmbus:
+                        dSidx = where(gdmbus == dSiimaxi)[0]
+                        dSgenidx = gendmidx[dSidx]
+                        gendm = delete(gendm,dSidx,axis=0)
+                        genVSC = delete(genVSC,dSgenidx,axis=0)
+                        gdmbus = delete(gdmbus,dSidx)
+                        gendmidx = delete(gendmidx,dSidx)
+                        gendmidx[dSidx[0]:] -= 1 ## index of dummy generators in genVSC matrix
+                        zonemap = makezonemap(busVSC, genVSC, branch, aczones)
+
+                    ## Remove VSC voltage control at genPQ bus
+                    if dSiimaxi in genPQ:
+                        dSidx = where(genPQ == dSiimaxi)[0]
+                        genPQ = delete(genPQ,dSidx)
+                        genPQi = delete(genPQi,dSidx)
+
+                ## Remove droop control on violated converter
+                if convdc[dSiimaxi, CONVTYPE_DC].size > 0 and convdc[dSiimaxi, CONVTYPE_DC]==DCDROOP:
+                   convdc[dSiimaxi, CONVTYPE_DC] = DCNOSLACK
+                   droopdc = setdiff1d(droopdc,dSiimaxi) ## remove converter from droop converters
+                   slackdroopdc = setdiff1d(slackdroopdc,dSiimaxi) ## remove converter from slack/droop converters (additional loss iteration)
+                   stdout.write('  Droop control at converter bus %d disabled.\n'%i2edc[dSiimaxi+1])
+
+            ## recalculate converter quantities after limit check
+            Itf = conj(Ss/Vs)         ## transformer current
+            Vf = Vs + Itf*Ztf        ## filter side voltage
+            Ssf = Vf*conj(Itf)        ## filter side transformer complex power
+            Qf = -Bf*abs(Vf)**2      ## filter reactive power
+            Scf = Ssf + j*Qf             ## filter side converter complex power
+            Ic = conj(Scf/Vf)        ## converter current
+            Vc = Vf + Ic*Zc          ## converter side voltage
+            Sc = Vc*conj(Ic)         ## converter side complex power
+
+            ## converter active and reactive powers after limit check
+            Ps = real(Ss)
+            Qs = imag(Ss)
+            Pc = real(Sc)
+            Qc = imag(Sc)
+            Pcf = real(Scf)
+            Qcf = imag(Scf)
+            Psf = real(Ssf)
+            Qsf = imag(Ssf)
+            ttime['limits'] += perf_counter() - t1
+
+        ## converter losses and dc side power
+        Ploss = calclossac(Pc, Qc, Vc, lossa, lossb, losscr, lossci)
+        Pdc[cdci] = Pc[cdci] + Ploss[cdci]
+
+        ##-----  dc networks power flow  -----
+        ## calculate dc networks
+        t1 = perf_counter()
+        histdc = []
+        if pardc == 0:
+            Vdc, Pdc = dcnetworkpf(Ybusdc, Vdc, Pdc,slackdc, noslackbdc,\
+                droopdc, PVdroop, Pdcset, Vdcset, dVdcset, pol, toldc, \
+                itmaxdc, dcjac, chorddc, histdc)
+        else:
+            ## dc grids solved separately (see MAKEGRIDMAP)
+            Vdc, Pdc = dcgridspf(gridmap, Vdc, Pdc, droopdc, PVdroop, \
+                Pdcset, Vdcset, dVdcset, pol, toldc, itmaxdc, dcjacs, \
+                chorddc, histdc, executordc)
+        ttime['dcnetwork'] += perf_counter() - t1
+
+        ## calculate dc line powers
+        Ifdc = Yfdc*Vdc ## current through dc lines
+        Vdcf = Vdc[pcase['brchdcf']]
+        Vdct = Vdc[pcase['brchdct']]
+        Pfdc = pol*Vdcf*Ifdc ## power at the "from" bus
+        Ptdc = pol*Vdct*(-Ifdc) ## power at the "to" bus
+
+
+        ##----- slack/droop bus voltage and converter loss -----
+        ## Initialisation
+        t1 = perf_counter()
+        Pc[slackdroopdc] = Pdc[slackdroopdc] - Ploss[slackdroopdc] ## Pc initialisation
+        itslack = 0
+        convergedslackdroop = 0
+        histslackdroop = []
+
+        ## dc slack bus loss calculation
+        while not convergedslackdroop and itslack<=itmaxslackdroop:
+           ## update iteration counter and convergence variable
+           itslack += 1
+           Pcprev = Pc.copy()
+
+           ## update slack bus powers Ps, Qc and voltage Vc
+           Ps[slackdroopdc], Qc[slackdroopdc], Vc[slackdroopdc] = calcslackdroop(
+               Pc[slackdroopdc], Qs[slackdroopdc],  Vs[slackdroopdc], \
+               Vf[slackdroopdc], Vc[slackdroopdc], Ztf[slackdroopdc], \
+               Bf[slackdroopdc], Zc[slackdroopdc], \
+               tolslackdroopint, itmaxslackdroopint)
+
+           ## update slack bus losses
+           Ploss[slackdroopdc]  = calclossac(Pc[slackdroopdc], Qc[slackdroopdc], \
+                Vc[slackdroopdc], lossa[slackdroopdc], lossb[slackdroopdc], \
+                losscr[slackdroopdc], lossci[slackdroopdc])
+
+           ## update slack bus converter side power Pc
+           Pc[slackdroopdc] = Pdc[slackdroopdc] - Ploss[slackdroopdc]
+
+           ## slack bus tolerance check
+           histslackdroop.append(max(abs(Pcprev[slackdroopdc] - Pc[slackdroopdc])))
+           if histslackdroop[-1] < tolslackdroop:
+               convergedslackdroop = 1
+
+        if not convergedslackdroop:
+            stdout.write('\nSlackbus/Droop converter loss calculation of grid did NOT converge in %d iterations\n'% itslack)
+        ttime['slackdroop'] += perf_counter() - t1
+
+        ## convergence check (only with Newton's method in the ac zones)
+        dPmax = abs(Ps_old - Ps).max()
+        if dPmax < tolacdc and acalg == 1:
+            converged = 1
+
+        ## accelerated slack/droop converter powers for the next iteration
+        ## (history reset if the slack/droop converters change)
+        elif accacdcopt != 0 and slackdroopdc.size > 0:
+            if accdc.size != slackdroopdc.size or (accdc != slackdroopdc).any():
+                acc, accdc = {}, slackdroopdc
+            Ps[slackdroopdc] = accacdc(acc, Ps_old[slackdroopdc], \
+                Ps[slackdroopdc], accacdcopt, accdepth)
+
+        ## Newton's method in the ac zones close to convergence
+        if acalg != 1 and dPmax < acpfswitch:
+            acalg, acc = 1, {}
+
+        ## extended bus matrix update
+        busVSC[cdci,PD] = bus[cdci,PD] - Ps[cdci]*baseMVA
+
+        ## solution statistics
+        if stats is not None:
+            stats['it'] += 1
+            stats['mismatch'].append(dPmax)
+            stats['itdc'].append(len(histdc))
+            stats['mismatchdc'].append(histdc)
+            stats['itslackdroop'].append(itslack)
+            stats['mismatchslackdroop'].append(histslackdroop)
+            stats['timezones'].append(ztimes.copy())
+            stats['itzones'].append(zits.copy())
+            for stage in ttime:
+                stats['time'][stage] += ttime[stage]
+                ttime[stage] = 0.
+            if callback is not None:
+                callback(stats)
+
+    if executor is not None:
+        executor.shutdown()
+    if executordc is not None:
+        executordc.shutdown()
+
+    ##-----  Post processing  -----
+    ## convergence
+    if converged:
+        if output:
+            stdout.write('\nSequential solution method converged in %d iterations\n'%it)
+    else:
+        stdout.write('\nSequential solution method did NOT converge after %d iterations\n'%it)
+
+    ## converter limit check
+    if limac == 1:
+        t1 = perf_counter()
+        limviol, _, plotarg = convlimvec(Ss[cdci], Vs[cdci], Vc[cdci], Ztf[cdci], \
+            Bf[cdci], Zc[cdci], Icmax[cdci], Vcmax[cdci], Vcmin[cdci], i2edc[cdci+1], \
+            tollim, 1, convenv, vsmq)
+        for ii in arange(cdci.size):
+            cvii = cdci[ii]
+            if limviol[ii] != 0:     ## limits are hit
+                if (convdc[cvii,CONVTYPE_DC] == DCSLACK):
+                    stdout.write('\n  Slackbus converter %d is operating outside its limits.\n'%i2edc[cvii+1])
+                elif (convdc[cvii,CONVTYPE_DC] == DCNOSLACK):
+                    stdout.write('\n  Converter %d is operating outside its limits.\n'%i2edc[cvii+1])
+            if convplotopt == 2 :
+                from pyacdcpf.convlimplot import convlimplot ## imports matplotlib
+                convlimplot(plotarg[ii,:], i2edc[cvii])
+        ttime['limits'] += perf_counter() - t1
+
+    if stats is not None:
+        stats['time']['limits'] += ttime['limits']
+        stats['time']['solve'] += perf_counter() - t0
+
+    ##-----  solution state  -----
+    state = {
+        'bus': busVSC, 'gen': genVSC, 'branch': branch, 'convdc': convdc,
+        'V': busVSC[:,VM]*exp(j*busVSC[:,VA]*pi/180),
+        'Vdc': Vdc, 'Pdc': Pdc, 'Ps': Ps, 'Qs': Qs, 'Vc': Vc, 'Pc': Pc,
+        'Qc': Qc, 'Ploss': Ploss, 'Vf': Vf, 'Psf': Psf, 'Qsf': Qsf,
+        'Qcf': Qcf, 'Pfdc': Pfdc, 'Ptdc': Ptdc, 'it': it, 'dcjac': dcjac,
+        'accache': accache,
+    }
+
+    return state, converged
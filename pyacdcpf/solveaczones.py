@@ -0,0 +1,325 @@
+"""Solves the ac power flows of all ac zones.
+"""
+
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
+
+from numpy import arange, r_, c_, zeros, exp, pi, ones, abs, angle, conj, isin
+from scipy.sparse.linalg import splu
+
+from pypower.runpf import runpf
+from pypower.ext2int import ext2int
+from pypower.bustypes import bustypes
+from pypower.newtonpf import newtonpf
+from pypower.makeYbus import makeYbus
+from pypower.makeSbus import makeSbus
+from pypower.makeB import makeB
+from pypower.makeBdc import makeBdc
+from pypower.pfsoln import pfsoln
+from pypower.idx_bus import BUS_I, PD, QD, VM, VA, GS, BS, BUS_TYPE, PQ
+from pypower.idx_gen import GEN_BUS, GEN_STATUS, PG, QG, VG
+from pypower.idx_brch import BR_STATUS, PF, PT, QF, QT
+
+
+def solveaczones(baseMVA, busVSC, genVSC, branch, zonemap, ppopt,
+                 executor=None, ztimes=None, alg=1, cache=None,
+                 warm=1, zits=None, tolskip=0):
+    """
+    Solves the ac power flows of all ac zones.
+
+    The ac power flow of every ac zone in C{zonemap} (see MAKEZONEMAP),
+    except for zones consisting of a single infinite bus, is solved with
+    the converters included as loads (PQ mode) or load+generator (PV mode)
+    in C{busVSC} and C{genVSC}. The non-synchronised ac zones are
+    independent, so they can be solved concurrently by a
+    C{concurrent.futures} executor (thread or process pool). The zone
+    solutions are always merged in the order of the zones, such that the
+    result does not depend on the executor.
+
+    The solutions are stored in place in C{busVSC}, C{genVSC} and C{branch},
+    the latter having to include the power flow result columns (up to QT).
+    If C{ztimes} is given, the solution time of every ac zone is stored in
+    it (zero for infinite buses). If C{zits} is given, the number of
+    Newton or fast-decoupled iterations of every ac zone is stored in it
+    (zero for infinite buses, the dc power flow approximation and zones
+    solved by RUNPF).
+
+    The ac zones are solved with the algorithm C{alg} (option ACPF):
+        1 : Newton's method
+        2 : fast-decoupled, XB version
+        3 : fast-decoupled, BX version
+        4 : dc power flow approximation (flat voltage magnitudes, no
+            reactive power flows)
+    The internal zone data (see EXT2INT), bus types and admittance matrices
+    are built once per zone and kept in the dict C{cache} (one entry per
+    zone), together with the fast-decoupled and dc power flow
+    factorisations. Repeated solutions only update the injections, the
+    fast-decoupled and dc power flows only needing forward and backward
+    substitutions. The cached data are renewed when the bus types, shunts,
+    generators or branch data of a zone change. Data cached in a process pool are not
+    kept. Zones for which Newton's method or the fast-decoupled method does
+    not converge, or with generator reactive power limits (PYPOWER option
+    ENFORCE_Q_LIMS), are solved with RUNPF.
+
+    The complex voltages of the last solution of every zone are kept in
+    C{cache}, also when solved by RUNPF, in a process pool or with the dc
+    power flow approximation. If C{warm} is true (option WARMAC), the zones
+    start from these voltages, with the voltage magnitudes of the voltage
+    controlled buses set to the generator set-points. Otherwise, and in the
+    first solution of a zone, they start from the bus voltages in C{busVSC}
+    like RUNPF. A C{cache} kept over several power flows (see SOLVEACDCPF)
+    thus warm starts the zones of later power flows.
+
+    If C{tolskip} is positive (option TOLSKIPAC), ac zones are only solved
+    again when their bus types, generator statuses or injections (loads,
+    generator active powers and voltage set-points, and reactive powers of
+    generators at PQ buses) changed by C{tolskip} p.u. or more since their
+    last solution with the same algorithm, recorded in C{cache}. The
+    solutions of the other zones in C{busVSC}, C{genVSC} and C{branch} are
+    kept as they are, except for the generator reactive powers, which are
+    restored from C{cache}.
+
+    Returns the updated C{busVSC}, C{genVSC} and C{branch} matrices.
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+    buszi, genzi, brchzi = zonemap['buszi'], zonemap['genzi'], zonemap['brchzi']
+
+    ## solve ac power flow for specified ac zones (if not infinite bus)
+    solvez = [i for i in arange(len(buszi)) if buszi[i].size > 1]
+    if cache is None:
+        cache = {}
+
+    ## skip ac zones whose injections did not change since their solution
+    if tolskip > 0:
+        skipz = [i for i in solvez if _unchanged(cache.get(i, {}).get('inj'),
+            busVSC[buszi[i],:], genVSC[genzi[i],:], baseMVA, alg, tolskip)]
+        solvez = [i for i in solvez if i not in skipz]
+        for i in skipz:     ## generator reactive powers of the solution
+            genVSC[genzi[i], QG] = cache[i]['qg']
+        if ztimes is not None:
+            ztimes[skipz] = 0
+        if zits is not None:
+            zits[skipz] = 0
+
+    accasez = [{'baseMVA': baseMVA, 'bus': busVSC[buszi[i],:],
+                'gen': genVSC[genzi[i],:], 'branch': branch[brchzi[i],:]}
+               for i in solvez]
+    cachez = [cache.setdefault(i, {}) for i in solvez]
+
+    ## start from the voltages of the last solution of the zones
+    if warm:
+        for accase, c in zip(accasez, cachez):
+            if 'V' in c and c['V'].size == accase['bus'].shape[0]:
+                accase['bus'][:, VM] = abs(c['V'])
+                accase['bus'][:, VA] = angle(c['V']) * (180 / pi)
+
+    algz = [alg]*len(accasez)
+    ppoptz = [ppopt]*len(accasez)
+    if isinstance(executor, ProcessPoolExecutor):
+        cachez = [{} for i in solvez]   ## cached data cannot be returned
+    if executor is None:
+        resultsz = list(map(_solvezone, accasez, ppoptz, algz, cachez))
+    else:
+        resultsz = list(executor.map(_solvezone, accasez, ppoptz, algz,
+                                     cachez))
+
+    ## store solutions for specified ac zones
+    for i, (results, success) in zip(solvez, resultsz):
+        busVSC[buszi[i],:] = results['bus']
+        genVSC[genzi[i],:] = results['gen']
+        branch[brchzi[i],:] = results['branch']
+        if ztimes is not None:
+            ztimes[i] = results['et']
+        if zits is not None:
+            zits[i] = results.get('it', 0)
+        cache[i]['V'] = busVSC[buszi[i],VM] * \
+                        exp(1j * pi/180 * busVSC[buszi[i],VA])
+        if tolskip > 0:
+            cache[i]['inj'] = _zoneinj(results['bus'], results['gen'],
+                                       baseMVA, alg)
+            cache[i]['qg'] = results['gen'][:, QG].copy()
+
+    return busVSC, genVSC, branch
+
+
+def _solvezone(accase, ppopt, alg, cache):
+    """
+    Solves the ac power flow of one ac zone with the algorithm C{alg},
+    reusing the zone data and factorisations in C{cache}. Returns the
+    results and the success flag like RUNPF, the results including the
+    number of iterations C{it} (missing if solved by RUNPF).
+    """
+    ## generator reactive power limits and dc power flows need RUNPF
+    if alg == 1 and (ppopt['ENFORCE_Q_LIMS'] or ppopt['PF_DC']):
+        return runpf(accase, ppopt)
+
+    t0 = perf_counter()
+    zone = _zonedata(accase, cache)
+    baseMVA, ref, pv, pq = zone['baseMVA'], zone['ref'], zone['pv'], zone['pq']
+    pvpq = r_[pv, pq]
+    on, gbus = zone['on'], zone['gbus']
+
+    ## internal data with the injections and voltages of the ac case
+    bon, gon, gi = zone['bon'], zone['gon'], zone['gi']
+    bus = zone['bus'].copy()
+    bus[:, [PD, QD, VM, VA]] = accase['bus'][bon][:, [PD, QD, VM, VA]]
+    gen = accase['gen'][gon][gi]
+    gen[:, GEN_BUS] = zone['gen'][:, GEN_BUS]
+    branch = zone['branch'].copy()
+    Sbus = makeSbus(baseMVA, bus, gen)
+
+    if alg == 4:
+        ## dc power flow approximation
+        dc = cache.setdefault('dc', {})
+        if 'B' not in dc:
+            B, Bf, Pbusinj, Pfinj = makeBdc(baseMVA, bus, branch)
+            dc.update(B=B, Bf=Bf, Pbusinj=Pbusinj, Pfinj=Pfinj,
+                      lu=splu(B[pvpq,:][:,pvpq].tocsc()))
+        B, Bf = dc['B'], dc['Bf']
+        Pbus = Sbus.real - dc['Pbusinj'] - bus[:, GS] / baseMVA
+        Va = bus[:, VA] * (pi / 180)
+        Va[pvpq] = dc['lu'].solve(Pbus[pvpq] - B[pvpq,:][:,ref] * Va[ref])
+
+        branch[:, [QF, QT]] = 0
+        branch[:, PF] = (Bf * Va + dc['Pfinj']) * baseMVA
+        branch[:, PT] = -branch[:, PF]
+        bus[:, VM] = 1
+        bus[:, VA] = Va * (180 / pi)
+        refgen = on[[(gbus == k).nonzero()[0][0] for k in ref]]
+        gen[refgen, PG] = gen[refgen, PG] + (B[ref, :] * Va - Pbus[ref]) * baseMVA
+        success, it = 1, 0
+    else:
+        ## initial voltages: bus voltages with the generator set-points
+        V0 = bus[:, VM] * exp(1j * pi/180 * bus[:, VA])
+        vcb = ones(V0.shape)
+        vcb[pq] = 0
+        k = vcb[gbus].nonzero()[0]
+        V0[gbus[k]] = gen[on[k], VG] / abs(V0[gbus[k]]) * V0[gbus[k]]
+        Ybus, Yf, Yt = zone['Ybus'], zone['Yf'], zone['Yt']
+
+        if alg == 1:
+            ## Newton's method
+            V, success, it = newtonpf(Ybus, Sbus, V0, ref, pv, pq, ppopt)
+            if not success:
+                return runpf(accase, ppopt)
+        else:
+            ## fast-decoupled power flow with the cached factorisations
+            fd = cache.setdefault('fd', {})
+            if 'Bp' not in fd:
+                Bp, Bpp = makeB(baseMVA, bus, branch, alg)
+                fd.update(Bp=splu(Bp[pvpq,:][:,pvpq].tocsc()),
+                    Bpp=splu(Bpp[pq,:][:,pq].tocsc()) if pq.size else None)
+            V, success, it = _fdpf(Ybus, Sbus, V0, fd['Bp'], fd['Bpp'], pvpq,
+                               pq, ppopt['PF_TOL'], ppopt['PF_MAX_IT_FD'])
+            if not success:
+                return runpf(accase, ppopt)
+        bus, gen, branch = pfsoln(baseMVA, bus, gen, branch, Ybus, Yf, Yt,
+                                  V, ref, pv, pq)
+
+    ## results in the rows and bus numbers of the ac case
+    results = dict(accase, bus=accase['bus'].copy(), gen=accase['gen'].copy(),
+                   branch=zone['extbranch'].copy())
+    results['bus'][bon, 1:] = bus[:, 1:]
+    results['gen'][gon[gi], :] = gen
+    results['gen'][gon, GEN_BUS] = accase['gen'][gon, GEN_BUS]
+    results['branch'][zone['bron'], PF:] = branch[:, PF:]
+    results['et'] = perf_counter() - t0
+    results['success'] = success
+    results['it'] = it
+
+    return results, success
+
+
+def _zonedata(accase, cache):
+    """
+    Returns the internal data of an ac zone (see EXT2INT), its bus types
+    and admittance matrices from C{cache}, which are renewed (together with
+    the factorisations in C{cache}) when the bus types, shunts, generators
+    or branch data of the zone change.
+    """
+    bus, gen = accase['bus'], accase['gen']
+    key = (bus[:, [BUS_TYPE, GS, BS]].tobytes(), gen[:, GEN_BUS].tobytes(),
+           gen[:, GEN_STATUS].tobytes(),
+           accase['branch'][:, :BR_STATUS+1].tobytes())
+    if cache.get('key') == key:
+        return cache['zone']
+
+    ## internal data (with the power flow result columns of the branches)
+    branch = accase['branch']
+    if branch.shape[1] < QT + 1:
+        branch = c_[branch, zeros((branch.shape[0], QT + 1 - branch.shape[1]))]
+    ppc = ext2int(dict(accase, branch=branch))
+    order = ppc['order']
+    baseMVA = ppc['baseMVA']
+    ref, pv, pq = bustypes(ppc['bus'], ppc['gen'])
+    on = (ppc['gen'][:, GEN_STATUS] > 0).nonzero()[0]
+    Ybus, Yf, Yt = makeYbus(baseMVA, ppc['bus'], ppc['branch'])
+
+    cache.clear()
+    cache['key'] = key
+    cache['zone'] = {
+        'baseMVA': baseMVA, 'bus': ppc['bus'], 'gen': ppc['gen'],
+        'branch': ppc['branch'], 'extbranch': branch,
+        'bon': order['bus']['status']['on'],
+        'gon': order['gen']['status']['on'], 'gi': order['gen']['e2i'],
+        'bron': order['branch']['status']['on'],
+        'ref': ref, 'pv': pv, 'pq': pq,
+        'on': on, 'gbus': ppc['gen'][on, GEN_BUS].astype(int),
+        'Ybus': Ybus, 'Yf': Yf, 'Yt': Yt,
+    }
+
+    return cache['zone']
+
+
+def _zoneinj(bus, gen, baseMVA, alg):
+    """
+    Returns the record of the algorithm, the bus types and generator
+    statuses, and the injections (p.u.) of an ac zone, compared by
+    _UNCHANGED.
+    """
+    pqgen = isin(gen[:, GEN_BUS], bus[bus[:, BUS_TYPE] == PQ, BUS_I])
+    return (alg, bus[:, BUS_TYPE].tobytes() + gen[:, GEN_STATUS].tobytes(),
+            r_[r_[bus[:, PD], bus[:, QD], gen[:, PG], gen[pqgen, QG]] / baseMVA,
+               gen[:, VG]])
+
+
+def _unchanged(inj, bus, gen, baseMVA, alg, tol):
+    """
+    Returns True if the injections of an ac zone differ less than C{tol}
+    from the record C{inj} (see _ZONEINJ), with the same algorithm, bus
+    types and generator statuses.
+    """
+    if inj is None:
+        return False
+    new = _zoneinj(bus, gen, baseMVA, alg)
+    return new[:2] == inj[:2] and abs(new[2] - inj[2]).max() < tol
+
+
+def _fdpf(Ybus, Sbus, V, Bp, Bpp, pvpq, pq, tol, itmax):
+    """
+    Fast-decoupled power flow (see FDPF of PYPOWER) with the factorised
+    matrices C{Bp} (rows and columns pvpq) and C{Bpp} (rows and columns pq).
+    Returns the voltages, the success flag and the number of iterations.
+    """
+    Va, Vm = angle(V), abs(V)
+    for i in range(itmax + 1):
+        ## P iteration
+        mis = (V * conj(Ybus * V) - Sbus) / Vm
+        if abs(r_[mis[pvpq].real, mis[pq].imag, 0]).max() < tol:
+            return V, 1, i
+        if i == itmax:
+            break
+        Va[pvpq] = Va[pvpq] - Bp.solve(mis[pvpq].real)
+        V = Vm * exp(1j * Va)
+
+        ## Q iteration
+        mis = (V * conj(Ybus * V) - Sbus) / Vm
+        if abs(r_[mis[pvpq].real, mis[pq].imag, 0]).max() < tol:
+            return V, 1, i + 1
+        if Bpp is not None:
+            Vm[pq] = Vm[pq] - Bpp.solve(mis[pq].imag)
+            V = Vm * exp(1j * Va)
+
+    return V, 0, itmax
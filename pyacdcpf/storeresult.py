@@ -0,0 +1,39 @@
+"""Writes an ac/dc power flow solution into a result store.
+"""
+
+from pypower.idx_bus import VM, VA
+from pypower.idx_gen import PG, QG
+
+
+def storeresult(store, t, pcase, state, converged):
+    """
+    Writes an ac/dc power flow solution into a result store.
+
+    Writes the solution C{state} and the convergence flag C{converged} of
+    the prepared case C{pcase} (see SOLVEACDCPF) into row C{t} of the
+    result store C{store} (see MAKERESULTSTORE), in the row order of the
+    input case files. Out-of-service elements are left at zero.
+
+    @author:Jef Beerten (KU Leuven)
+    @author:Roni Irnawan (Aalborg University)
+    """
+    baseMVA = pcase['baseMVA']
+    busi, geni, convi = pcase['busi'], pcase['geni'], pcase['convi']
+    busdci, brchdci = pcase['busdci'], pcase['brchdci']
+    nconv = convi.size
+
+    store['VM'][t,busi] = state['bus'][:,VM]
+    store['VA'][t,busi] = state['bus'][:,VA]
+    store['PG'][t,geni] = state['gen'][:geni.size,PG]
+    store['QG'][t,geni] = state['gen'][:geni.size,QG]
+    store['VDC'][t,busdci] = state['Vdc']
+    store['PDC'][t,busdci] = state['Pdc']*baseMVA
+    store['PCONV'][t,convi] = state['Ps'][:nconv]*baseMVA
+    store['QCONV'][t,convi] = state['Qs'][:nconv]*baseMVA
+    store['PLOSS'][t,convi] = state['Ploss'][:nconv]*baseMVA
+    store['PFDC'][t,brchdci] = state['Pfdc']*baseMVA
+    store['PTDC'][t,brchdci] = state['Ptdc']*baseMVA
+    store['converged'][t] = converged
+    store['it'][t] = state['it']
+
+    return store
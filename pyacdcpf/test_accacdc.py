@@ -0,0 +1,57 @@
+"""
+Test the acceleration of the outer ac/dc iteration.
+"""
+
+import sys
+from pathlib import Path
+
+from numpy import diag, linspace, ones, zeros, abs
+from numpy.linalg import solve
+from numpy.testing import assert_allclose
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyacdcpf.accacdc import accacdc
+from pyacdcpf.runacdcpf import runacdcpf
+from pyacdcpf.pacdcoption import pacdcoption
+from pyacdcpf.makesynthacdc import makesynthacdc
+
+from pyacdcpf.idx_busdc import VDC
+
+
+def _iterate(method, n=6, itmax=200):
+    """Iterations of x = A*x + b (weakly damped) until convergence."""
+    A = diag(linspace(0.5, 0.95, n))
+    b = ones(n)
+    x, acc = zeros(n), {}
+    for it in range(1, itmax + 1):
+        g = A.dot(x) + b
+        if abs(g - x).max() < 1e-10:
+            return it, g, solve(diag(ones(n)) - A, b)
+        x = accacdc(acc, x, g, method, 6) if method else g
+    return itmax, x, solve(diag(ones(n)) - A, b)
+
+
+def test_accelerated_fixed_point():
+    """All methods converge to the fixed point, faster than plain iteration."""
+    itplain = _iterate(0)[0]
+    for method in [1, 2, 3]:
+        it, x, xref = _iterate(method)
+        assert_allclose(x, xref, rtol=1e-8)
+        assert it < itplain
+
+
+def test_accelerated_acdcpf():
+    """Accelerated outer iterations give the same solution in fewer steps."""
+    ppc, pdc = makesynthacdc(300, 20, 2, 1)
+    stats = {}
+    _, resultsdc, _ = runacdcpf(ppc, pdc, pacdcoption(OUTPUT=0), stats=stats)
+    for method in [1, 2, 3]:
+        statsacc = {}
+        _, resultsdcacc, converged = runacdcpf(ppc, pdc,
+            pacdcoption(OUTPUT=0, ACCACDC=method), stats=statsacc)
+        assert converged
+        assert statsacc['it'] <= stats['it']
+        assert_allclose(resultsdcacc['busdc'][:, VDC],
+                        resultsdc['busdc'][:, VDC], atol=1e-8)
@@ -0,0 +1,42 @@
+"""
+Test the unified Newton-Raphson ac/dc power flow against the sequential one.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+from numpy.testing import assert_allclose
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyacdcpf.runacdcpf import runacdcpf
+from pyacdcpf.pacdcoption import pacdcoption
+
+from pyacdcpf.Cases.PowerflowAC.case5_stagg import case5_stagg
+from pyacdcpf.Cases.PowerflowAC.case24_ieee_rts1996_3zones import case24_ieee_rts1996_3zones
+from pyacdcpf.Cases.PowerflowDC.case5_stagg_MTDCslack import case5_stagg_MTDCslack
+from pyacdcpf.Cases.PowerflowDC.case5_stagg_MTDCdroop import case5_stagg_MTDCdroop
+from pyacdcpf.Cases.PowerflowDC.case5_stagg_HVDCptp import case5_stagg_HVDCptp
+from pyacdcpf.Cases.PowerflowDC.case24_ieee_rts1996_MTDC import case24_ieee_rts1996_MTDC
+
+
+@pytest.mark.parametrize("caseac, casedc", [
+    (case5_stagg, case5_stagg_MTDCslack),
+    (case5_stagg, case5_stagg_MTDCdroop),
+    (case5_stagg, case5_stagg_HVDCptp),
+    (case24_ieee_rts1996_3zones, case24_ieee_rts1996_MTDC),
+])
+def test_unified_matches_sequential(caseac, casedc):
+    """Both algorithms converge to the same ac/dc operating point."""
+    seqac, seqdc, seqconverged = runacdcpf(caseac(), casedc(),
+                                           pacdcoption(OUTPUT=0, ALGACDC=1))
+    nrac, nrdc, nrconverged = runacdcpf(caseac(), casedc(),
+                                        pacdcoption(OUTPUT=0, ALGACDC=2))
+
+    assert seqconverged and nrconverged
+    for key in ['bus', 'gen', 'branch']:
+        assert_allclose(nrac[key], seqac[key], atol=1e-5)
+    for key in ['busdc', 'convdc', 'branchdc']:
+        assert_allclose(nrdc[key], seqdc[key], atol=1e-5)
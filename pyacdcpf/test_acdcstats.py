@@ -0,0 +1,45 @@
+"""
+Test the solution statistics of the ac/dc power flow.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyacdcpf.runacdcpf import runacdcpf
+from pyacdcpf.pacdcoption import pacdcoption
+
+from pyacdcpf.Cases.PowerflowAC.case24_ieee_rts1996_3zones import case24_ieee_rts1996_3zones
+from pyacdcpf.Cases.PowerflowDC.case24_ieee_rts1996_MTDC import case24_ieee_rts1996_MTDC
+
+
+def test_stats_and_callback():
+    """Stage times, iteration counts and mismatch histories are reported."""
+    for algacdc in [1, 2]:
+        stats = {}
+        seen = []
+        resultsac, resultsdc, converged = runacdcpf(
+            case24_ieee_rts1996_3zones(), case24_ieee_rts1996_MTDC(),
+            pacdcoption(OUTPUT=0, ALGACDC=algacdc), stats=stats,
+            callback=lambda stats: seen.append(len(stats['mismatch'])))
+
+        assert converged
+        assert stats['mismatch'][-1] < 1e-8
+        assert seen == list(range(1, len(stats['mismatch']) + 1))
+        assert min(stats['time'].values()) >= 0
+        assert stats['time']['solve'] <= stats['time']['total']
+
+    ## sequential method: one entry per outer iteration
+    stats = {}
+    runacdcpf(case24_ieee_rts1996_3zones(), case24_ieee_rts1996_MTDC(),
+              pacdcoption(OUTPUT=0), stats=stats)
+    it = stats['it']
+    assert len(stats['mismatch']) == len(stats['itdc']) == it
+    assert len(stats['itslackdroop']) == len(stats['timezones']) == it
+    assert [len(h) for h in stats['mismatchdc']] == stats['itdc']
+    assert stats['timezones'][0].size == 3 and stats['timezones'][0].min() > 0
+    assert len(stats['itzones']) == it and stats['itzones'][0].min() > 0
+    assert stats['time']['aczones'] + stats['time']['dcnetwork'] <= \
+        stats['time']['solve']
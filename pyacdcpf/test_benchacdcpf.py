@@ -0,0 +1,55 @@
+"""
+Test the benchmark suite and the synthetic test systems.
+"""
+
+import sys
+import json
+from pathlib import Path
+
+from numpy.testing import assert_array_equal
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyacdcpf.runacdcpf import runacdcpf
+from pyacdcpf.pacdcoption import pacdcoption
+from pyacdcpf.makesynthacdc import makesynthacdc
+from pyacdcpf.benchacdcpf import benchacdcpf
+
+
+def test_synthetic_system_solves():
+    """Synthetic systems are reproducible and converge."""
+    args = {'nbus': 90, 'nconv': 8, 'nzones': 3, 'ngriddc': 2,
+            'nconvdcdc': 1, 'seed': 3}
+    caseac, casedc = makesynthacdc(**args)
+    caseac2, casedc2 = makesynthacdc(**args)
+    for key in ['bus', 'gen', 'branch']:
+        assert_array_equal(caseac[key], caseac2[key])
+    for key in ['busdc', 'convdc', 'branchdc', 'convdcdc']:
+        assert_array_equal(casedc[key], casedc2[key])
+
+    resultsac, resultsdc, converged = runacdcpf(caseac, casedc,
+                                                pacdcoption(OUTPUT=0))
+    assert converged
+
+
+def test_benchmark_json(tmp_path):
+    """The benchmark reports all stages as JSON."""
+    fname = tmp_path / 'bench.json'
+    results = benchacdcpf([{'nbus': 30, 'nconv': 4}], repeat=1, fname=fname)
+
+    assert json.load(open(fname)) == results
+    system = results['systems'][0]
+    assert system['converged'] and system['nbus'] == 30
+    for stage in ['load', 'prepare', 'aczones', 'dcnetwork', 'slackdroop',
+                  'limits', 'solve', 'int2ext', 'printing', 'total']:
+        assert system['times'][stage] >= 0
+    assert system['times']['aczones'] < system['times']['solve']
+
+
+def test_benchmark_separate_dc_grids():
+    """The dc network time is reported for separately solved dc grids."""
+    results = benchacdcpf([{'nbus': 60, 'nconv': 6, 'ngriddc': 2}], repeat=1,
+        pacdcopt=pacdcoption(OUTPUT=0, PARDC=2))
+    times = results['systems'][0]['times']
+    assert 0 < times['dcnetwork'] < times['solve']
@@ -0,0 +1,41 @@
+"""
+Test the slack/droop converter calculation on batches of operating points.
+"""
+
+import sys
+from pathlib import Path
+
+from numpy import array, exp, conj, abs
+from numpy.random import default_rng
+from numpy.testing import assert_allclose
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyacdcpf.calcslackdroop import calcslackdroop
+
+
+def test_calcslackdroop_batched():
+    """Scenarios solved at once equal those solved one by one."""
+    rng = default_rng(0)
+    Ztf = array([0.0015+0.1121j, 0, 0.0015+0.1121j, 0])
+    Bf = array([0.0887, 0.0887, 0, 0])
+    Zc = array([0.0001+0.1643j]*4)
+    Pc = rng.uniform(-1, 1, (50, 4))
+    Qs = rng.uniform(-0.3, 0.3, (50, 4))
+    Vs = rng.uniform(0.95, 1.05, (50, 4))*exp(1j*rng.uniform(-0.2, 0.2, (50, 4)))
+
+    Ps, Qc, Vc = calcslackdroop(Pc, Qs, Vs, Vs, Vs, Ztf, Bf, Zc, 1e-10, 10)
+    assert Ps.shape == Qc.shape == Vc.shape == (50, 4)
+    for k in [0, 17, 49]:
+        ref = calcslackdroop(Pc[k], Qs[k], Vs[k], Vs[k], Vs[k], Ztf, Bf, Zc,
+                             1e-10, 10)
+        assert_allclose(Ps[k], ref[0], atol=1e-12)
+        assert_allclose(Vc[k], ref[2], atol=1e-12)
+
+    ## power balance of the converters without transformer
+    Ic = (Vc[:,1] - Vs[:,1])/Zc[1]
+    assert_allclose((Vc[:,1]*conj(Ic)).real, Pc[:,1], atol=1e-9)
+    Ss = Vs[:,1]*conj(Ic) + 1j*Bf[1]*abs(Vs[:,1])**2
+    assert_allclose(Ss.real, Ps[:,1], atol=1e-9)
+    assert_allclose(Ss.imag, Qs[:,1], atol=1e-9)
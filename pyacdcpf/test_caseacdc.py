@@ -0,0 +1,83 @@
+"""
+Test the binary case bundles and their cache.
+"""
+
+import sys
+import shutil
+from pathlib import Path
+from os import listdir
+from os.path import exists
+from concurrent.futures import ThreadPoolExecutor
+
+from numpy.testing import assert_array_equal
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyacdcpf.runacdcpf import runacdcpf
+from pyacdcpf.pacdcoption import pacdcoption
+from pyacdcpf.savecaseacdc import savecaseacdc
+from pyacdcpf.loadcaseacdc import loadcaseacdc
+
+from pyacdcpf.Cases.PowerflowAC.case24_ieee_rts1996_3zones import case24_ieee_rts1996_3zones
+from pyacdcpf.Cases.PowerflowDC.case24_ieee_rts1996_MTDC import case24_ieee_rts1996_MTDC
+
+CASES = Path(__file__).parent / 'Cases'
+
+
+def test_bundle_round_trip(tmp_path):
+    """A saved case bundle loads the same data and gives the same solution."""
+    caseac, casedc = case24_ieee_rts1996_3zones(), case24_ieee_rts1996_MTDC()
+    fname = savecaseacdc(str(tmp_path / 'case24.acdc'), caseac, casedc)
+
+    ppc, pdc = loadcaseacdc(fname)
+    ## (columns added by LOADCASE and LOADCASEDC are stored as well)
+    for key in ['bus', 'gen', 'branch']:
+        assert_array_equal(ppc[key][:,:caseac[key].shape[1]], caseac[key])
+    for key in ['busdc', 'convdc', 'branchdc']:
+        assert_array_equal(pdc[key][:,:casedc[key].shape[1]], casedc[key])
+    assert ppc['baseMVA'] == caseac['baseMVA'] and pdc['pol'] == casedc['pol']
+
+    refac, refdc, _ = runacdcpf(caseac, casedc, pacdcoption(OUTPUT=0))
+    resultsac, resultsdc, converged = runacdcpf(fname, None,
+                                                pacdcoption(OUTPUT=0))
+    assert converged
+    assert_array_equal(resultsac['bus'], refac['bus'])
+    assert_array_equal(resultsdc['convdc'], refdc['convdc'])
+
+
+def test_case_cache(tmp_path):
+    """Case files are converted to a bundle on first use."""
+    for name in ['PowerflowAC/case5_stagg.py',
+                 'PowerflowDC/case5_stagg_MTDCslack.py']:
+        shutil.copy(CASES / name, tmp_path)
+    caseac = str(tmp_path / 'case5_stagg')
+    casedc = str(tmp_path / 'case5_stagg_MTDCslack')
+    bundle = tmp_path / '__acdccache__' / 'case5_stagg__case5_stagg_MTDCslack.acdc'
+
+    refac, refdc, _ = runacdcpf(caseac, casedc, pacdcoption(OUTPUT=0))
+    for _ in range(2):
+        resultsac, resultsdc, _ = runacdcpf(caseac, casedc,
+            pacdcoption(OUTPUT=0, CASECACHE=1))
+        assert exists(bundle)
+        assert_array_equal(resultsac['bus'], refac['bus'])
+        assert_array_equal(resultsdc['busdc'], refdc['busdc'])
+
+
+def test_bundle_replaced_as_a_whole(tmp_path):
+    """Saving into an existing bundle leaves no matrices of the old case."""
+    caseac, casedc = case24_ieee_rts1996_3zones(), case24_ieee_rts1996_MTDC()
+    fname = str(tmp_path / 'case24.acdc')
+    savecaseacdc(fname, dict(caseac, gencost=caseac['gen'][:, :6]), casedc)
+    assert 'gencost' in loadcaseacdc(fname)[0]
+
+    savecaseacdc(fname, caseac, casedc)
+    assert 'gencost' not in loadcaseacdc(fname)[0]
+
+    ## concurrent conversions of the same case
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(lambda _: savecaseacdc(fname, caseac, casedc),
+                          range(8)))
+    ppc, pdc = loadcaseacdc(fname)
+    assert_array_equal(ppc['bus'][:,:caseac['bus'].shape[1]], caseac['bus'])
+    assert listdir(tmp_path) == ['case24.acdc']
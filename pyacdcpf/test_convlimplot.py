@@ -0,0 +1,28 @@
+"""
+Test that matplotlib is only imported when converter limits are plotted.
+"""
+
+import sys
+import subprocess
+from pathlib import Path
+
+ROOT = str(Path(__file__).parent.parent)
+
+SCRIPT = """
+import sys
+sys.path.insert(0, %r)
+import pyacdcpf
+from pyacdcpf.pacdcoption import pacdcoption
+from pyacdcpf.Cases.PowerflowAC.case5_stagg import case5_stagg
+from pyacdcpf.Cases.PowerflowDC.case5_stagg_MTDCslack import case5_stagg_MTDCslack
+pyacdcpf.runacdcpf(case5_stagg(), case5_stagg_MTDCslack(),
+                   pacdcoption(OUTPUT=0, CONVPLOTOPT=0))
+print(any(m.startswith('matplotlib') for m in sys.modules))
+""" % ROOT
+
+
+def test_no_matplotlib_without_plots():
+    """Importing and running pyacdcpf without plots leaves out matplotlib."""
+    out = subprocess.run([sys.executable, '-c', SCRIPT], capture_output=True,
+                         text=True, check=True).stdout
+    assert out.strip().splitlines()[-1] == 'False'
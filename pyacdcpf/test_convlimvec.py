@@ -0,0 +1,68 @@
+"""
+Test the vectorised converter limit check against the scalar one.
+"""
+
+import sys
+from pathlib import Path
+
+from numpy import array, tile, repeat, linspace, meshgrid, ones, arange
+from numpy.testing import assert_allclose, assert_array_equal
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyacdcpf.convlim import convlim
+from pyacdcpf.convlimvec import convlimvec
+
+
+def _converters():
+    """Converters with transformer and filter, only filter, only transformer
+    and working points inside and outside their capability charts."""
+    Ztf = array([0.0015+0.1121j, 0, 0.0015+0.1121j])
+    Bf = array([0.0887, 0.0887, 0])
+    Zc = array([0.0001+0.1643j, 0.0001+0.1643j, 0.0001+0.1643j])
+
+    ## working points inside and outside the capability chart
+    P, Q = meshgrid(linspace(-1.5, 1.5, 7), linspace(-1.2, 1.2, 7))
+    Ss = tile((P + 1j*Q).flatten(), 3)
+    n = Ss.size
+    Ztf, Bf, Zc = repeat(Ztf, n//3), repeat(Bf, n//3), repeat(Zc, n//3)
+    Vs = 1.02*ones(n)
+    Icmax, Vcmax, Vcmin = 1.1*ones(n), 1.1*ones(n), 0.9*ones(n)
+    convi = arange(1, n+1)
+    return Ss, Vs, Ztf, Bf, Zc, Icmax, Vcmax, Vcmin, convi
+
+
+def test_convlimvec_matches_convlim():
+    """All converters checked at once give the results of CONVLIM."""
+    Ss, Vs, Ztf, Bf, Zc, Icmax, Vcmax, Vcmin, convi = _converters()
+    n = Ss.size
+
+    limviol, SsL, plotarg = convlimvec(Ss, Vs, Vs, Ztf, Bf, Zc, Icmax,
+                                       Vcmax, Vcmin, convi, 1e-4, 0)
+
+    for i in range(n):
+        ref = convlim(Ss[i], Vs[i], Vs[i], Ztf[i], Bf[i], Zc[i], Icmax[i],
+                      Vcmax[i], Vcmin[i], convi[i], 1e-4, 0)
+        assert_array_equal(limviol[i], ref[0])
+        assert_allclose(SsL[i], ref[1], atol=1e-10)
+        assert_allclose(plotarg[i,:], ref[2], atol=1e-10)
+    assert set(limviol) == {0, 1, 2}
+
+
+def test_convlimvec_envelope_cache():
+    """Cached capability charts are reused for nearby voltage magnitudes."""
+    Ss, Vs, Ztf, Bf, Zc, Icmax, Vcmax, Vcmin, convi = _converters()
+    args = (Ztf, Bf, Zc, Icmax, Vcmax, Vcmin, convi, 1e-4, 0)
+    envcache = {}
+
+    limviol, SsL, _ = convlimvec(Ss, Vs, Vs, *args)
+    limviolc, SsLc, _ = convlimvec(Ss, Vs, Vs, *args, envcache, 1e-7)
+    assert len(envcache) == Ss.size
+    assert_array_equal(limviolc, limviol)
+    assert_allclose(SsLc, SsL, atol=1e-6)
+
+    ## voltage magnitudes within the same quantisation step
+    limviolc, SsLc, _ = convlimvec(Ss, Vs + 2e-8, Vs, *args, envcache, 1e-7)
+    assert len(envcache) == Ss.size
+    assert_array_equal(limviolc, limviol)
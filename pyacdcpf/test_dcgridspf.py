@@ -0,0 +1,51 @@
+"""
+Test the separate solution of the dc grids.
+"""
+
+import sys
+from pathlib import Path
+
+from numpy import arange, sort, concatenate
+from numpy.testing import assert_array_equal, assert_allclose
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyacdcpf.runacdcpf import runacdcpf
+from pyacdcpf.prepacdcpf import prepacdcpf
+from pyacdcpf.pacdcoption import pacdcoption
+from pyacdcpf.idx_busdc import GRIDDC
+
+from pyacdcpf.Cases.PowerflowAC.case24_ieee_rts1996_3zones import case24_ieee_rts1996_3zones
+from pyacdcpf.Cases.PowerflowDC.case24_ieee_rts1996_MTDC import case24_ieee_rts1996_MTDC
+
+
+def test_gridmap_partitions_dc_network():
+    """Every dc bus belongs to one dc grid with its own admittance matrix."""
+    pcase = prepacdcpf(case24_ieee_rts1996_3zones(), case24_ieee_rts1996_MTDC(),
+                       pacdcoption(OUTPUT=0))
+    busdc, gridmap = pcase['busdc'], pcase['gridmap']
+    busi = gridmap['busi']
+
+    assert len(busi) == pcase['ngriddc'] > 1
+    assert_array_equal(sort(concatenate(busi)), arange(busdc.shape[0]))
+    for ii, b in enumerate(busi):
+        assert (busdc[b, GRIDDC] == ii + 1).all()
+        assert_array_equal(gridmap['Ybusdc'][ii].toarray(),
+                           pcase['Ybusdc'][b,:][:,b].toarray())
+        assert_array_equal(b[gridmap['slack'][ii]], gridmap['slackdc'][ii])
+    assert_array_equal(sort(concatenate(gridmap['slackdc'])), pcase['slackdc'])
+
+
+def test_separate_dc_grids_match_coupled():
+    """Solving the dc grids separately gives the coupled solution."""
+    refac, refdc, _ = runacdcpf(case24_ieee_rts1996_3zones(),
+        case24_ieee_rts1996_MTDC(), pacdcoption(OUTPUT=0))
+    for pardc in [1, 2]:
+        resultsac, resultsdc, converged = runacdcpf(
+            case24_ieee_rts1996_3zones(), case24_ieee_rts1996_MTDC(),
+            pacdcoption(OUTPUT=0, PARDC=pardc, CHORDDC=2))
+        assert converged
+        for key in ['busdc', 'convdc', 'branchdc']:
+            assert_allclose(resultsdc[key], refdc[key], atol=1e-8)
+        assert_allclose(resultsac['bus'], refac['bus'], atol=1e-8)
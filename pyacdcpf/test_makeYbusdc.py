@@ -0,0 +1,55 @@
+"""
+Test the dc bus admittance matrix with dc-dc converters.
+"""
+
+import sys
+from pathlib import Path
+
+from numpy import zeros
+from numpy.random import default_rng
+from numpy.testing import assert_allclose
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyacdcpf.makeYbusdc import makeYbusdc
+
+from pyacdcpf.idx_brchdc import F_BUSDC, T_BUSDC, BRDC_R
+from pyacdcpf.idx_convdcdc import (C_BUSDC, M_BUSDC, D_RATIO, R_DCDC,
+                                   G_DCDC, STATUS_DCDC)
+
+
+def test_convdcdc_stamping():
+    """Batched stamping equals stamping every element separately."""
+    rng = default_rng(0)
+    nb, nl, nc = 40, 60, 500
+    busdc = zeros((nb, 9))
+    branchdc = zeros((nl, 9))
+    branchdc[:, [F_BUSDC, T_BUSDC]] = rng.choice(nb, (nl, 2)) + 1
+    branchdc[:, BRDC_R] = rng.uniform(0.01, 0.1, nl)
+    convdcdc = zeros((nc, 9))
+    convdcdc[:, [C_BUSDC, M_BUSDC]] = rng.choice(nb, (nc, 2)) + 1
+    convdcdc[:, D_RATIO] = rng.uniform(0.5, 2, nc)
+    convdcdc[:, R_DCDC] = rng.uniform(0.01, 0.1, nc)
+    convdcdc[:, G_DCDC] = rng.uniform(0, 0.01, nc)
+    convdcdc[:, STATUS_DCDC] = rng.random(nc) < 0.8
+
+    Ybusdc = makeYbusdc(busdc, branchdc, convdcdc)[0]
+    assert Ybusdc.format == 'csr' and Ybusdc.has_canonical_format
+
+    Y = zeros((nb, nb))
+    for f, t, r in branchdc[:, [F_BUSDC, T_BUSDC, BRDC_R]]:
+        f, t = int(f) - 1, int(t) - 1
+        Y[f, f] += 1/r
+        Y[f, t] -= 1/r
+        Y[t, f] -= 1/r
+        Y[t, t] += 1/r
+    for c, m, D, R, G, status in convdcdc[:, [C_BUSDC, M_BUSDC, D_RATIO,
+                                              R_DCDC, G_DCDC, STATUS_DCDC]]:
+        if status:
+            c, m = int(c) - 1, int(m) - 1
+            Y[c, c] += 1/R
+            Y[c, m] -= D/R
+            Y[m, c] -= D/R
+            Y[m, m] += D**2/R + G
+    assert_allclose(Ybusdc.toarray(), Y, atol=1e-9)
@@ -0,0 +1,89 @@
+"""
+Test repeated solutions of a prepared ac/dc case.
+"""
+
+import sys
+from pathlib import Path
+
+from numpy import isin
+from numpy.testing import assert_allclose
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyacdcpf.runacdcpf import runacdcpf
+from pyacdcpf.prepacdcpf import prepacdcpf
+from pyacdcpf.setinjacdc import setinjacdc
+from pyacdcpf.solveacdcpf import solveacdcpf
+from pyacdcpf.int2extacdc import int2extacdc
+from pyacdcpf.pacdcoption import pacdcoption
+
+from pyacdcpf.Cases.PowerflowAC.case5_stagg import case5_stagg
+from pyacdcpf.Cases.PowerflowDC.case5_stagg_MTDCslack import case5_stagg_MTDCslack
+from pyacdcpf.Cases.PowerflowDC.case5_stagg_MTDCdroop import case5_stagg_MTDCdroop
+from pyacdcpf.Cases.PowerflowAC.case24_ieee_rts1996_3zones import case24_ieee_rts1996_3zones
+from pyacdcpf.Cases.PowerflowDC.case24_ieee_rts1996_MTDC import case24_ieee_rts1996_MTDC
+
+from pypower.idx_bus import PD
+from pyacdcpf.idx_convdc import PCONV, QCONV, CONVTYPE_AC, PQC
+
+
+def test_prepared_case_matches_runacdcpf():
+    """Repeated solutions with changed injections equal runacdcpf calls."""
+    pacdcopt = pacdcoption(OUTPUT=0)
+    pcase = prepacdcpf(case5_stagg(), case5_stagg_MTDCslack(), pacdcopt)
+    Ybusdc = pcase['Ybusdc'].copy()
+
+    for scale in [1.0, 0.9, 1.1]:
+        caseac = case5_stagg()
+        casedc = case5_stagg_MTDCslack()
+        caseac['bus'][:, PD] *= scale
+        casedc['convdc'][:, PCONV] *= scale
+
+        setinjacdc(pcase, PD=caseac['bus'][:, PD],
+                   PCONV=casedc['convdc'][:, PCONV])
+        state, converged = solveacdcpf(pcase)
+        resultsac, resultsdc = int2extacdc(pcase, state)
+        refac, refdc, refconverged = runacdcpf(caseac, casedc, pacdcopt)
+
+        assert converged and refconverged
+        for key in ['bus', 'gen', 'branch']:
+            assert_allclose(resultsac[key], refac[key], atol=1e-8)
+        for key in ['busdc', 'convdc', 'branchdc']:
+            assert_allclose(resultsdc[key], refdc[key], atol=1e-8)
+
+    ## topology dependent data is left untouched by the solutions
+    assert_allclose(pcase['Ybusdc'].toarray(), Ybusdc.toarray())
+
+
+def test_dc_chord_matches_newton():
+    """Reusing the dc Jacobian factors does not change the solution."""
+    pcase = prepacdcpf(case5_stagg(), case5_stagg_MTDCdroop(),
+                       pacdcoption(OUTPUT=0))
+    newton, converged = solveacdcpf(pcase)
+    assert converged
+
+    pcase['pacdcopt'] = pacdcoption(OUTPUT=0, CHORDDC=3, ITMAXDC=30)
+    chord, converged = solveacdcpf(pcase)
+    assert converged
+    assert pcase['dcjac']['lu'] is None
+    assert_allclose(chord['Vdc'], newton['Vdc'], atol=1e-8)
+    assert_allclose(chord['Ps'], newton['Ps'], atol=1e-8)
+
+
+def test_setinjacdc_keeps_conflicting_converters_without_q():
+    """Converters without Q injections due to voltage control conflicts
+    are not given reactive power set-points."""
+    casedc = case24_ieee_rts1996_MTDC()
+    pcase = prepacdcpf(case24_ieee_rts1996_3zones(), casedc,
+                       pacdcoption(OUTPUT=0))
+    vconfl, convdc = pcase['vconfl'], pcase['convdc']
+    assert vconfl.size > 0
+
+    setinjacdc(pcase, QCONV=casedc['convdc'][:, QCONV] + 25)
+    assert (convdc[vconfl, QCONV] == 0).all()
+    pqc = (convdc[:pcase['convi'].size, CONVTYPE_AC] == PQC).nonzero()[0]
+    pqc = pqc[~isin(pqc, vconfl)]
+    assert pqc.size > 0
+    assert_allclose(convdc[pqc, QCONV],
+                    casedc['convdc'][pcase['convi'][pqc], QCONV] + 25)
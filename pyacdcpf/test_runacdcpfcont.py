@@ -0,0 +1,196 @@
+"""
+Test the contingency analysis against individual power flows.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+from numpy import arange, diag, eye, ix_
+from numpy.random import default_rng
+from numpy.linalg import solve
+from numpy.testing import assert_allclose
+from scipy.sparse import csc_matrix
+from scipy.sparse.linalg import splu
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyacdcpf.runacdcpf import runacdcpf
+from pyacdcpf.runacdcpfcont import runacdcpfcont
+from pyacdcpf.lowrankdcjac import lowrankdcjac
+from pyacdcpf.makesynthacdc import makesynthacdc
+from pyacdcpf.prepacdcpf import prepacdcpf
+from pyacdcpf.applyoutage import applyoutage
+from pyacdcpf.solveacdcpf import solveacdcpf
+from pyacdcpf.int2extacdc import int2extacdc
+from pyacdcpf.pacdcoption import pacdcoption
+from pyacdcpf.loadcasedc import loadcasedc
+
+from pyacdcpf.Cases.PowerflowAC.case24_ieee_rts1996_3zones import case24_ieee_rts1996_3zones
+from pyacdcpf.Cases.PowerflowDC.case24_ieee_rts1996_MTDC import case24_ieee_rts1996_MTDC
+from pyacdcpf.Cases.PowerflowAC.case5_stagg import case5_stagg
+from pyacdcpf.Cases.PowerflowDC.case5_stagg_MTDCdroop import case5_stagg_MTDCdroop
+from pyacdcpf.Cases.PowerflowDC.case5_stagg_MTDCslack import case5_stagg_MTDCslack
+
+from pypower.idx_bus import VM, VA
+from pypower.loadcase import loadcase
+from pypower.idx_brch import BR_STATUS
+from pyacdcpf.idx_busdc import VDC, GRIDDC
+from pyacdcpf.idx_brchdc import BRDC_STATUS
+from pyacdcpf.idx_convdc import CONVSTATUS
+from pyacdcpf.idx_convdcdc import STATUS_DCDC
+
+OUTAGES = [('branchdc', 0), ('branchdc', 3), ('branch', 3),
+           [('branch', 5), ('branchdc', 2)]]
+
+
+def test_contingencies_match_runacdcpf():
+    """Every contingency equals a runacdcpf call with the outages applied."""
+    pacdcopt = pacdcoption(OUTPUT=0)
+    results = runacdcpfcont(case24_ieee_rts1996_3zones(),
+                            case24_ieee_rts1996_MTDC(), OUTAGES, pacdcopt)
+
+    ## dc branch 0 isolates the only dc slack bus of its grid
+    assert results['islanded'].tolist() == [True, False, False, False]
+    assert results['noslackdc'].tolist() == [True, False, False, False]
+    for c in range(1, len(OUTAGES)):
+        caseac = case24_ieee_rts1996_3zones()
+        casedc = case24_ieee_rts1996_MTDC()
+        outage = OUTAGES[c] if isinstance(OUTAGES[c], list) else [OUTAGES[c]]
+        for kind, k in outage:
+            if kind == 'branch':
+                caseac['branch'][k, BR_STATUS] = 0
+            else:
+                casedc['branchdc'][k, BRDC_STATUS] = 0
+        resultsac, resultsdc, converged = runacdcpf(caseac, casedc, pacdcopt)
+        assert converged and results['converged'][c]
+        assert_allclose(results['VM'][c], resultsac['bus'][:, VM], atol=1e-6)
+        assert_allclose(results['VDC'][c], resultsdc['busdc'][:, VDC],
+                        atol=1e-6)
+
+
+def test_converter_outages_match_runacdcpf():
+    """Converter outages equal runacdcpf calls with the converters out."""
+    pacdcopt = pacdcoption(OUTPUT=0)
+    outages = [('convdc', 0), ('convdc', 1), ('convdc', 5),
+               [('convdc', 2), ('branchdc', 4)]]
+    results = runacdcpfcont(case24_ieee_rts1996_3zones(),
+                            case24_ieee_rts1996_MTDC(), outages, pacdcopt)
+
+    ## converter 0 is the only dc slack converter of its grid
+    assert results['noslackdc'].tolist() == [True, False, False, False]
+    for c in range(1, len(outages)):
+        casedc = case24_ieee_rts1996_MTDC()
+        outage = outages[c] if isinstance(outages[c], list) else [outages[c]]
+        for kind, k in outage:
+            if kind == 'convdc':
+                casedc['convdc'][k, CONVSTATUS] = 0
+            else:
+                casedc['branchdc'][k, BRDC_STATUS] = 0
+        resultsac, resultsdc, converged = runacdcpf(
+            case24_ieee_rts1996_3zones(), casedc, pacdcopt)
+        assert converged and results['converged'][c]
+        assert_allclose(results['VM'][c], resultsac['bus'][:, VM], atol=1e-6)
+        assert_allclose(results['VA'][c], resultsac['bus'][:, VA], atol=1e-4)
+        assert_allclose(results['VDC'][c], resultsdc['busdc'][:, VDC],
+                        atol=1e-6)
+
+    ## single dc grid: the dc slack bus is held at its set-point
+    results = runacdcpfcont(case5_stagg(), case5_stagg_MTDCslack(),
+                            [('convdc', 0)], pacdcopt)
+    casedc = case5_stagg_MTDCslack()
+    casedc['convdc'][0, CONVSTATUS] = 0
+    resultsac, resultsdc, converged = runacdcpf(case5_stagg(), casedc,
+                                                pacdcopt)
+    assert converged and results['converged'][0]
+    assert_allclose(results['VA'][0], resultsac['bus'][:, VA], atol=1e-4)
+    assert_allclose(results['VDC'][0], resultsdc['busdc'][:, VDC], atol=1e-6)
+
+
+def test_dcdc_converter_outages_match_runacdcpf():
+    """Dc-dc converter outages equal runacdcpf calls with them out."""
+    pacdcopt = pacdcoption(OUTPUT=0)
+    caseac, casedc = makesynthacdc(nbus=60, nconv=6, nzones=2,
+                                   nconvdcdc=2, seed=1)
+    outages = [('convdcdc', 0), ('convdcdc', 1),
+               [('convdcdc', 0), ('branchdc', 2)]]
+    results = runacdcpfcont(caseac, casedc, outages, pacdcopt)
+    for c in range(len(outages)):
+        casedck = loadcasedc(casedc)
+        outage = outages[c] if isinstance(outages[c], list) else [outages[c]]
+        for kind, k in outage:
+            if kind == 'convdcdc':
+                casedck['convdcdc'][k, STATUS_DCDC] = 0
+            else:
+                casedck['branchdc'][k, BRDC_STATUS] = 0
+        resultsac, resultsdc, converged = runacdcpf(caseac, casedck, pacdcopt)
+        assert converged and results['converged'][c]
+        assert_allclose(results['VM'][c], resultsac['bus'][:, VM], atol=1e-6)
+        assert_allclose(results['VDC'][c], resultsdc['busdc'][:, VDC],
+                        atol=1e-6)
+
+    ## the dc-dc converter is out of service in the converted results
+    resultsac, resultsdc, converged = runacdcpf(caseac, casedc, pacdcopt)
+    assert_allclose(resultsdc['convdcdc'][:, :STATUS_DCDC+1],
+                    casedc['convdcdc'][:, :STATUS_DCDC+1])
+    pcase = prepacdcpf(loadcase(caseac), loadcasedc(casedc), pacdcopt)
+    pcasek = applyoutage(pcase, ('convdcdc', 1))
+    state, converged = solveacdcpf(pcasek)
+    resultsac, resultsdc = int2extacdc(pcasek, state)
+    assert resultsdc['convdcdc'][:, STATUS_DCDC].tolist() == [1, 0]
+    assert pcase['convdcdc'][:, STATUS_DCDC].tolist() == [1, 1]
+
+
+def test_parallel_contingencies():
+    """Thread pool results equal the sequential results."""
+    pacdcopt = pacdcoption(OUTPUT=0)
+    seq = runacdcpfcont(case24_ieee_rts1996_3zones(),
+                        case24_ieee_rts1996_MTDC(), OUTAGES, pacdcopt)
+    par = runacdcpfcont(case24_ieee_rts1996_3zones(),
+                        case24_ieee_rts1996_MTDC(), OUTAGES, pacdcopt,
+                        parallel=1, nworkers=2)
+    assert_allclose(par['VDC'], seq['VDC'])
+    assert par['nviol'].tolist() == seq['nviol'].tolist()
+
+
+def test_islanded_contingency():
+    """A dc grid split into droop controlled islands is solved per island."""
+    pacdcopt = pacdcoption(OUTPUT=0)
+    results = runacdcpfcont(case5_stagg(), case5_stagg_MTDCdroop(),
+                            [[('branchdc', 0), ('branchdc', 1)]], pacdcopt)
+    assert results['islanded'][0] and not results['noslackdc'][0]
+
+    ## dc bus 2 as a separate dc grid
+    casedc = case5_stagg_MTDCdroop()
+    casedc['branchdc'][[0, 1], BRDC_STATUS] = 0
+    casedc['busdc'][1, GRIDDC] = 2
+    resultsac, resultsdc, converged = runacdcpf(case5_stagg(), casedc, pacdcopt)
+    assert converged and results['converged'][0]
+    assert_allclose(results['VM'][0], resultsac['bus'][:, VM], atol=1e-6)
+    assert_allclose(results['VDC'][0], resultsdc['busdc'][:, VDC], atol=1e-6)
+
+
+def test_unconverged_base_case():
+    """Contingencies are not solved from an unconverged base case."""
+    with pytest.raises(Exception, match='base case did not converge'):
+        runacdcpfcont(case5_stagg(), case5_stagg_MTDCdroop(),
+                      [('branchdc', 0)], pacdcoption(OUTPUT=0, ITMAXACDC=0))
+
+
+def test_lowrankdcjac():
+    """The Woodbury update solves like a factorisation of the new matrix."""
+    rng = default_rng(0)
+    A = rng.random((6, 6)) + 6*eye(6)
+    S = arange(1, 3)
+    JSS = A[ix_(S, S)] + diag([-1.5, 0.5])
+    lu = splu(csc_matrix(A), permc_spec='NATURAL')
+    E = eye(6)[:, S]
+    base = {'lu': lu, 'S': S, 'Z': lu.solve(E), 'JSS': A[ix_(S, S)]}
+    KC = lowrankdcjac(base, JSS)
+
+    b = rng.random(6)
+    y = lu.solve(b)
+    A[ix_(S, S)] = JSS
+    assert_allclose(y - base['Z'].dot(KC.dot(y[S])), solve(A, b))
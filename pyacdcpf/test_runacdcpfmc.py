@@ -0,0 +1,95 @@
+"""
+Test the Monte Carlo ac/dc power flow against a time series of the samples.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+from numpy import vstack, quantile, abs
+from numpy.random import SeedSequence, default_rng
+from numpy.testing import assert_allclose
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyacdcpf.runacdcpfmc import runacdcpfmc
+from pyacdcpf.runacdcpfts import runacdcpfts
+from pyacdcpf.pacdcoption import pacdcoption
+
+from pyacdcpf.Cases.PowerflowAC.case5_stagg import case5_stagg
+from pyacdcpf.Cases.PowerflowDC.case5_stagg_MTDCslack import case5_stagg_MTDCslack
+
+from pypower.idx_bus import PD
+from pyacdcpf.idx_convdc import PCONV
+
+PD0 = case5_stagg()['bus'][:, PD]
+PCONV0 = case5_stagg_MTDCslack()['convdc'][:, PCONV]
+SAMPLES = {'PD': ('normal', PD0, 0.1*PD0),
+           'PCONV': ('uniform', PCONV0 - 10, PCONV0 + 10)}
+
+
+def test_statistics_match_samples():
+    """Streamed statistics equal those of the solved samples."""
+    pacdcopt = pacdcoption(OUTPUT=0)
+    results = runacdcpfmc(case5_stagg(), case5_stagg_MTDCslack(), SAMPLES,
+                          50, pacdcopt, seed=3, chunk=20)
+
+    ## the same samples, chunk by chunk
+    VDC = []
+    for seed, n in zip(SeedSequence(3).spawn(3), [20, 20, 10]):
+        rng = default_rng(seed)
+        profiles = {'PCONV': rng.uniform(PCONV0 - 10, PCONV0 + 10,
+                                         (n, PCONV0.size)),
+                    'PD': rng.normal(PD0, 0.1*PD0, (n, PD0.size))}
+        ts = runacdcpfts(case5_stagg(), case5_stagg_MTDCslack(), profiles,
+                         pacdcopt)
+        assert ts['converged'].all()
+        VDC.append(ts['VDC'])
+    VDC = vstack(VDC)
+
+    assert results['nconverged'] == 50
+    assert_allclose(results['VDC']['mean'], VDC.mean(axis=0), rtol=1e-12)
+    assert_allclose(results['VDC']['var'], VDC.var(axis=0, ddof=1),
+                    rtol=1e-8, atol=1e-16)
+    assert_allclose(results['VDC']['quantiles'],
+                    quantile(VDC, results['quantiles'], axis=0), atol=2e-4)
+
+
+def test_parallel_reproducible():
+    """Thread pool results equal the sequential results."""
+    pacdcopt = pacdcoption(OUTPUT=0)
+    seq = runacdcpfmc(case5_stagg(), case5_stagg_MTDCslack(), SAMPLES, 30,
+                      pacdcopt, seed=1, chunk=10)
+    par = runacdcpfmc(case5_stagg(), case5_stagg_MTDCslack(), SAMPLES, 30,
+                      pacdcopt, seed=1, chunk=10, parallel=1, nworkers=2)
+    for key in ['VDC', 'LOADING']:
+        assert_allclose(par[key]['mean'], seq[key]['mean'], rtol=1e-12)
+        assert_allclose(par[key]['quantiles'], seq[key]['quantiles'],
+                        rtol=1e-12)
+
+
+def test_quantiles_independent_of_chunk():
+    """The histogram ranges do not depend on the chunk size."""
+    pacdcopt = pacdcoption(OUTPUT=0)
+    samples = {'PD': ('normal', PD0, 0.1*PD0)}
+    ref = runacdcpfmc(case5_stagg(), case5_stagg_MTDCslack(), samples, 60,
+                      pacdcopt, chunk=60, npilot=20)
+    for chunk in [1, 2]:
+        results = runacdcpfmc(case5_stagg(), case5_stagg_MTDCslack(),
+                              samples, 60, pacdcopt, chunk=chunk, npilot=20)
+        for key in ['VM', 'PCONV']:
+            ## other samples: equal within the sampling error
+            q, qref, std = results[key]['quantiles'], \
+                ref[key]['quantiles'], ref[key]['std']
+            assert (abs(q - qref) <= 1.5*std + 1e-12).all()
+            sampled = std > 1e-9
+            assert (q[2, sampled] - q[0, sampled] > 2*std[sampled]).all()
+
+
+def test_unconverged_pilot():
+    """The histogram ranges need converged pilot samples."""
+    with pytest.raises(Exception, match='pilot samples converged'):
+        runacdcpfmc(case5_stagg(), case5_stagg_MTDCslack(), SAMPLES, 10,
+                    pacdcoption(OUTPUT=0, ITMAXACDC=0))
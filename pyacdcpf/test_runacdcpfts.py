@@ -0,0 +1,95 @@
+"""
+Test the time series ac/dc power flow against individual power flows.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyacdcpf.runacdcpf import runacdcpf
+from pyacdcpf.runacdcpfts import runacdcpfts
+from pyacdcpf.pacdcoption import pacdcoption
+
+from pyacdcpf.Cases.PowerflowAC.case5_stagg import case5_stagg
+from pyacdcpf.Cases.PowerflowDC.case5_stagg_MTDCdroop import case5_stagg_MTDCdroop
+
+from pypower.idx_bus import PD, VM, VA
+from pyacdcpf.idx_busdc import VDC
+from pyacdcpf.idx_convdc import PCONV
+
+
+def _profiles(nt=4):
+    """Load and converter power profiles scaled around the case values."""
+    scale = np.linspace(0.8, 1.2, nt)[:, None]
+    return {
+        'PD': scale * case5_stagg()['bus'][:, PD],
+        'PCONV': scale * case5_stagg_MTDCdroop()['convdc'][:, PCONV],
+    }
+
+
+def test_timeseries_matches_runacdcpf():
+    """Every snapshot equals a separate runacdcpf call."""
+    profiles = _profiles()
+    pacdcopt = pacdcoption(OUTPUT=0)
+    results = runacdcpfts(case5_stagg(), case5_stagg_MTDCdroop(), profiles,
+                          pacdcopt)
+
+    assert results['converged'].all()
+    for t in range(results['converged'].size):
+        caseac = case5_stagg()
+        casedc = case5_stagg_MTDCdroop()
+        caseac['bus'][:, PD] = profiles['PD'][t]
+        casedc['convdc'][:, PCONV] = profiles['PCONV'][t]
+        resultsac, resultsdc, converged = runacdcpf(caseac, casedc, pacdcopt)
+
+        assert_allclose(results['VM'][t], resultsac['bus'][:, VM], atol=1e-8)
+        assert_allclose(results['VA'][t], resultsac['bus'][:, VA], atol=1e-6)
+        assert_allclose(results['VDC'][t], resultsdc['busdc'][:, VDC], atol=1e-8)
+        assert_allclose(results['PCONV'][t], resultsdc['convdc'][:, PCONV],
+                        atol=1e-4)
+
+
+def test_timeseries_warm_start():
+    """Warm starting does not need more outer iterations than a cold start."""
+    profiles = _profiles()
+    pacdcopt = pacdcoption(OUTPUT=0)
+    warm = runacdcpfts(case5_stagg(), case5_stagg_MTDCdroop(), profiles,
+                       pacdcopt)
+    cold = runacdcpfts(case5_stagg(), case5_stagg_MTDCdroop(), profiles,
+                       pacdcopt, warmstart=0)
+
+    assert warm['it'].sum() < cold['it'].sum()
+    assert_allclose(warm['VDC'], cold['VDC'], atol=1e-8)
+
+
+def test_timeseries_memmap_store(tmp_path):
+    """Results written to memory-mapped files equal those kept in memory."""
+    profiles = _profiles()
+    pacdcopt = pacdcoption(OUTPUT=0)
+    ref = runacdcpfts(case5_stagg(), case5_stagg_MTDCdroop(), profiles,
+                      pacdcopt)
+    results = runacdcpfts(case5_stagg(), case5_stagg_MTDCdroop(), profiles,
+                          pacdcopt, fname=str(tmp_path / 'results'))
+
+    for key in ref:
+        stored = np.load(str(tmp_path / 'results' / (key + '.npy')),
+                         mmap_mode='r')
+        assert isinstance(results[key], np.memmap)
+        assert_allclose(stored, ref[key])
+
+
+def test_timeseries_profile_lengths():
+    """Profiles of different lengths or no profiles are rejected."""
+    ppc, pdc = case5_stagg(), case5_stagg_MTDCdroop()
+    profiles = {'PD': np.tile(ppc['bus'][:, PD], (3, 1)),
+                'PCONV': np.tile(pdc['convdc'][:, PCONV], (2, 1))}
+    with pytest.raises(ValueError, match='different numbers of snapshots'):
+        runacdcpfts(ppc, pdc, profiles, pacdcoption(OUTPUT=0))
+    with pytest.raises(ValueError, match='at least one profile'):
+        runacdcpfts(ppc, pdc, {}, pacdcoption(OUTPUT=0))
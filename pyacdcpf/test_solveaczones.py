@@ -0,0 +1,153 @@
+"""
+Test the concurrent solution of the ac zones.
+"""
+
+import sys
+from pathlib import Path
+
+from numpy import r_, arange, sort, concatenate
+from numpy.testing import assert_array_equal, assert_allclose
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pyacdcpf.runacdcpf import runacdcpf
+from pyacdcpf.prepacdcpf import prepacdcpf
+from pyacdcpf.pacdcoption import pacdcoption
+from pyacdcpf.solveacdcpf import solveacdcpf
+from pyacdcpf.solveaczones import _solvezone
+
+from pyacdcpf.Cases.PowerflowAC.case24_ieee_rts1996_3zones import case24_ieee_rts1996_3zones
+from pyacdcpf.Cases.PowerflowDC.case24_ieee_rts1996_MTDC import case24_ieee_rts1996_MTDC
+
+from pypower.runpf import runpf
+from pypower.ppoption import ppoption
+from pypower.idx_bus import ZONE, BUS_I, VM, VA
+from pypower.idx_brch import F_BUS
+from pypower.idx_gen import GEN_BUS
+
+
+def test_concurrent_zones_match_sequential():
+    """Solving the ac zones in a thread pool gives identical results."""
+    refac, refdc, refconverged = runacdcpf(case24_ieee_rts1996_3zones(),
+        case24_ieee_rts1996_MTDC(), pacdcoption(OUTPUT=0))
+    resultsac, resultsdc, converged = runacdcpf(case24_ieee_rts1996_3zones(),
+        case24_ieee_rts1996_MTDC(), pacdcoption(OUTPUT=0, PARAC=1, NWORKAC=2))
+
+    assert converged and refconverged
+    for key in ['bus', 'gen', 'branch']:
+        assert_array_equal(resultsac[key], refac[key])
+    for key in ['busdc', 'convdc', 'branchdc']:
+        assert_array_equal(resultsdc[key], refdc[key])
+
+
+def test_zonemap_partitions_network():
+    """Every bus, generator and branch belongs to the zone of its bus."""
+    pcase = prepacdcpf(case24_ieee_rts1996_3zones(), case24_ieee_rts1996_MTDC(),
+                       pacdcoption(OUTPUT=0))
+    bus, gen, branch = pcase['bus'], r_[pcase['gen'], pcase['gendm']], pcase['branch']
+    zonemap, aczones = pcase['zonemap'], pcase['aczones']
+
+    assert_array_equal(sort(concatenate(zonemap['buszi'])), arange(bus.shape[0]))
+    assert_array_equal(sort(concatenate(zonemap['genzi'])), arange(gen.shape[0]))
+    assert_array_equal(sort(concatenate(zonemap['brchzi'])), arange(branch.shape[0]))
+    for i, zone in enumerate(aczones):
+        assert (bus[zonemap['buszi'][i], ZONE] == zone).all()
+        for x in gen[zonemap['genzi'][i], GEN_BUS]:
+            assert bus[bus[:, BUS_I] == x, ZONE] == zone
+        for x in branch[zonemap['brchzi'][i], F_BUS]:
+            assert bus[bus[:, BUS_I] == x, ZONE] == zone
+
+
+def test_fast_decoupled_zone_matches_runpf():
+    """The fast-decoupled zone solver with cached factors agrees with runpf."""
+    accase = case24_ieee_rts1996_3zones()
+    accase['bus'][:, ZONE] = 1
+    ppopt = ppoption(VERBOSE=0, OUT_ALL=0, PF_TOL=1e-10)
+    ref, success = runpf(accase, ppopt)
+    assert success
+    for alg in [2, 3]:
+        cache = {}
+        for _ in range(2):  ## second solution with the cached factors
+            results, success = _solvezone(accase, ppopt, alg, cache)
+            assert success and 'Bp' in cache['fd']
+            assert_allclose(results['bus'][:, VM], ref['bus'][:, VM], atol=1e-8)
+            assert_allclose(results['bus'][:, VA], ref['bus'][:, VA], atol=1e-6)
+
+
+def test_approximate_zones_converge_to_newton():
+    """Approximate ac zone solutions switch to Newton's method at the end."""
+    refac, refdc, _ = runacdcpf(case24_ieee_rts1996_3zones(),
+        case24_ieee_rts1996_MTDC(), pacdcoption(OUTPUT=0))
+    for acpf in [2, 3, 4]:
+        resultsac, resultsdc, converged = runacdcpf(
+            case24_ieee_rts1996_3zones(), case24_ieee_rts1996_MTDC(),
+            pacdcoption(OUTPUT=0, ACPF=acpf))
+        assert converged
+        assert_allclose(resultsac['bus'][:, VM], refac['bus'][:, VM], atol=1e-6)
+        assert_allclose(resultsdc['busdc'], refdc['busdc'], atol=1e-6)
+
+
+def test_newton_zone_matches_runpf():
+    """The Newton zone solver with cached zone data agrees with runpf."""
+    accase = case24_ieee_rts1996_3zones()
+    accase['bus'][:, ZONE] = 1
+    ppopt = ppoption(VERBOSE=0, OUT_ALL=0, PF_TOL=1e-10)
+    ref, success = runpf(accase, ppopt)
+    assert success
+    cache = {}
+    for _ in range(2):  ## second solution warm started with the cached data
+        results, success = _solvezone(accase, ppopt, 1, cache)
+        assert success and 'zone' in cache
+        for key in ['bus', 'gen', 'branch']:
+            n = results[key].shape[1]
+            assert_allclose(results[key], ref[key][:, :n], atol=1e-6)
+        accase = dict(accase, bus=results['bus'])
+
+
+def test_warm_start_saves_zone_iterations():
+    """Warm started ac zones need fewer Newton iterations than cold ones."""
+    itzones, vm = [], []
+    for warmac in [0, 1]:
+        stats = {}
+        resultsac, resultsdc, converged = runacdcpf(
+            case24_ieee_rts1996_3zones(), case24_ieee_rts1996_MTDC(),
+            pacdcoption(OUTPUT=0, WARMAC=warmac), stats=stats)
+        assert converged
+        itzones.append(sum([it.sum() for it in stats['itzones']]))
+        vm.append(resultsac['bus'][:, VM])
+    assert itzones[1] < itzones[0]
+    assert_allclose(vm[1], vm[0], atol=1e-8)
+
+
+def test_warm_start_over_time_series():
+    """The ac zone voltages are kept over the snapshots of a time series."""
+    pcase = prepacdcpf(case24_ieee_rts1996_3zones(), case24_ieee_rts1996_MTDC(),
+                       pacdcoption(OUTPUT=0))
+    state, converged = solveacdcpf(pcase)
+    assert converged and all('V' in c for c in state['accache'].values())
+    itzones = []
+    for warmac in [0, 1]:
+        pcasew = dict(pcase, pacdcopt=pacdcoption(pcase['pacdcopt'],
+                                                  WARMAC=warmac))
+        stats = {}
+        _, converged = solveacdcpf(pcasew, state, stats)
+        assert converged
+        itzones.append(sum([it.sum() for it in stats['itzones']]))
+    assert itzones[1] < itzones[0]
+
+
+def test_unchanged_zones_are_skipped():
+    """Skipping ac zones with unchanged injections keeps the solution."""
+    refac, refdc, _ = runacdcpf(case24_ieee_rts1996_3zones(),
+        case24_ieee_rts1996_MTDC(), pacdcoption(OUTPUT=0))
+    for parac in [0, 2]:
+        stats = {}
+        resultsac, resultsdc, converged = runacdcpf(
+            case24_ieee_rts1996_3zones(), case24_ieee_rts1996_MTDC(),
+            pacdcoption(OUTPUT=0, TOLSKIPAC=1e-10, PARAC=parac), stats=stats)
+        assert converged
+        assert (stats['timezones'][-1] == 0).any()
+        for key in ['bus', 'gen', 'branch']:
+            assert_allclose(resultsac[key], refac[key], atol=1e-7)
+        assert_allclose(resultsdc['busdc'], refdc['busdc'], atol=1e-8)